@@ -0,0 +1,80 @@
+"""Persistent cache of the code tags found in each source file."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from beartype.typing import Dict, List, Tuple
+
+from corallium.log import LOGGER
+
+_CachedTags = List[Tuple[int, str, str]]
+"""Serializable code tags as `(lineno, tag, text)`."""
+
+
+class _TagCache:
+    """On-disk JSON lines cache of the code tags found in each file.
+
+    The first line is a header with the fingerprint of the search settings. Each following line is one entry with a
+    key (e.g. the file path), a stamp that changes when the content changes (e.g. mtime and size), and the code tags.
+    The whole cache is discarded when the fingerprint does not match.
+
+    """
+
+    def __init__(self, path_cache: Path, *, fingerprint: str) -> None:
+        self.path_cache = path_cache
+        self.fingerprint = fingerprint
+        self._entries: Dict[str, tuple[str, _CachedTags]] = {}
+        self._modified = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path_cache.is_file():
+            return
+        try:
+            self._entries = self._read_entries()
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            LOGGER.text_debug('Could not read code tag cache', path=self.path_cache, exc=exc)
+
+    def _read_entries(self) -> Dict[str, tuple[str, _CachedTags]]:
+        entries: Dict[str, tuple[str, _CachedTags]] = {}
+        with self.path_cache.open(encoding='utf-8') as f_h:
+            header = json.loads(f_h.readline() or '{}')
+            if header.get('fingerprint') != self.fingerprint:
+                LOGGER.text_debug('Discarding code tag cache with a different fingerprint', path=self.path_cache)
+                return entries
+            for line in f_h:
+                entry = json.loads(line)
+                entries[entry['key']] = (entry['stamp'], [tuple(tag) for tag in entry['tags']])
+        return entries
+
+    def get(self, key: str, stamp: str) -> _CachedTags | None:
+        """Return the cached code tags if the stamp is unchanged."""
+        if (entry := self._entries.get(key)) and entry[0] == stamp:
+            return entry[1]
+        return None
+
+    def set(self, key: str, stamp: str, tags: _CachedTags) -> None:
+        """Store the code tags for the key."""
+        self._entries[key] = (stamp, tags)
+        self._modified = True
+
+    def discard(self, key: str) -> None:
+        """Remove the entry for the key, if present."""
+        if self._entries.pop(key, None):
+            self._modified = True
+
+    def save(self) -> None:
+        """Atomically write the cache to disk when modified."""
+        if not self._modified:
+            return
+        self.path_cache.parent.mkdir(exist_ok=True, parents=True)
+        path_tmp = self.path_cache.with_suffix(f'.{os.getpid()}.tmp')
+        with path_tmp.open('w', encoding='utf-8') as f_h:
+            f_h.write(json.dumps({'fingerprint': self.fingerprint}) + '\n')
+            for key, (stamp, tags) in self._entries.items():
+                f_h.write(json.dumps({'key': key, 'stamp': stamp, 'tags': tags}) + '\n')
+        path_tmp.replace(self.path_cache)
+        self._modified = False
@@ -2,22 +2,41 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import io
+import json
+import mmap
+import os
 import re
-from collections import defaultdict
-from dataclasses import dataclass
+from collections.abc import Callable, Container, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, suppress
+from functools import partial
+from itertools import islice, starmap
 from pathlib import Path
-from subprocess import CalledProcessError  # nosec
+from time import perf_counter, time_ns
 
 import arrow
-from beartype.typing import Dict, List, Pattern, Sequence
+from beartype.typing import Dict, List, Match, Pattern, Sequence, Tuple
 
-from corallium.file_helpers import read_lines
+from corallium.file_helpers import get_relative
 from corallium.log import LOGGER
-from corallium.markup_table import format_table
-from corallium.vcs import RepoMetadata, forge_blame_url, get_repo_metadata
-from corallium.vcs._git_commands import git_blame_porcelain
-from corallium.vcs._jj_commands import jj_file_annotate
-from corallium.vcs._types import VcsKind
+from corallium.vcs import RepoIndex, RepoMetadata, forge_blame_url
+from corallium.vcs._git_commands import (
+    GitCatFileBatch,
+    git_blame_line_porcelain_async,
+    git_ls_files_blobs,
+    git_ls_files_modified,
+    git_show_toplevel,
+    parse_line_porcelain,
+)
+from corallium.vcs._jj_commands import JJ_ANNOTATE_TEMPLATE, jj_file_annotate_async, parse_jj_annotate
+from corallium.vcs._types import AnnotatedLine, VcsKind
+
+from ._cache import _TagCache
+from ._reports import _JsonLinesReport, _MarkdownReport, _replace_when_complete, _SarifReport
+from ._types import _CodeTag, _CollectorRow, _Tags
 
 SKIP_PHRASE = 'corallium_skip_tags'
 """String that indicates the file should be excluded from the tag search.
@@ -45,33 +64,43 @@ Commonly, the `tag_list` could be `COMMON_CODE_TAGS`
 """
 
 
-@dataclass(frozen=True)
-class _CodeTag:
-    """Code Tag (FIXME,TODO,etc) with contextual information."""
+_MAX_LINE_LENGTH = 400
+"""Matches on lines longer than this are ignored (typically minified or generated code)."""
 
-    lineno: int
-    tag: str
-    text: str
 
+def _search_lines(
+    lines: List[str],
+    regex_compiled: Pattern[str],
+    skip_phrase: str = SKIP_PHRASE,
+) -> List[_CodeTag]:
+    """Search lines of text for matches to the compiled regular expression.
 
-@dataclass(frozen=True)
-class _Tags:
-    """Collection of code tags with additional contextual information."""
+    Args:
+        lines: lines of text as list
+        regex_compiled: compiled regular expression. Expected to have matching groups `(tag, text)`
+        skip_phrase: skip file if string is found in final two lines. Default is `SKIP_PHRASE`
 
-    path_source: Path
-    code_tags: List[_CodeTag]
+    Returns:
+        list of all code tags found in lines
 
+    """
+    return _search_prefiltered_lines(lines, regex_compiled, prefilter=None, skip_phrase=skip_phrase)
 
-def _search_lines(
+
+def _search_prefiltered_lines(
     lines: List[str],
     regex_compiled: Pattern[str],
+    prefilter: Pattern[str] | None,
+    *,
     skip_phrase: str = SKIP_PHRASE,
 ) -> List[_CodeTag]:
-    """Search lines of text for matches to the compiled regular expression.
+    """Search lines of text like `_search_lines`, skipping lines without a match to the prefilter.
 
     Args:
         lines: lines of text as list
         regex_compiled: compiled regular expression. Expected to have matching groups `(tag, text)`
+        prefilter: optional fast regular expression (see `_prefilter_pattern`). Lines without a match are skipped
+            without running `regex_compiled`
         skip_phrase: skip file if string is found in final two lines. Default is `SKIP_PHRASE`
 
     Returns:
@@ -83,11 +112,12 @@ def _search_lines(
     if any(phrase in final_lines for phrase in skip_phrases):
         return []
 
-    max_len = 400
     comments = []
     for lineno, line in enumerate(lines):
+        if prefilter and not prefilter.search(line):
+            continue
         if match := regex_compiled.search(line):
-            if len(line) <= max_len:  # FYI: Suppress long lines
+            if len(line) <= _MAX_LINE_LENGTH:  # FYI: Suppress long lines
                 group = match.groupdict()
                 comments.append(_CodeTag(lineno=lineno + 1, tag=group['tag'], text=group['text']))
             else:
@@ -95,48 +125,381 @@ def _search_lines(
     return comments
 
 
-def _search_files(paths_source: Sequence[Path], regex_compiled: Pattern[str]) -> List[_Tags]:
-    """Collect matches from multiple files.
+def _prefilter_pattern(tags: Sequence[str]) -> str:
+    """Alternation of the literal tag names to reject text before running the full regex.
+
+    Any reported code tag contains one of the tag names verbatim. A plain literal alternation lets the regex engine
+    skip ahead to the possible first characters, which is much faster than the leading groups of `CODE_TAG_RE`.
+
+    """
+    return '|'.join(re.escape(tag) for tag in sorted(set(tags), key=len, reverse=True))
+
+
+def _prefiltered_matches(
+    buffer: bytes | mmap.mmap,
+    regex_compiled: Pattern[bytes],
+    prefilter: Pattern[bytes],
+) -> Iterator[Match[bytes]]:
+    """Yield the first match of the full regex on each line that contains a match of the prefilter."""
+    pos = 0
+    while candidate := prefilter.search(buffer, pos):
+        line_start = buffer.rfind(b'\n', 0, candidate.start()) + 1
+        if (line_end := buffer.find(b'\n', candidate.end())) == -1:
+            line_end = len(buffer)
+        if match := regex_compiled.search(buffer, line_start, line_end):
+            yield match
+        pos = line_end + 1
+
+
+def _tail_start(buffer: bytes | mmap.mmap, *, count: int) -> int:
+    """Return the offset of the first of the final `count` lines, ignoring a trailing newline."""
+    start = len(buffer) - 1 if buffer[-1:] == b'\n' else len(buffer)
+    for _ in range(count):
+        if (start := buffer.rfind(b'\n', 0, start)) == -1:
+            return 0
+    return start + 1
+
+
+def _search_buffer(
+    buffer: bytes | mmap.mmap,
+    regex_compiled: Pattern[bytes],
+    skip_phrase: str = SKIP_PHRASE,
+    *,
+    prefilter: Pattern[bytes] | None = None,
+) -> List[_CodeTag]:
+    """Search UTF-8 encoded text for matches to the compiled bytes regular expression.
+
+    Equivalent to `_search_lines` without decoding or splitting the text. The skip phrase is checked in the tail of
+    the buffer first, then the regex runs over the whole buffer and line numbers are only counted for matches. Lines
+    are only split on line feeds and matched text is decoded with replacement characters.
 
     Args:
-        paths_source: list of source files to parse
+        buffer: full text of the file as bytes or a memory map
+        regex_compiled: compiled bytes regular expression with `re.MULTILINE`. Expected to have matching groups
+            `(tag, text)`
+        skip_phrase: skip file if string is found in final two lines. Default is `SKIP_PHRASE`
+        prefilter: optional fast bytes regular expression (see `_prefilter_pattern`). When provided, the full regex
+            only runs on the lines that contain a prefilter match
+
+    Returns:
+        list of all code tags found in the buffer
+
+    """
+    tail_start = _tail_start(buffer, count=2)
+    skip_phrases = [skip_phrase, *_LEGACY_SKIP_PHRASES]
+    if any(buffer.find(phrase.encode('utf-8'), tail_start) != -1 for phrase in skip_phrases):
+        return []
+
+    comments = []
+    lineno = 0
+    line_start = 0
+    matches = _prefiltered_matches(buffer, regex_compiled, prefilter) if prefilter else regex_compiled.finditer(buffer)
+    for match in matches:
+        tag_start = match.start('tag')
+        lineno += buffer[line_start:tag_start].count(b'\n')
+        line_start = buffer.rfind(b'\n', 0, tag_start) + 1
+        line_end = buffer.find(b'\n', tag_start)
+        line = buffer[line_start : len(buffer) if line_end == -1 else line_end].decode('utf-8', errors='replace')
+        line = line.rstrip('\r')
+        if len(line) <= _MAX_LINE_LENGTH:  # FYI: Suppress long lines
+            text = match['text'].decode('utf-8', errors='replace').rstrip('\r')
+            comments.append(_CodeTag(lineno=lineno + 1, tag=match['tag'].decode('utf-8'), text=text))
+        else:
+            LOGGER.text_debug('Skipping long line', lineno=lineno, line=line[:200])
+    return comments
+
+
+def _search_file_bytes(
+    path_source: Path,
+    regex_compiled: Pattern[bytes],
+    prefilter: Pattern[bytes] | None = None,
+) -> tuple[List[_CodeTag], int]:
+    """Collect matches from a single memory-mapped file.
+
+    Args:
+        path_source: source file to parse
+        regex_compiled: compiled bytes regular expression. See `_search_buffer`
+        prefilter: optional fast bytes regular expression. See `_search_buffer`
+
+    Returns:
+        tuple of the code tags found in the file and the number of bytes in the file
+
+    """
+    if not path_source.is_file():
+        return [], 0
+    with path_source.open('rb') as f_h:
+        if not (size := os.fstat(f_h.fileno()).st_size):
+            return [], 0
+        with mmap.mmap(f_h.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return _search_buffer(buffer, regex_compiled, prefilter=prefilter), size
+
+
+def _search_content(
+    content: bytes,
+    regex_compiled: Pattern[str],
+    prefilter: Pattern[str] | None = None,
+    *,
+    source: object = None,
+) -> List[_CodeTag]:
+    """Decode UTF-8 content and search the lines for matches.
+
+    Args:
+        content: raw file content
+        regex_compiled: compiled regular expression. Expected to have matching groups `(tag, text)`
+        prefilter: optional fast regular expression. Content and lines without a match are skipped
+        source: file path or object ID for logging
+
+    Returns:
+        list of all code tags found in the content
+
+    """
+    try:
+        text = content.decode('utf-8')
+    except UnicodeDecodeError as err:
+        LOGGER.text_debug('Could not parse', path_source=source, err=err)
+        return []
+    if prefilter and not prefilter.search(text):
+        return []
+    return _search_prefiltered_lines(text.splitlines(), regex_compiled, prefilter)
+
+
+def _search_file(
+    path_source: Path,
+    regex_compiled: Pattern[str],
+    prefilter: Pattern[str] | None = None,
+) -> tuple[List[_CodeTag], int]:
+    """Collect matches from a single file.
+
+    Args:
+        path_source: source file to parse
         regex_compiled: compiled regular expression. Expected to have matching groups `(tag, text)`
+        prefilter: optional fast regular expression. Files and lines without a match are skipped
+
+    Returns:
+        tuple of the code tags found in the file and the number of bytes read
+
+    """
+    if not path_source.is_file():
+        return [], 0
+    content = path_source.read_bytes()
+    return _search_content(content, regex_compiled, prefilter, source=path_source), len(content)
+
+
+_RACY_WINDOW_NS = 2_000_000_000
+"""Files modified this recently before a scan are not cached because a later write may keep the same mtime."""
+
+
+def _cache_fingerprint(regex_compiled: Pattern[str] | Pattern[bytes], prefilter_tags: Sequence[str]) -> str:
+    """Fingerprint of the settings that determine the code tags found in a file."""
+    settings = [
+        1,
+        repr(regex_compiled.pattern),
+        regex_compiled.flags,
+        sorted(prefilter_tags),
+        SKIP_PHRASE,
+        *_LEGACY_SKIP_PHRASES,
+    ]
+    return hashlib.sha256(json.dumps(settings).encode('utf-8')).hexdigest()
+
+
+_ScanResult = Tuple[List[_CodeTag], int]
+"""Code tags found in a file and the number of bytes read."""
+
+
+def _file_searcher(
+    regex_compiled: Pattern[str] | Pattern[bytes],
+    prefilter_tags: Sequence[str],
+) -> Callable[[Path], _ScanResult]:
+    """Return a picklable function to search a single file with the appropriate scanner for the regex type."""
+    prefilter = _prefilter_pattern(prefilter_tags) if prefilter_tags else None
+    if isinstance(regex_compiled.pattern, bytes):
+        prefilter_bytes = re.compile(prefilter.encode('utf-8')) if prefilter else None
+        return partial(_search_file_bytes, regex_compiled=regex_compiled, prefilter=prefilter_bytes)
+    prefilter_str = re.compile(prefilter) if prefilter else None
+    return partial(_search_file, regex_compiled=regex_compiled, prefilter=prefilter_str)
+
+
+def _content_searcher(
+    regex_compiled: Pattern[str] | Pattern[bytes],
+    prefilter_tags: Sequence[str],
+) -> Callable[[bytes], List[_CodeTag]]:
+    """Return a function to search raw content with the appropriate scanner for the regex type."""
+    prefilter = _prefilter_pattern(prefilter_tags) if prefilter_tags else None
+    if isinstance(regex_compiled.pattern, bytes):
+        prefilter_bytes = re.compile(prefilter.encode('utf-8')) if prefilter else None
+        return partial(_search_buffer, regex_compiled=regex_compiled, prefilter=prefilter_bytes)
+    prefilter_str = re.compile(prefilter) if prefilter else None
+    return partial(_search_content, regex_compiled=regex_compiled, prefilter=prefilter_str)
+
+
+def _search_blobs(
+    paths_source: Sequence[Path],
+    search_content: Callable[[bytes], List[_CodeTag]],
+    *,
+    git_root: Path,
+    cache: _TagCache | None,
+) -> Dict[int, _ScanResult]:
+    """Search the content staged in the git index through a single `git cat-file --batch` process.
+
+    Each blob is read and scanned at most once, so identical content at several paths is only scanned once. With a
+    cache, blobs are keyed by object ID and never scanned again, even across branches and worktrees. Files with
+    unstaged changes are skipped, so they are read from the working tree and line numbers match `git blame`.
 
     Returns:
-        list of all code tags found in files
+        results for the unmodified files found in the index by position in `paths_source`
 
     """
-    matches = []
-    for path_source in paths_source:
-        lines = []
+    blob_ids = git_ls_files_blobs(cwd=git_root)
+    modified = git_ls_files_modified(cwd=git_root)
+    if not blob_ids or modified is None:
+        return {}
+    for modified_path in modified:
+        blob_ids.pop(modified_path, None)
+    results: Dict[int, _ScanResult] = {}
+    blob_tags: Dict[str, List[_CodeTag]] = {}
+    with GitCatFileBatch(cwd=git_root) as cat_file:
+        for idx, path_source in enumerate(paths_source):
+            rel_path = get_relative(path_source.absolute(), git_root) or get_relative(path_source.resolve(), git_root)
+            if not (rel_path and (blob_id := blob_ids.get(rel_path.as_posix()))):
+                continue
+            if blob_id in blob_tags:
+                results[idx] = (blob_tags[blob_id], 0)
+            elif cache and (cached := cache.get(f'blob:{blob_id}', '')) is not None:
+                blob_tags[blob_id] = list(starmap(_CodeTag, cached))
+                results[idx] = (blob_tags[blob_id], 0)
+            elif (content := cat_file.read(blob_id)) is not None:
+                blob_tags[blob_id] = search_content(content)
+                results[idx] = (blob_tags[blob_id], len(content))
+                if cache:
+                    cache.set(f'blob:{blob_id}', '', [(tag.lineno, tag.tag, tag.text) for tag in blob_tags[blob_id]])
+    return results
+
+
+def _lookup_cache(
+    paths_source: Sequence[Path],
+    cache: _TagCache,
+    *,
+    start_ns: int,
+    skip: Container[int] = (),
+) -> tuple[Dict[int, _ScanResult], Dict[int, str]]:
+    """Look up each file in the cache by mtime and size.
+
+    Returns:
+        tuple of the cached results and the stamps of dirty files that are safe to cache after scanning
+
+    """
+    results: Dict[int, _ScanResult] = {}
+    stamps: Dict[int, str] = {}
+    for idx, path_source in enumerate(paths_source):
+        if idx in skip:
+            continue
+        key = path_source.absolute().as_posix()
         try:
-            lines = read_lines(path_source)
-        except UnicodeDecodeError as err:
-            LOGGER.text_debug('Could not parse', path_source=path_source, err=err)
+            stat = path_source.stat()
+        except OSError:
+            cache.discard(key)
+            continue
+        stamp = f'{stat.st_mtime_ns}:{stat.st_size}'
+        if (cached := cache.get(key, stamp)) is not None:
+            results[idx] = (list(starmap(_CodeTag, cached)), 0)
+        elif stat.st_mtime_ns < start_ns - _RACY_WINDOW_NS:
+            stamps[idx] = stamp
+    return results, stamps
+
+
+def _search_files(
+    paths_source: Sequence[Path],
+    regex_compiled: Pattern[str] | Pattern[bytes],
+    *,
+    workers: int = 1,
+    chunksize: int = 64,
+    path_cache: Path | None = None,
+    prefilter_tags: Sequence[str] = (),
+    git_root: Path | None = None,
+) -> List[_Tags]:
+    """Collect matches from multiple files.
+
+    Args:
+        paths_source: list of source files to parse
+        regex_compiled: compiled regular expression. Expected to have matching groups `(tag, text)`. When compiled
+            from bytes, each file is memory-mapped and searched with `_search_buffer`
+        workers: number of worker processes. Default is 1 to scan serially in the current process
+        chunksize: number of files sent to a worker process at a time
+        path_cache: optional path to a cache file. Files with an unchanged mtime and size are not scanned again
+        prefilter_tags: optional tag names. Files and lines without any of these literal names are rejected before
+            running the full regex (see `_prefilter_pattern`)
+        git_root: optional git repository root. Files in its index without unstaged changes are scanned from the
+            staged blobs instead of the working tree (see `_search_blobs`)
 
-        if comments := _search_lines(lines, regex_compiled):
-            matches.append(_Tags(path_source=path_source, code_tags=comments))
+    Returns:
+        list of all code tags found in files in the same order as `paths_source`
 
-    return matches
+    """
+    start = perf_counter()
+    fingerprint = _cache_fingerprint(regex_compiled, prefilter_tags)
+    cache = _TagCache(path_cache, fingerprint=fingerprint) if path_cache else None
+    results: Dict[int, _ScanResult] = {}
+    if git_root:
+        search_content = _content_searcher(regex_compiled, prefilter_tags)
+        results = _search_blobs(paths_source, search_content, git_root=git_root, cache=cache)
+    stamps: Dict[int, str] = {}
+    if cache:
+        cached, stamps = _lookup_cache(paths_source, cache, start_ns=time_ns(), skip=results.keys())
+        results.update(cached)
+
+    dirty = [idx for idx in range(len(paths_source)) if idx not in results]
+    dirty_paths = [paths_source[idx] for idx in dirty]
+    search = _file_searcher(regex_compiled, prefilter_tags)
+    if workers > 1 and len(dirty_paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results.update(zip(dirty, executor.map(search, dirty_paths, chunksize=max(chunksize, 1)), strict=True))
+    else:
+        results.update({idx: search(path_source) for idx, path_source in zip(dirty, dirty_paths, strict=True)})
+
+    if cache:
+        for idx, stamp in stamps.items():
+            tags = [(tag.lineno, tag.tag, tag.text) for tag in results[idx][0]]
+            cache.set(paths_source[idx].absolute().as_posix(), stamp, tags)
+        cache.save()
+
+    duration = max(perf_counter() - start, 1e-9)
+    total_bytes = sum(byte_count for _, byte_count in results.values())
+    LOGGER.debug(
+        'Scanned files for code tags',
+        file_count=len(paths_source),
+        scanned_count=sum(1 for _, byte_count in results.values() if byte_count),
+        workers=workers,
+        duration_seconds=round(duration, 2),
+        files_per_second=round(len(results) / duration, 1),
+        mb_per_second=round(total_bytes / 1e6 / duration, 1),
+    )
 
+    return [
+        _Tags(path_source=paths_source[idx], code_tags=results[idx][0])
+        for idx in range(len(paths_source))
+        if results[idx][0]
+    ]
 
-@dataclass(frozen=True)
-class _CollectorRow:
-    """Each row of the Code Tag table."""
 
-    tag_name: str
-    comment: str
-    last_edit: str
-    source_file: str
+_BLAME_WORKERS = os.cpu_count() or 1
+"""Default maximum number of concurrent blame processes."""
 
-    @classmethod
-    def from_code_tag(cls, code_tag: _CodeTag, last_edit: str, source_file: str) -> _CollectorRow:
-        return cls(
-            tag_name=f'{code_tag.tag:>7}',
-            comment=code_tag.text,
-            last_edit=last_edit,
-            source_file=source_file,
-        )
+_BLAME_BATCH_FACTOR = 8
+"""Number of files blamed per batch for each blame worker."""
+
+
+def _blame_url(metadata: RepoMetadata, *, rev: str, path: str, line: int) -> str:
+    """Return the forge permalink to the line, or an empty string when the forge is not known."""
+    if not (metadata.owner and metadata.repo_name):
+        return ''
+    return forge_blame_url(
+        forge=metadata.forge,
+        owner=metadata.owner,
+        repo=metadata.repo_name,
+        rev=rev,
+        path=path,
+        line=line,
+    )
 
 
 def _format_from_blame(
@@ -162,80 +525,265 @@ def _format_from_blame(
     tz = blame_dict[f'{user}-tz'][:3] + ':' + blame_dict[f'{user}-tz'][-2:]
     last_edit = arrow.get(dt.isoformat()[:-6] + tz).format('YYYY-MM-DD')
 
-    source_file = collector_row.source_file
-    if metadata and metadata.owner and metadata.repo_name:
-        remote_file_path = blame_dict.get('filename', rel_path.as_posix())
-        git_url = forge_blame_url(
-            forge=metadata.forge,
-            owner=metadata.owner,
-            repo=metadata.repo_name,
+    url = ''
+    if metadata:
+        url = _blame_url(
+            metadata,
             rev=revision,
-            path=remote_file_path,
+            path=blame_dict.get('filename', rel_path.as_posix()),
             line=int(old_line_number),
         )
-        if git_url:
-            source_file = f'[{source_file}]({git_url})'
 
     return _CollectorRow(
         tag_name=collector_row.tag_name,
         comment=collector_row.comment,
         last_edit=last_edit,
-        source_file=source_file,
+        source_file=f'[{collector_row.source_file}]({url})' if url else collector_row.source_file,
+        url=url,
+    )
+
+
+def _format_from_annotation(
+    *,
+    collector_row: _CollectorRow,
+    annotation: AnnotatedLine,
+    metadata: RepoMetadata | None,
+    repo_path: str,
+    lineno: int,
+) -> _CollectorRow:
+    """Fill the timestamp and source file link from the jj annotation of the line.
+
+    jj does not report the line number in the annotated revision, so the link uses the current line number.
+
+    Returns:
+        new _CollectorRow with updated timestamps and source file link.
+
+    """
+    last_edit = arrow.get(annotation.timestamp).format('YYYY-MM-DD')
+    url = ''
+    if metadata:
+        # The working-copy commit is not on the forge, so link the bookmark instead (like uncommitted git lines)
+        revision = metadata.branch if annotation.working_copy else annotation.commit_id
+        url = _blame_url(metadata, rev=revision, path=repo_path, line=lineno)
+
+    return _CollectorRow(
+        tag_name=collector_row.tag_name,
+        comment=collector_row.comment,
+        last_edit=last_edit,
+        source_file=f'[{collector_row.source_file}]({url})' if url else collector_row.source_file,
+        url=url,
     )
 
 
-def _format_record(base_dir: Path, file_path: Path, comment: _CodeTag) -> _CollectorRow:
+def _format_record(
+    comment: _CodeTag,
+    *,
+    rel_path: Path,
+    metadata: RepoMetadata | None,
+    blame: str | None,
+    annotation: AnnotatedLine | None = None,
+    repo_path: str = '',
+) -> _CollectorRow:
     """Format each table row for the code tag summary file. Include git permalink.
 
     Args:
-        base_dir: base path of the project if git directory is not known
-        file_path: path to the file of interest
         comment: _CodeTag information for the matched tag
+        rel_path: path to the file relative to the base directory
+        metadata: repository metadata for the file, if known
+        blame: porcelain blame output for the tag's line, if known
+        annotation: jj annotation for the tag's line, if known
+        repo_path: path to the file relative to the repository root. Used to link the jj annotation
 
     Returns:
         formatted _CollectorRow with file info
 
     """
-    cwd = file_path.parent
-    metadata = get_repo_metadata(cwd=cwd)
-
-    rel_path = file_path.relative_to(base_dir)
     collector_row = _CollectorRow.from_code_tag(
         code_tag=comment,
         last_edit='N/A',
         source_file=f'{rel_path.as_posix()}:{comment.lineno}',
     )
+    if blame:
+        collector_row = _format_from_blame(
+            collector_row=collector_row,
+            blame=blame,
+            metadata=metadata,
+            rel_path=rel_path,
+        )
+    elif annotation:
+        collector_row = _format_from_annotation(
+            collector_row=collector_row,
+            annotation=annotation,
+            metadata=metadata,
+            repo_path=repo_path or rel_path.as_posix(),
+            lineno=comment.lineno,
+        )
+    return collector_row
 
-    vcs = metadata.vcs if metadata else None
-    match vcs:
-        case VcsKind.JUJUTSU:
-            if annotate := jj_file_annotate(file_path=file_path, line=comment.lineno, cwd=cwd):
-                lines = annotate.splitlines()
-                if comment.lineno <= len(lines):
-                    LOGGER.text_debug('jj annotate line', line=lines[comment.lineno - 1])
-        case _:
-            try:
-                blame = git_blame_porcelain(file_path=file_path, line=comment.lineno, cwd=cwd)
-                if blame:
-                    collector_row = _format_from_blame(
-                        collector_row=collector_row,
-                        blame=blame,
-                        metadata=metadata,
-                        rel_path=rel_path,
-                    )
-            except CalledProcessError as exc:
-                handled_errors = (128,)
-                if exc.returncode not in handled_errors:
-                    raise
-                LOGGER.text_debug('Skipping blame', file_path=file_path, exc=exc)
 
-    return collector_row
+async def _annotate_file(
+    file_path: Path,
+    comments: List[_CodeTag],
+    *,
+    metadata: RepoMetadata | None,
+    semaphore: asyncio.Semaphore,
+) -> str | None:
+    """Blame the tagged lines of a file, or annotate the whole file for jj, while holding the semaphore."""
+    async with semaphore:
+        if metadata and metadata.vcs == VcsKind.JUJUTSU:
+            # Annotated once for the whole file because jj has no line-range option
+            return await jj_file_annotate_async(
+                file_path=file_path,
+                line=comments[0].lineno,
+                cwd=file_path.parent,
+                template=JJ_ANNOTATE_TEMPLATE,
+            )
+        linenos = [comment.lineno for comment in comments]
+        return await git_blame_line_porcelain_async(file_path=file_path, lines=linenos, cwd=file_path.parent)
+
+
+async def _annotate_files(
+    files: List[Tuple[Path, List[_CodeTag], RepoMetadata | None]],
+    *,
+    blame_workers: int,
+) -> List[str | None]:
+    """Run the blame for each file concurrently, bounded by `blame_workers`, and return the output in order."""
+    semaphore = asyncio.Semaphore(blame_workers)
+    return await asyncio.gather(
+        *(
+            _annotate_file(file_path, comments, metadata=metadata, semaphore=semaphore)
+            for file_path, comments, metadata in files
+        ),
+    )
+
+
+def _run_annotate_files(
+    files: List[Tuple[Path, List[_CodeTag], RepoMetadata | None]],
+    *,
+    blame_workers: int,
+) -> List[str | None]:
+    """Run `_annotate_files` from synchronous code.
+
+    When called from a running event loop (e.g. from async code), the batch runs on a private loop in a worker
+    thread because `asyncio.run` cannot be nested.
+
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_annotate_files(files, blame_workers=blame_workers))
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, _annotate_files(files, blame_workers=blame_workers)).result()
+
+
+def _format_file_records(
+    base_dir: Path,
+    file_path: Path,
+    comments: List[_CodeTag],
+    *,
+    metadata: RepoMetadata | None,
+    annotate: str | None,
+) -> List[_CollectorRow]:
+    """Format the table rows for all code tags from a single file.
+
+    The file is blamed once for all tagged lines and each row is resolved from the per-line index.
+
+    Args:
+        base_dir: base path of the project if git directory is not known
+        file_path: path to the file of interest
+        comments: _CodeTag information for each matched tag in the file
+        metadata: repository metadata for the file, if known
+        annotate: output from `git blame --line-porcelain` or `jj file annotate` (for jj repositories), if known
+
+    Returns:
+        formatted _CollectorRow for each comment
+
+    """
+    rel_path = file_path.relative_to(base_dir)
+
+    blame_index: Dict[int, str] = {}
+    annotate_index: Dict[int, AnnotatedLine] = {}
+    repo_path = ''
+    if not annotate:
+        LOGGER.text_debug('Skipping blame', file_path=file_path)
+    elif metadata and metadata.vcs == VcsKind.JUJUTSU:
+        annotate_index = parse_jj_annotate(annotate)
+        with suppress(ValueError):
+            repo_path = file_path.relative_to(metadata.root).as_posix()
+    else:
+        blame_index = parse_line_porcelain(annotate)
+
+    return [
+        _format_record(
+            comment,
+            rel_path=rel_path,
+            metadata=metadata,
+            blame=blame_index.get(comment.lineno),
+            annotation=annotate_index.get(comment.lineno),
+            repo_path=repo_path,
+        )
+        for comment in comments
+    ]
+
+
+def _iter_report_rows(
+    base_dir: Path,
+    code_tags: List[_Tags],
+    tag_order: List[str],
+    *,
+    blame_workers: int = _BLAME_WORKERS,
+) -> Iterator[Tuple[Path, _CodeTag, _CollectorRow]]:
+    """Yield the formatted row for each selected code tag by file and line number.
+
+    Files are blamed concurrently in batches, so rows can be streamed without holding every blame in memory.
+
+    Args:
+        base_dir: base directory relative to the searched files
+        code_tags: list of all code tags found in files
+        tag_order: subset of all tags to include in the report
+        blame_workers: maximum number of concurrent blame processes
+
+    Yields:
+        Path relative to `base_dir`, the code tag, and its formatted row
+
+    """
+    repo_index = RepoIndex()
+    selected_files = (
+        (comments.path_source, selected)
+        for comments in sorted(code_tags, key=lambda tc: tc.path_source, reverse=False)
+        if (selected := [comment for comment in comments.code_tags if comment.tag in tag_order])
+    )
+    while batch := list(islice(selected_files, blame_workers * _BLAME_BATCH_FACTOR)):
+        files = [(file_path, selected, repo_index.get_metadata(file_path.parent)) for file_path, selected in batch]
+        outputs = _run_annotate_files(files, blame_workers=blame_workers)
+        for (file_path, selected, metadata), annotate in zip(files, outputs, strict=True):
+            rel_path = file_path.relative_to(base_dir)
+            rows = _format_file_records(base_dir, file_path, selected, metadata=metadata, annotate=annotate)
+            for comment, collector_row in zip(selected, rows, strict=True):
+                yield rel_path, comment, collector_row
+
+
+def _feed_reports(
+    base_dir: Path,
+    code_tags: List[_Tags],
+    tag_order: List[str],
+    reports: Sequence[_MarkdownReport | _JsonLinesReport | _SarifReport],
+    *,
+    blame_workers: int,
+) -> None:
+    """Format each selected code tag once and hand the row to every report."""
+    rows = _iter_report_rows(base_dir, code_tags, tag_order, blame_workers=blame_workers)
+    for rel_path, comment, collector_row in rows:
+        for report in reports:
+            report.add(comment, collector_row, rel_path=rel_path)
 
 
 def _format_report(
     base_dir: Path,
     code_tags: List[_Tags],
     tag_order: List[str],
+    *,
+    blame_workers: int = _BLAME_WORKERS,
 ) -> str:
     """Pretty-format the code tags by file and line number.
 
@@ -243,36 +791,62 @@ def _format_report(
         base_dir: base directory relative to the searched files
         code_tags: list of all code tags found in files
         tag_order: subset of all tags to include in the report and specified order
+        blame_workers: maximum number of concurrent blame processes
 
     Returns:
         str: pretty-formatted text
 
     """
-    output = ''
-    records = []
-    counter: Dict[str, int] = defaultdict(int)
-    for comments in sorted(code_tags, key=lambda tc: tc.path_source, reverse=False):
-        for comment in comments.code_tags:
-            if comment.tag in tag_order:
-                collector_row = _format_record(base_dir, comments.path_source, comment)
-                records.append(
-                    {
-                        'Type': collector_row.tag_name,
-                        'Comment': collector_row.comment,
-                        'Last Edit': collector_row.last_edit,
-                        'Source File': collector_row.source_file,
-                    },
-                )
-                counter[comment.tag] += 1
-    if records:
-        output += '\n' + format_table(headers=[*records[0]], records=records)
-    LOGGER.text_debug('counter', counter=counter)
-
-    sorted_counter = {tag: counter[tag] for tag in tag_order if tag in counter}
-    LOGGER.text_debug('sorted_counter', sorted_counter=sorted_counter)
-    if formatted_summary := ', '.join(f'{tag} ({count})' for tag, count in sorted_counter.items()):
-        output += f'\n\nFound code tags for {formatted_summary}\n'
-    return output
+    markdown = _MarkdownReport(tag_order)
+    try:
+        _feed_reports(base_dir, code_tags, tag_order, [markdown], blame_workers=blame_workers)
+        LOGGER.text_debug('counter', counter=markdown.counter)
+        output = io.StringIO()
+        markdown.write(output)
+    finally:
+        markdown.close()
+    return f'\n{output.getvalue()}\n' if markdown.counter else ''
+
+
+def _write_reports(
+    *,
+    base_dir: Path,
+    code_tags: List[_Tags],
+    tag_order: List[str],
+    path_tag_summary: Path,
+    header: str,
+    path_json_lines: Path | None,
+    path_sarif: Path | None,
+    blame_workers: int,
+) -> None:
+    """Format each code tag once and stream it to every requested report.
+
+    Each report is written to a temporary file that only replaces the report once it is complete, so an error never
+    leaves a truncated report behind.
+
+    """
+    with ExitStack() as stack:
+        markdown = _MarkdownReport(tag_order)
+        stack.callback(markdown.close)
+        reports: List[_MarkdownReport | _JsonLinesReport | _SarifReport] = [markdown]
+        if path_json_lines:
+            reports.append(_JsonLinesReport(stack.enter_context(_replace_when_complete(path_json_lines))))
+        if path_sarif:
+            reports.append(_SarifReport(stack.enter_context(_replace_when_complete(path_sarif)), tag_order))
+
+        _feed_reports(base_dir, code_tags, tag_order, reports, blame_workers=blame_workers)
+        for report in reports[1:]:
+            report.close()
+        LOGGER.text_debug('counter', counter=markdown.counter)
+
+        if markdown.counter:
+            with _replace_when_complete(path_tag_summary) as f_h:
+                f_h.write(f'{header}\n\n')
+                markdown.write(f_h)
+                f_h.write(f'\n\n<!-- {SKIP_PHRASE} -->\n')
+            LOGGER.text('Created Code Tag Summary', path_tag_summary=path_tag_summary)
+        elif path_tag_summary.is_file():
+            path_tag_summary.unlink()
 
 
 def write_code_tag_file(
@@ -283,8 +857,19 @@ def write_code_tag_file(
     regex: str = '',
     tags: str = '',
     header: str = '# Task Summary\n\nAuto-Generated by `corallium`',
+    workers: int = 1,
+    chunksize: int = 64,
+    cache_dir: Path | None = None,
+    scan_bytes: bool = False,
+    scan_git_blobs: bool = False,
+    path_json_lines: Path | None = None,
+    path_sarif: Path | None = None,
+    blame_workers: int = _BLAME_WORKERS,
 ) -> None:
-    """Create the code tag summary file.
+    """Create the code tag summary file and optional machine-readable reports.
+
+    Each code tag is blamed once and streamed to every report, so the reports do not need to be re-parsed from the
+    Markdown summary.
 
     Args:
         path_tag_summary: Path to the output file
@@ -294,19 +879,45 @@ def write_code_tag_file(
             Default is CODE_TAG_RE with tags from tag_order
         tags: subset of all tags to include in the report and specified order. Default is COMMON_CODE_TAGS
         header: header text
+        workers: number of worker processes used to scan files. Default is 1 to scan serially
+        chunksize: number of files sent to each worker process at a time when `workers > 1`
+        cache_dir: optional directory for a persistent cache of the code tags in each file. Unchanged files are
+            not read again on later runs
+        scan_bytes: if True, memory-map each file and search the raw bytes instead of decoding and splitting lines.
+            Faster for large files, but invalid UTF-8 is replaced rather than skipping the file
+        scan_git_blobs: if True and `base_dir` is in a git repository, read the content staged in the git index
+            through a single `git cat-file --batch` process instead of the working tree. Untracked files and files
+            with unstaged changes are read from disk
+        path_json_lines: optional path for a JSON lines report with one object per code tag
+        path_sarif: optional path for a SARIF 2.1.0 report with one result per code tag
+        blame_workers: maximum number of concurrent `git blame` or `jj file annotate` processes. Default is the
+            number of CPUs
 
     """
     tag_order = [t_.strip() for t_ in tags.split(',') if t_] or COMMON_CODE_TAGS
     matcher = (regex or CODE_TAG_RE).format(tag='|'.join(tag_order))
 
-    matches = _search_files(paths_source, re.compile(matcher))
-    if report := _format_report(
-        base_dir,
-        matches,
+    regex_compiled: Pattern[str] | Pattern[bytes]
+    if scan_bytes:  # noqa: SIM108 # a ternary is typed from the bytes branch only
+        regex_compiled = re.compile(matcher.encode('utf-8'), re.MULTILINE)
+    else:
+        regex_compiled = re.compile(matcher)
+    matches = _search_files(
+        paths_source,
+        regex_compiled,
+        prefilter_tags=tag_order,
+        git_root=git_show_toplevel(cwd=base_dir) if scan_git_blobs else None,
+        workers=workers,
+        chunksize=chunksize,
+        path_cache=cache_dir / 'code_tags.jsonl' if cache_dir else None,
+    )
+    _write_reports(
+        base_dir=base_dir,
+        code_tags=matches,
         tag_order=tag_order,
-    ).strip():
-        path_tag_summary.parent.mkdir(exist_ok=True, parents=True)
-        path_tag_summary.write_text(f'{header}\n\n{report}\n\n<!-- {SKIP_PHRASE} -->\n', encoding='utf-8')
-        LOGGER.text('Created Code Tag Summary', path_tag_summary=path_tag_summary)
-    elif path_tag_summary.is_file():
-        path_tag_summary.unlink()
+        path_tag_summary=path_tag_summary,
+        header=header,
+        path_json_lines=path_json_lines,
+        path_sarif=path_sarif,
+        blame_workers=blame_workers,
+    )
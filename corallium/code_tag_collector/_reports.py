@@ -0,0 +1,162 @@
+"""Streaming report writers for the collected code tags.
+
+Each report receives one record at a time so that the tags are collected (and blamed) once for all output formats
+and no report needs to hold every record in memory.
+
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from io import TextIOBase
+from pathlib import Path
+
+from beartype.typing import Any, Dict, List
+
+from corallium.log import LOGGER
+from corallium.markup_table import iter_table_lines
+
+from ._types import _CodeTag, _CollectorRow
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+"""JSON schema for the SARIF 2.1.0 report."""
+
+
+@contextmanager
+def _replace_when_complete(path_report: Path) -> Iterator[TextIOBase]:
+    """Write to a temporary file next to the report and only replace the report if no exception is raised.
+
+    Yields:
+        The temporary file opened for writing
+
+    """
+    path_report.parent.mkdir(exist_ok=True, parents=True)
+    path_tmp = path_report.with_name(f'.{path_report.name}.{os.getpid()}.tmp')
+    try:
+        with path_tmp.open('w', encoding='utf-8') as f_h:
+            yield f_h
+        path_tmp.replace(path_report)
+    finally:
+        path_tmp.unlink(missing_ok=True)
+
+
+def _record(code_tag: _CodeTag, row: _CollectorRow, *, rel_path: Path) -> Dict[str, Any]:
+    """Return the structured fields shared by the JSON reports."""
+    return {
+        'tag': code_tag.tag,
+        'text': code_tag.text,
+        'path': rel_path.as_posix(),
+        'line': code_tag.lineno,
+        'last_edit': None if row.last_edit == 'N/A' else row.last_edit,
+        'url': row.url or None,
+    }
+
+
+class _MarkdownReport:
+    """Markdown table of the code tags followed by a count of each tag.
+
+    The column widths are only known after the last row, so rows are spooled to a temporary file and the table is
+    written in a second pass.
+
+    """
+
+    def __init__(self, tag_order: List[str]) -> None:
+        self.headers = ['Type', 'Comment', 'Last Edit', 'Source File']
+        self.tag_order = tag_order
+        self.counter: Dict[str, int] = defaultdict(int)
+        self._widths = [len(header) for header in self.headers]
+        self._spool = tempfile.TemporaryFile('w+', encoding='utf-8')  # noqa: SIM115
+
+    def add(self, code_tag: _CodeTag, row: _CollectorRow, *, rel_path: Path) -> None:  # noqa: ARG002
+        """Spool the table row for the code tag."""
+        values = [row.tag_name, row.comment, row.last_edit, row.source_file]
+        self._widths = [max(width, len(value.strip())) for width, value in zip(self._widths, values, strict=True)]
+        self._spool.write(json.dumps(values) + '\n')
+        self.counter[code_tag.tag] += 1
+
+    def summary(self) -> str:
+        """Return the count of each tag in the order of `tag_order`."""
+        sorted_counter = {tag: self.counter[tag] for tag in self.tag_order if tag in self.counter}
+        LOGGER.text_debug('sorted_counter', sorted_counter=sorted_counter)
+        return ', '.join(f'{tag} ({count})' for tag, count in sorted_counter.items())
+
+    def write(self, f_h: TextIOBase) -> None:
+        """Write the table and summary. Nothing is written when no rows were added."""
+        if not self.counter:
+            return
+        self._spool.seek(0)
+        rows = (json.loads(line) for line in self._spool)
+        lines = iter_table_lines(self.headers, rows, widths=self._widths)
+        f_h.writelines(f'\n{line}' if idx else line for idx, line in enumerate(lines))
+        f_h.write(f'\n\nFound code tags for {self.summary()}')
+
+    def close(self) -> None:
+        """Remove the spooled rows."""
+        self._spool.close()
+
+
+class _JsonLinesReport:
+    """One JSON object per code tag."""
+
+    def __init__(self, f_h: TextIOBase) -> None:
+        self._f_h = f_h
+
+    def add(self, code_tag: _CodeTag, row: _CollectorRow, *, rel_path: Path) -> None:
+        """Write the record for the code tag."""
+        self._f_h.write(json.dumps(_record(code_tag, row, rel_path=rel_path)) + '\n')
+
+    def close(self) -> None:
+        """Nothing remains to be written."""
+
+
+class _SarifReport:
+    """SARIF 2.1.0 log with one rule per tag and one result per code tag.
+
+    The results are streamed into the JSON array as they are added and the document is closed by `close`.
+
+    """
+
+    def __init__(self, f_h: TextIOBase, tag_order: List[str]) -> None:
+        self._f_h = f_h
+        self._rule_index = {tag: idx for idx, tag in enumerate(tag_order)}
+        rules = [{'id': tag, 'shortDescription': {'text': f'{tag} code tag'}} for tag in tag_order]
+        document = {
+            '$schema': SARIF_SCHEMA,
+            'version': '2.1.0',
+            'runs': [{'tool': {'driver': {'name': 'corallium', 'rules': rules}}, 'results': []}],
+        }
+        # Open the empty results array, which is the last value in the document
+        head = json.dumps(document)
+        self._tail = ']}]}'
+        self._f_h.write(head.removesuffix(self._tail))
+        self._count = 0
+
+    def add(self, code_tag: _CodeTag, row: _CollectorRow, *, rel_path: Path) -> None:
+        """Write the result for the code tag."""
+        record = _record(code_tag, row, rel_path=rel_path)
+        result = {
+            'ruleId': code_tag.tag,
+            'ruleIndex': self._rule_index[code_tag.tag],
+            'level': 'note',
+            'message': {'text': code_tag.text},
+            'locations': [
+                {
+                    'physicalLocation': {
+                        'artifactLocation': {'uri': record['path']},
+                        'region': {'startLine': code_tag.lineno},
+                    },
+                },
+            ],
+            'properties': {'lastEdit': record['last_edit'], 'blameUrl': record['url']},
+        }
+        self._f_h.write((', ' if self._count else '') + json.dumps(result))
+        self._count += 1
+
+    def close(self) -> None:
+        """Close the results array and the document."""
+        self._f_h.write(self._tail + '\n')
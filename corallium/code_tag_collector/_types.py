@@ -0,0 +1,46 @@
+"""Code tag collector types."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+from beartype.typing import List
+
+
+@dataclass(frozen=True)
+class _CodeTag:
+    """Code Tag (FIXME,TODO,etc) with contextual information."""
+
+    lineno: int
+    tag: str
+    text: str
+
+
+@dataclass(frozen=True)
+class _Tags:
+    """Collection of code tags with additional contextual information."""
+
+    path_source: Path
+    code_tags: List[_CodeTag]
+
+
+@dataclass(frozen=True)
+class _CollectorRow:
+    """Each row of the Code Tag table."""
+
+    tag_name: str
+    comment: str
+    last_edit: str
+    source_file: str
+    url: str = ''
+    """Forge permalink to the blamed line, if known."""
+
+    @classmethod
+    def from_code_tag(cls, code_tag: _CodeTag, last_edit: str, source_file: str) -> _CollectorRow:
+        return cls(
+            tag_name=f'{code_tag.tag:>7}',
+            comment=code_tag.text,
+            last_edit=last_edit,
+            source_file=source_file,
+        )
@@ -12,6 +12,7 @@ from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+from .file_search import walk_files
 from .log import LOGGER
 from .tomllib import tomllib
 from .vcs import find_repo_root as find_repo_root  # noqa: PLC0414
@@ -359,7 +360,7 @@ def if_found_unlink(path_file: Path) -> None:
         path_file.unlink()
 
 
-def delete_old_files(dir_path: Path, *, ttl_seconds: int) -> None:
+def delete_old_files(dir_path: Path, *, ttl_seconds: int, workers: int = 1) -> None:
     """Delete old files within the specified directory.
 
     Skips symlinks to avoid deleting files outside the target directory.
@@ -367,13 +368,12 @@ def delete_old_files(dir_path: Path, *, ttl_seconds: int) -> None:
     Args:
         dir_path: Path to directory to delete
         ttl_seconds: if last modified within this number of seconds, will not be deleted
+        workers: number of threads used to walk the directory. See `corallium.file_search.walk_files`
 
     """
-    for pth in dir_path.rglob('*'):
-        # Skip symlinks to avoid deleting files outside directory
-        if pth.is_symlink():
-            continue
-        if pth.is_file() and (time.time() - pth.stat().st_mtime) > ttl_seconds:
+    for rel_path in walk_files(dir_path, skip_symlinks=True, workers=workers):
+        pth = dir_path / rel_path
+        if (time.time() - pth.stat().st_mtime) > ttl_seconds:
             pth.unlink()
 
 
@@ -0,0 +1,160 @@
+"""In-memory index of project files for repeated lookups without rescanning."""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from pathlib import Path
+
+from beartype.typing import Dict, Iterable, Iterator, List, MutableSequence
+
+from .file_search import _find_project_rel_files
+
+
+def _suffixes(name: str) -> List[str]:
+    """Return every suffix and compound suffix of a file name without the leading dot.
+
+    For example, `app.test.ts` has the suffixes `ts` and `test.ts`. Leading dots are part of the stem, so `.gitignore`
+    has no suffix.
+
+    """
+    parts = name.lstrip('.').split('.')[1:]
+    return ['.'.join(parts[idx:]) for idx in range(len(parts) - 1, -1, -1)]
+
+
+class FileIndex:
+    """Project files indexed by suffix, compound suffix, basename, and directory in a single pass.
+
+    Each directory path is stored once and each file only keeps the id of its directory and an interned basename, so
+    common names like `__init__.py` are shared. The suffix and directory tables hold compact arrays of file ids and
+    files with the same basename are chained through a single array, which keeps an index of several hundred thousand
+    paths small enough to keep in memory. Results are returned in the listed order.
+
+    Example:
+        >>> from pathlib import Path
+        >>> index = FileIndex.from_project(Path('.'))
+        >>> ts_tests = index.by_suffix('test.ts', 'spec.ts')
+        >>> dockerfiles = index.by_name('Dockerfile')
+        >>> src_files = index.under('src')
+
+    """
+
+    def __init__(self, rel_paths: Iterable[str], *, root: Path) -> None:
+        """Index the files.
+
+        Args:
+            rel_paths: POSIX paths relative to `root`
+            root: directory that the paths are relative to
+
+        """
+        self.root = root
+        self._dirs: List[str] = []
+        dir_ids: Dict[str, int] = {}
+        self._file_dirs = array('I')
+        self._file_names: List[str] = []
+        self._by_suffix: Dict[str, MutableSequence[int]] = {}
+        self._by_name: Dict[str, int] = {}
+        self._next_same_name = array('i')
+        last_same_name: Dict[str, int] = {}
+        self._by_dir: Dict[int, MutableSequence[int]] = {}
+        for file_id, rel_path in enumerate(rel_paths):
+            rel_dir, _sep, name = rel_path.rpartition('/')
+            if (dir_id := dir_ids.get(rel_dir)) is None:
+                dir_id = dir_ids[rel_dir] = len(self._dirs)
+                self._dirs.append(rel_dir)
+            name = sys.intern(name)
+            self._file_dirs.append(dir_id)
+            self._file_names.append(name)
+            self._by_dir.setdefault(dir_id, array('I')).append(file_id)
+            self._next_same_name.append(-1)
+            if (previous := last_same_name.get(name)) is None:
+                self._by_name[name] = file_id
+            else:
+                self._next_same_name[previous] = file_id
+            last_same_name[name] = file_id
+            for suffix in _suffixes(name) or ['']:
+                self._by_suffix.setdefault(suffix, array('I')).append(file_id)
+
+    @classmethod
+    def from_project(
+        cls,
+        path_project: Path,
+        *,
+        ignore_patterns: list[str] | None = None,
+        include_patterns: list[str] | None = None,
+    ) -> FileIndex:
+        """Index the files from `find_project_files`."""
+        include_patterns = include_patterns or []
+        rel_paths = _find_project_rel_files(path_project, ignore_patterns or [], include_patterns=include_patterns)
+        return cls(rel_paths, root=path_project)
+
+    def __len__(self) -> int:
+        """Return the number of indexed files."""
+        return len(self._file_names)
+
+    def __iter__(self) -> Iterator[Path]:
+        """Iterate over all files in the listed order."""
+        return self._paths(range(len(self)))
+
+    def _rel_path(self, file_id: int) -> str:
+        rel_dir = self._dirs[self._file_dirs[file_id]]
+        name = self._file_names[file_id]
+        return f'{rel_dir}/{name}' if rel_dir else name
+
+    def _paths(self, file_ids: Iterable[int]) -> Iterator[Path]:
+        return (self.root / self._rel_path(file_id) for file_id in file_ids)
+
+    def _same_name(self, name: str) -> Iterator[int]:
+        file_id = self._by_name.get(name, -1)
+        while file_id != -1:
+            yield file_id
+            file_id = self._next_same_name[file_id]
+
+    def _union(self, groups: Iterable[Iterable[int]]) -> List[Path]:
+        file_ids: set[int] = set()
+        for group in groups:
+            file_ids.update(group)
+        return list(self._paths(sorted(file_ids)))
+
+    def by_suffix(self, *suffixes: str) -> List[Path]:
+        """Return the files with any of the suffixes.
+
+        Args:
+            *suffixes: simple or compound suffixes with or without the leading dot (e.g. `py`, `.py`, or `test.ts`).
+                Use `''` for files without a suffix
+
+        Returns:
+            Matching files in the listed order
+
+        """
+        return self._union(self._by_suffix.get(suffix.removeprefix('.'), ()) for suffix in suffixes)
+
+    def by_name(self, *names: str) -> List[Path]:
+        """Return the files with any of the basenames (e.g. `Dockerfile`)."""
+        return self._union(map(self._same_name, names))
+
+    def under(self, prefix: str) -> List[Path]:
+        """Return the files within a directory and its subdirectories.
+
+        Args:
+            prefix: directory relative to the root as a POSIX path. Use `''` for all files
+
+        Returns:
+            Matching files in the listed order
+
+        """
+        prefix = prefix.strip('/')
+        nested = f'{prefix}/'
+        file_ids: List[int] = []
+        for dir_id, rel_dir in enumerate(self._dirs):
+            if not prefix or rel_dir == prefix or rel_dir.startswith(nested):
+                file_ids.extend(self._by_dir[dir_id])
+        return list(self._paths(sorted(file_ids)))
+
+    def suffix_groups(self) -> Dict[str, List[Path]]:
+        """Group the files by their last suffix like `find_project_files_by_suffix`."""
+        groups: Dict[str, List[Path]] = {}
+        for file_id, name in enumerate(self._file_names):
+            suffix = next(iter(_suffixes(name)), '')
+            groups.setdefault(suffix, []).append(self.root / self._rel_path(file_id))
+        return groups
@@ -5,32 +5,141 @@ Migrated from calcipy.file_search for git-based file discovery.
 
 from __future__ import annotations
 
+import os
+import re
+import time
 from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import chain
 from pathlib import Path
+from subprocess import CalledProcessError
+
+from beartype.typing import Dict, Iterator, List, Pattern, Sequence, Tuple
 
 from corallium.log import LOGGER
-from corallium.vcs._git_commands import git_ls_files
+from corallium.vcs._git_commands import git_ls_files, git_ls_files_existing, iter_git_ls_files_existing
+from corallium.vcs._gitignore import Gitignore, _translate_component, is_ignored
+from corallium.vcs._inventory import FileInventory
 from corallium.vcs._jj_commands import jj_file_list
+from corallium.vcs._repo import detect_vcs_kind, find_repo_root
+from corallium.vcs._types import VcsKind
+
+
+def _scan_dir(path: Path) -> List[os.DirEntry[str]]:
+    """Return the entries of a directory, or an empty list if it cannot be read."""
+    try:
+        with os.scandir(path) as entries:
+            return list(entries)
+    except OSError as exc:
+        LOGGER.debug('Skipping unreadable directory', path=path, exc=exc)
+        return []
+
+
+_Gitignores = Tuple[Tuple[str, Gitignore], ...]
+"""`(directory, Gitignore)` pairs that apply to a directory, from the outermost to innermost."""
+
+
+@dataclass(frozen=True)
+class _WalkOptions:
+    """Settings shared by every directory scan of a walk."""
 
+    cwd: Path
+    prune: Pattern[str] | None
+    use_gitignore: bool
+    skip_symlinks: bool
 
-def _walk_files(*, cwd: Path) -> list[str]:
+
+def _walk_dir(
+    rel_dir: str,
+    gitignores: _Gitignores,
+    *,
+    options: _WalkOptions,
+) -> tuple[list[str], list[tuple[str, _Gitignores]]]:
+    """Scan a single directory.
+
+    Returns:
+        Tuple of (file paths, subdirectories to walk with the `.gitignore` files that apply to them)
+
+    """
+    entries = _scan_dir(options.cwd / rel_dir)
+    if options.use_gitignore:
+        entries = [entry for entry in entries if entry.name != '.git']
+        if any(entry.name == '.gitignore' and entry.is_file() for entry in entries):
+            gitignores = (*gitignores, (rel_dir, Gitignore.from_path(options.cwd / rel_dir / '.gitignore')))
+    files: list[str] = []
+    subdirs: list[tuple[str, _Gitignores]] = []
+    for entry in entries:
+        if options.skip_symlinks and entry.is_symlink():
+            continue
+        rel_path = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+        is_dir = entry.is_dir(follow_symlinks=False)
+        if gitignores and is_ignored(gitignores, rel_path, is_dir=is_dir):
+            continue
+        if is_dir:
+            if not (options.prune and options.prune.match(rel_path)):
+                subdirs.append((rel_path, gitignores))
+        elif entry.is_file() or (options.use_gitignore and entry.is_symlink()):
+            files.append(rel_path)
+    return files, subdirs
+
+
+def walk_files(
+    cwd: Path,
+    *,
+    ignore_patterns: list[str] | None = None,
+    use_gitignore: bool = False,
+    skip_symlinks: bool = False,
+    workers: int = 1,
+) -> list[str]:
     """Get all files using recursive filesystem walk.
 
+    Uses `os.scandir` so that the file type comes from the directory entry without an extra `stat` call. Directories
+    that are entirely ignored by `ignore_patterns` are never entered. Symbolic links to directories are not followed.
+
+    With `workers > 1`, each directory is scanned as a separate task on a thread pool and newly found directories are
+    queued as they are discovered, so idle threads pick up the remaining work. This helps on network filesystems where
+    each directory read has high latency. The result is sorted, so it does not depend on the scheduling.
+
     Args:
         cwd: directory to search recursively
+        ignore_patterns: optional glob ignore patterns used to prune directories during the walk
+        use_gitignore: if True, apply `.git/info/exclude` and the nested `.gitignore` files while walking and skip
+            `.git`. The result then matches `git ls-files --others --exclude-standard`, except for the global git
+            excludes file. Like git, symbolic links are listed as files
+        skip_symlinks: if True, exclude all symbolic links
+        workers: number of threads used to scan directories. Default is 1 to walk serially
 
     Returns:
         list of all file paths relative to cwd
 
     """
-    files = []
-    for path in cwd.rglob('*'):
-        if path.is_file():
-            try:
-                rel_path = path.relative_to(cwd)
-                files.append(rel_path.as_posix())
-            except ValueError:
-                LOGGER.debug('Skipping path outside cwd', path=path, cwd=cwd)
+    options = _WalkOptions(
+        cwd=cwd,
+        prune=_compile_prune_patterns(ignore_patterns or []),
+        use_gitignore=use_gitignore,
+        skip_symlinks=skip_symlinks,
+    )
+    root_gitignores: _Gitignores = ()
+    if use_gitignore and (path_exclude := cwd / '.git' / 'info' / 'exclude').is_file():
+        root_gitignores = (('', Gitignore.from_path(path_exclude)),)
+    files: list[str] = []
+    if workers <= 1:
+        stack: list[tuple[str, _Gitignores]] = [('', root_gitignores)]
+        while stack:
+            dir_files, subdirs = _walk_dir(*stack.pop(), options=options)
+            files.extend(dir_files)
+            stack.extend(subdirs)
+        return sorted(files)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(_walk_dir, '', root_gitignores, options=options)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                dir_files, subdirs = future.result()
+                files.extend(dir_files)
+                pending.update(executor.submit(_walk_dir, *subdir, options=options) for subdir in subdirs)
     return sorted(files)
 
 
@@ -57,29 +166,145 @@ def _get_default_ignore_patterns() -> list[str]:
     ]
 
 
-def _get_all_files(*, cwd: Path) -> tuple[list[str], bool]:
+def _get_all_files(*, cwd: Path, ignore_patterns: list[str] | None = None) -> tuple[list[str], bool]:
     """Get all files using git, falling back to filesystem walk.
 
     Args:
         cwd: Current working directory to pass to git command
+        ignore_patterns: optional glob ignore patterns used to prune the filesystem walk. A walk without a `.git`
+            directory or a root `.gitignore` file falls back to the default ignore patterns
 
     Returns:
-        Tuple of (file paths, used_git)
+        Tuple of (file paths, used_git). `used_git` is also True for jj and for a walk that applied `.gitignore` files
 
     """
     if (files := git_ls_files(cwd=cwd)) is not None:
         return files, True
+    return _get_files_without_git(cwd=cwd, ignore_patterns=ignore_patterns)
 
+
+def _get_files_without_git(*, cwd: Path, ignore_patterns: list[str] | None = None) -> tuple[list[str], bool]:
+    """Get all files using jj, falling back to filesystem walk. See `_get_all_files`."""
     if (files := jj_file_list(cwd=cwd)) is not None:
         return files, True
+    return _walk_project_files(cwd=cwd, ignore_patterns=ignore_patterns)
+
+
+def _walk_project_files(*, cwd: Path, ignore_patterns: list[str] | None) -> tuple[list[str], bool]:
+    """Get all files with a filesystem walk that applies the `.gitignore` files in a git working tree.
+
+    Returns:
+        Tuple of (file paths, used_gitignore)
+
+    """
+    if (cwd / '.git').exists() or (cwd / '.gitignore').is_file():
+        LOGGER.debug('VCS not available, using .gitignore-aware filesystem walk', cwd=cwd)
+        return walk_files(cwd, ignore_patterns=ignore_patterns, use_gitignore=True), True
 
     LOGGER.debug('VCS not available, using filesystem walk', cwd=cwd)
-    return _walk_files(cwd=cwd), False
+    return walk_files(cwd, ignore_patterns=ignore_patterns or _get_default_ignore_patterns()), False
+
+
+_INVENTORY = FileInventory()
+"""Listings from git or jj that are reused until the repository or a listed directory changes."""
+
+
+def _list_existing_files(path_project: Path, *, ignore_patterns: list[str]) -> tuple[list[str], bool]:
+    """List the project files that exist and cache the inventory.
+
+    Files deleted from a git working tree are found in bulk from the index by `git_ls_files_existing`. Only listings
+    from jj or a filesystem walk are checked with a `stat` per file. Only listings from git or jj are cached, because
+    a walk is pruned by `ignore_patterns` and includes untracked files.
+
+    Args:
+        path_project: Path to the project directory
+        ignore_patterns: glob ignore patterns from the caller used to prune a filesystem walk
+
+    Returns:
+        Tuple of (file paths, used_git) as in `_get_all_files`
+
+    """
+    start_ns = time.time_ns()
+    if (listed := git_ls_files_existing(cwd=path_project)) is not None:
+        existing, missing = listed
+        used_git = from_vcs = True
+    else:
+        if (jj_files := jj_file_list(cwd=path_project)) is not None:
+            rel_filepaths, used_git, from_vcs = jj_files, True, True
+        else:
+            rel_filepaths, used_git = _walk_project_files(cwd=path_project, ignore_patterns=ignore_patterns)
+            from_vcs = False
+        existing, missing = [], []
+        for rel_file in rel_filepaths:
+            (existing if (path_project / rel_file).is_file() else missing).append(rel_file)
+    for rel_file in missing:
+        LOGGER.warning('Could not find the specified file', path_file=path_project / rel_file)
+    if from_vcs:
+        _INVENTORY.set(path_project, existing, start_ns=start_ns)
+    return existing, used_git
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate a glob ignore pattern into a regex for relative POSIX paths.
+
+    Each `*`, `?`, and `[...]` matches within a single path component and `**` matches any number of components.
+    A pattern starting with `/` is anchored to the start of the path, while other patterns match at any directory
+    level. Leading `*` and `**` components of unanchored patterns are redundant and dropped.
+
+    """
+    anchored = pattern.startswith('/')
+    parts = [part for part in pattern.strip('/').split('/') if part]
+    while not anchored and parts and parts[0] in {'*', '**'} and len(parts) > 1:
+        parts.pop(0)
+    out = []
+    for idx, part in enumerate(parts):
+        is_last = idx == len(parts) - 1
+        if part == '**':
+            out.append('[^/]+' if is_last else '(?:[^/]+/)*')
+        else:
+            out.append(_translate_component(part) + ('' if is_last else '/'))
+    return ''.join(out) if anchored else f'(?:.*/)?{"".join(out)}'
+
+
+def _compile_ignore_patterns(ignore_patterns: List[str]) -> Pattern[str] | None:
+    """Compile all glob ignore patterns into one regex matched against relative POSIX paths.
+
+    A path is matched when it, or any of its parent directories, matches a pattern. Case-insensitive on Windows.
+
+    Args:
+        ignore_patterns: Glob ignore patterns (e.g., ['*.pyc', '**/__pycache__/**'])
+
+    Returns:
+        Compiled regex for `re.match`, or None if there are no patterns
+
+    """
+    if not (translated := [_translate_glob(pat) for pat in ignore_patterns if pat.strip('/')]):
+        return None
+    flags = re.DOTALL | (re.IGNORECASE if os.name == 'nt' else 0)
+    return re.compile(f'(?:{"|".join(translated)})(?:/.*)?\\Z', flags)
+
+
+def _compile_prune_patterns(ignore_patterns: List[str]) -> Pattern[str] | None:
+    """Compile the glob ignore patterns into one regex for directories where every descendant is ignored.
+
+    Any directory that matches a pattern is ignored with its contents, as is a directory `dir` for a pattern `dir/**`.
+
+    Args:
+        ignore_patterns: Glob ignore patterns (e.g., ['*.pyc', '**/__pycache__/**'])
+
+    Returns:
+        Compiled regex for `re.match` on relative POSIX directory paths, or None if there are no patterns
+
+    """
+    dir_patterns = [pat.removesuffix('/**') for pat in ignore_patterns if pat.endswith('/**')]
+    return _compile_ignore_patterns([*ignore_patterns, *dir_patterns])
 
 
 def _filter_files(rel_filepaths: list[str], ignore_patterns: list[str]) -> list[str]:
     """Filter a list of string file paths with specified ignore patterns in glob syntax.
 
+    The patterns are compiled into a single regex and matched on the path strings without filesystem access.
+
     Args:
         rel_filepaths: List of string file paths
         ignore_patterns: Glob ignore patterns (e.g., ['*.pyc', '__pycache__/*'])
@@ -88,25 +313,108 @@ def _filter_files(rel_filepaths: list[str], ignore_patterns: list[str]) -> list[
         List of all non-ignored file path names
 
     """
-    if ignore_patterns:
-        matches = []
-        for fp in rel_filepaths:
-            pth = Path(fp).resolve()
-            if not any(pth.match(pat) for pat in ignore_patterns):
-                matches.append(fp)
-        return matches
+    if matcher := _compile_ignore_patterns(ignore_patterns):
+        return [fp for fp in rel_filepaths if not matcher.match(fp)]
+    return rel_filepaths
+
+
+def _select_files(rel_filepaths: list[str], include_patterns: list[str]) -> list[str]:
+    """Keep the file paths that match any include pattern, or all paths when there are no patterns.
+
+    Include patterns use the same glob syntax as `_filter_files`, so a pattern for a directory includes its contents.
+
+    """
+    if matcher := _compile_ignore_patterns(include_patterns):
+        return [fp for fp in rel_filepaths if matcher.match(fp)]
     return rel_filepaths
 
 
-def find_project_files(path_project: Path, ignore_patterns: list[str]) -> list[Path]:
+def _pushdown_globs(pattern: str) -> list[str] | None:
+    """Translate a glob pattern into the globs of git pathspecs and jj filesets that select the same paths.
+
+    Returns:
+        Globs matching like `_compile_ignore_patterns`, or None if the pattern uses a backslash or a `[^...]` set,
+        which are special only for git and jj
+
+    """
+    if '\\' in pattern or '[^' in pattern:
+        return None
+    anchored = pattern.startswith('/')
+    parts = [part for part in pattern.strip('/').split('/') if part]
+    while not anchored and parts and parts[0] in {'*', '**'} and len(parts) > 1:
+        parts.pop(0)
+    glob = '/'.join(parts) if anchored else '/'.join(['**', *parts])
+    # Like `_compile_ignore_patterns`, also match the contents of a matching directory
+    return [glob] if parts[-1] == '**' else [glob, f'{glob}/**']
+
+
+def _git_pathspecs(include_patterns: list[str]) -> list[str] | None:
+    """Translate the include patterns into `:(glob)` pathspecs, or None if any cannot be."""
+    magic = 'glob,icase' if os.name == 'nt' else 'glob'
+    pathspecs: list[str] = []
+    for pattern in filter(lambda pat: pat.strip('/'), include_patterns):
+        if (globs := _pushdown_globs(pattern)) is None:
+            return None
+        pathspecs.extend(f':({magic}){glob}' for glob in globs)
+    return pathspecs
+
+
+def _jj_fileset(include_patterns: list[str]) -> str | None:
+    """Translate the include patterns into a jj fileset expression, or None if any cannot be."""
+    filesets: list[str] = []
+    for pattern in filter(lambda pat: pat.strip('/'), include_patterns):
+        if (globs := _pushdown_globs(pattern)) is None:
+            return None
+        filesets.extend('glob:"{}"'.format(glob.replace('"', '\\"')) for glob in globs)
+    return ' | '.join(filesets)
+
+
+def _list_matching_files(path_project: Path, *, include_patterns: list[str]) -> list[str] | None:
+    """List the existing files that match the include patterns by pushing them down to git or jj.
+
+    Only the include patterns are pushed down. The ignore patterns are applied afterward because the listing is
+    already limited and git can skip `:(exclude)` pathspecs when the include pathspecs share a leading directory.
+
+    Returns:
+        Matching file paths, or None if there are no include patterns, no repository, or the patterns cannot be
+        translated
+
+    """
+    if not include_patterns or not (repo_root := find_repo_root(path_project)):
+        return None
+    vcs_kind = detect_vcs_kind(repo_root)
+    if vcs_kind == VcsKind.JUJUTSU:
+        fileset = _jj_fileset(include_patterns)
+        files = jj_file_list(cwd=path_project, fileset=fileset) if fileset else None
+        return None if files is None else [rel_file for rel_file in files if (path_project / rel_file).is_file()]
+    pathspecs = _git_pathspecs(include_patterns)
+    if not pathspecs or (listed := git_ls_files_existing(cwd=path_project, pathspecs=pathspecs)) is None:
+        return None
+    existing, missing = listed
+    for rel_file in missing:
+        LOGGER.warning('Could not find the specified file', path_file=path_project / rel_file)
+    return existing
+
+
+def find_project_files(
+    path_project: Path,
+    ignore_patterns: list[str],
+    *,
+    include_patterns: list[str] | None = None,
+) -> list[Path]:
     """Find project files in git version control or via filesystem walk.
 
-    Note: Uses git ls-files and verifies that each file exists.
+    Note: Uses git ls-files and skips files deleted from the working tree. The listing is cached until the repository
+    or a listed directory changes (see `FileInventory`).
     Falls back to recursive filesystem walk when git is unavailable.
 
+    Without a cached listing, the include patterns are passed to `git ls-files` as pathspecs or to `jj file list` as a
+    fileset so only the matching files are listed. Otherwise, the patterns are applied to the full listing.
+
     Args:
         path_project: Path to the project directory
         ignore_patterns: Glob ignore patterns
+        include_patterns: optional glob patterns that a file, or one of its directories, must match to be included
 
     Returns:
         List of Path objects for all tracked, non-ignored files
@@ -119,8 +427,26 @@ def find_project_files(path_project: Path, ignore_patterns: list[str]) -> list[P
         ... )
 
     """
-    file_paths = []
-    rel_filepaths, used_git = _get_all_files(cwd=path_project)
+    rel_filepaths = _find_project_rel_files(path_project, ignore_patterns, include_patterns=include_patterns or [])
+    return [path_project / rel_file for rel_file in rel_filepaths]
+
+
+def _find_project_rel_files(
+    path_project: Path,
+    ignore_patterns: list[str],
+    *,
+    include_patterns: list[str],
+) -> list[str]:
+    """Return the paths of `find_project_files` as POSIX strings relative to `path_project`."""
+    if (cached := _INVENTORY.get(path_project)) is None and (
+        matched := _list_matching_files(path_project, include_patterns=include_patterns)
+    ) is not None:
+        return _filter_files(matched, ignore_patterns)
+
+    if cached is not None:
+        rel_filepaths, used_git = cached, True
+    else:
+        rel_filepaths, used_git = _list_existing_files(path_project, ignore_patterns=ignore_patterns)
 
     effective_patterns = ignore_patterns
     if not used_git and not ignore_patterns:
@@ -134,28 +460,80 @@ def find_project_files(path_project: Path, ignore_patterns: list[str]) -> list[P
         rel_filepaths=rel_filepaths,
         ignore_patterns=effective_patterns,
     )
-    for rel_file in filtered_rel_files:
-        path_file = path_project / rel_file
-        if path_file.is_file():
-            file_paths.append(path_file)
-        else:  # pragma: no cover
-            LOGGER.warning('Could not find the specified file', path_file=path_file)
-    return file_paths
+    return _select_files(filtered_rel_files, include_patterns)
+
+
+def _stream_git_files(cwd: Path, *, pathspecs: list[str]) -> Iterator[tuple[str, bool]] | None:
+    """Start streaming `git ls-files` with whether each file exists, or None if git fails before listing any file."""
+    stream = iter_git_ls_files_existing(cwd=cwd, pathspecs=pathspecs)
+    try:
+        first = next(stream)
+    except StopIteration:
+        return iter(())
+    except CalledProcessError:
+        return None
+    return chain([first], stream)
+
+
+def iter_project_files(
+    path_project: Path,
+    ignore_patterns: list[str],
+    *,
+    include_patterns: list[str] | None = None,
+) -> Iterator[Path]:
+    """Yield the same files as `find_project_files` while they are listed.
+
+    Paths are streamed from `git ls-files -z`, so the first files are available before git finishes and memory use
+    does not grow with the size of the repository. The include patterns are passed to git as pathspecs when possible,
+    while the ignore patterns and the existence check are applied to each path as it is read. A cached inventory is
+    used when current, and jj or the filesystem walk are used without streaming when git is unavailable.
+
+    Args:
+        path_project: Path to the project directory
+        ignore_patterns: Glob ignore patterns
+        include_patterns: optional glob patterns as in `find_project_files`
+
+    Yields:
+        Path objects for the tracked, non-ignored files
+
+    """
+    include_patterns = include_patterns or []
+    pathspecs = _git_pathspecs(include_patterns)
+    if (
+        _INVENTORY.get(path_project) is None
+        and (rel_filepaths := _stream_git_files(path_project, pathspecs=pathspecs or [])) is not None
+    ):
+        ignore_matcher = _compile_ignore_patterns(ignore_patterns)
+        include_matcher = None if pathspecs else _compile_ignore_patterns(include_patterns)
+        for rel_file, exists in rel_filepaths:
+            if (ignore_matcher and ignore_matcher.match(rel_file)) or (
+                include_matcher and not include_matcher.match(rel_file)
+            ):
+                continue
+            if exists:
+                yield path_project / rel_file
+            else:
+                LOGGER.warning('Could not find the specified file', path_file=path_project / rel_file)
+        return
+    yield from find_project_files(path_project, ignore_patterns, include_patterns=include_patterns)
 
 
 def find_project_files_by_suffix(
     path_project: Path,
     *,
     ignore_patterns: list[str] | None = None,
+    include_patterns: list[str] | None = None,
 ) -> dict[str, list[Path]]:
     """Find project files in git version control grouped by file extension.
 
-    Note: Uses git ls-files and verifies that each file exists.
+    Note: Uses git ls-files and skips files deleted from the working tree. The listing is cached until the repository
+    or a listed directory changes (see `FileInventory`).
     Falls back to recursive filesystem walk when git is unavailable.
 
     Args:
         path_project: Path to the project directory
         ignore_patterns: Glob ignore patterns (optional)
+        include_patterns: Glob include patterns as in `find_project_files` (optional)
 
     Returns:
         Dictionary where keys are file extensions (without leading dot) and
@@ -172,6 +550,55 @@ def find_project_files_by_suffix(
 
     """
     file_lookup: dict[str, list[Path]] = defaultdict(list)
-    for path_file in find_project_files(path_project, ignore_patterns or []):
+    for path_file in find_project_files(path_project, ignore_patterns or [], include_patterns=include_patterns):
         file_lookup[path_file.suffix.lstrip('.')].append(path_file)
     return dict(file_lookup)
+
+
+def find_workspace_files(
+    roots: Sequence[Path],
+    *,
+    ignore_patterns: list[str] | None = None,
+    include_patterns: list[str] | None = None,
+    workers: int | None = None,
+) -> Dict[Path, Path]:
+    """Find the project files of several repositories at once, listing each root concurrently.
+
+    Each root is listed like `find_project_files` on a thread pool, so the `git ls-files` or `jj file list`
+    subprocesses of different repositories run in parallel. Files found from more than one root, such as a repository
+    nested in another root, are only included once and attributed to the deepest root that contains them.
+
+    Args:
+        roots: directories to search, typically the root of each repository in a workspace
+        ignore_patterns: Glob ignore patterns applied to every root
+        include_patterns: optional glob patterns as in `find_project_files`
+        workers: maximum number of roots listed at the same time. Defaults to the number of CPUs
+
+    Returns:
+        Mapping of each file to its root, ordered by the given roots and then by the listing of each root
+
+    Example:
+        >>> from pathlib import Path
+        >>> files = find_workspace_files([Path('repo_a'), Path('repo_b')], ignore_patterns=['*.pyc'])
+        >>> repo_a_files = [path for path, root in files.items() if root == Path('repo_a').resolve()]
+
+    """
+    unique_roots = list(dict.fromkeys(root.resolve() for root in roots))
+    ignore_patterns = ignore_patterns or []
+    include_patterns = include_patterns or []
+
+    def list_root(root: Path) -> list[Path]:
+        return [
+            root / rel_file
+            for rel_file in _find_project_rel_files(root, ignore_patterns, include_patterns=include_patterns)
+        ]
+
+    max_workers = max(1, min(workers or os.cpu_count() or 1, len(unique_roots)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        listings = dict(zip(unique_roots, executor.map(list_root, unique_roots), strict=True))
+
+    owners: Dict[Path, Path] = {}
+    for root in sorted(unique_roots, key=lambda root: len(root.parts), reverse=True):
+        for path_file in listings[root]:
+            owners.setdefault(path_file, root)
+    return {path_file: root for root in unique_roots for path_file in listings[root] if owners[path_file] == root}
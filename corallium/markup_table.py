@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from itertools import starmap
 from typing import Any
 
@@ -38,9 +38,62 @@ def format_table(
         | Alice | 30  | 95    |
         | Bob   | 25  | 88    |
 
-    """
+    """  # noqa: DOC502 # raised by iter_table_lines
     table = [[str(r_[col]) for col in headers] for r_ in records]
     widths = [max(len(row[col_idx].strip()) for row in [headers, *table]) for col_idx in range(len(headers))]
+    return '\n'.join(iter_table_lines(headers, table, widths=widths, delimiters=delimiters))
+
+
+def iter_table_lines(
+    headers: list[str],
+    rows: Iterable[list[str]],
+    *,
+    widths: list[int],
+    delimiters: list[str] | None = None,
+) -> Iterator[str]:
+    """Yield the lines of a formatted table with precomputed column widths.
+
+    Allows writing large tables without holding every row in memory. See `format_table` for the arguments.
+
+    Args:
+        headers: column titles
+        rows: iterable of row values in the same order as the headers
+        widths: width of each column. Must be at least the stripped length of every header and value in the column
+        delimiters: optional list to allow for alignment (e.g., [':-', '-:', ':-:'])
+
+    Returns:
+        Iterator of the formatted header, separator, and data rows
+
+    Raises:
+        ValueError: if delimiters count doesn't match headers or uses invalid values. Raised when called rather than
+            on the first iteration
+
+    """
+    if delimiters:
+        errors = []
+        if len(delimiters) != len(headers):
+            errors.append(f'Incorrect number of delimiters provided ({len(delimiters)}). Expected: ({len(headers)})')
+        allowed_delimiters = {'-', ':-', '-:', ':-:'}
+        if not all(delim in allowed_delimiters for delim in delimiters):
+            errors.append(f'Delimiters must be one of {allowed_delimiters}. Received: {delimiters}')
+        if errors:
+            raise ValueError(' and '.join(errors))
+    return _iter_table_lines(headers, rows, widths=widths, delimiters=delimiters)
+
+
+def _iter_table_lines(
+    headers: list[str],
+    rows: Iterable[list[str]],
+    *,
+    widths: list[int],
+    delimiters: list[str] | None,
+) -> Iterator[str]:
+    """Generate the lines for `iter_table_lines` after the delimiters were validated.
+
+    Yields:
+        Formatted header, separator, and data rows
+
+    """
 
     def pad(values: list[str]) -> list[str]:
         return [val.strip().ljust(widths[col_idx]) for col_idx, val in enumerate(values)]
@@ -56,21 +109,9 @@ def format_table(
             expanded = expanded[:-1] + ':'
         return expanded
 
-    if delimiters:
-        errors = []
-        if len(delimiters) != len(headers):
-            errors.append(f'Incorrect number of delimiters provided ({len(delimiters)}). Expected: ({len(headers)})')
-        allowed_delimiters = {'-', ':-', '-:', ':-:'}
-        if not all(delim in allowed_delimiters for delim in delimiters):
-            errors.append(f'Delimiters must be one of {allowed_delimiters}. Received: {delimiters}')
-        if errors:
-            raise ValueError(' and '.join(errors))
-
     delimiter_values = delimiters or ['-'] * len(headers)
     expanded_delimiters = list(starmap(expand_delimiters, zip(delimiter_values, widths, strict=True)))
-    lines = [
-        join(pad(headers)),
-        join(expanded_delimiters, ''),
-        *[join(pad(row)) for row in table],
-    ]
-    return '\n'.join(lines)
+    yield join(pad(headers))
+    yield join(expanded_delimiters, '')
+    for row in rows:
+        yield join(pad(row))
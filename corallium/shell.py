@@ -3,11 +3,26 @@
 from __future__ import annotations
 
 import asyncio
+import codecs
+import io
+import locale
+import os
+import queue
+import selectors
+import signal
 import subprocess
 import sys
-from collections.abc import Callable
+import tempfile
+import threading
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator, Callable, Generator, Iterable, Iterator, Sequence
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
 from pathlib import Path
-from time import time
+from time import monotonic, time
+from typing import IO
+
+from typing_extensions import Self
 
 from .log import LOGGER
 
@@ -29,11 +44,12 @@ _DANGEROUS_PATTERNS = frozenset(
 )
 
 
-def _validate_shell_command(cmd: str) -> None:
+def _validate_shell_command(cmd: str | Sequence[str]) -> None:
     """Validate shell command for potentially dangerous patterns.
 
     This is a best-effort check to detect obvious command injection attempts.
     It is not foolproof and should not be relied upon as the sole security measure.
+    Argv commands are not checked because they run without a shell.
 
     Args:
         cmd: The command to validate
@@ -42,6 +58,8 @@ def _validate_shell_command(cmd: str) -> None:
         ValueError: If dangerous patterns are detected
 
     """
+    if not isinstance(cmd, str):
+        return
     for pattern in _DANGEROUS_PATTERNS:
         if pattern in cmd:
             msg = (
@@ -51,8 +69,176 @@ def _validate_shell_command(cmd: str) -> None:
             raise ValueError(msg)
 
 
+_CHUNK_SIZE = 65_536
+"""Maximum number of bytes read from a pipe at a time."""
+
+_ByteStream = IO[bytes] | io.BufferedIOBase
+"""Binary output of a process, including in-memory streams from test doubles."""
+
+
+def _remaining(deadline: float | None) -> float | None:
+    """Return the seconds left before the deadline, which may be negative, or None without a deadline."""
+    return None if deadline is None else deadline - monotonic()
+
+
+@contextmanager
+def _command_not_found(cmd: str | Sequence[str], *, cwd: Path | None) -> Generator[None, None, None]:
+    """Raise `CalledProcessError` with return code 127, like the shell, when the program of an argv command is missing.
+
+    Raises:
+        CalledProcessError: if the program is not found
+
+    """
+    try:
+        yield
+    except FileNotFoundError as exc:
+        if isinstance(cmd, str) or (cwd and not cwd.is_dir()):
+            raise
+        raise subprocess.CalledProcessError(returncode=127, cmd=cmd) from exc
+
+
+def _iter_chunks_selector(stdout: _ByteStream, deadline: float | None) -> Iterator[bytes]:
+    """Yield chunks from the pipe as soon as they are available until the end of the output.
+
+    Raises:
+        TimeoutExpired: if the deadline passes, even when the process is silent
+
+    """
+    fd = stdout.fileno()
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while True:
+            remaining = _remaining(deadline)
+            if remaining is not None and remaining <= 0:
+                raise subprocess.TimeoutExpired(cmd='', timeout=0)
+            if not selector.select(remaining):
+                continue
+            if not (chunk := os.read(fd, _CHUNK_SIZE)):
+                return
+            yield chunk
+
+
+def _iter_chunks_thread(stdout: _ByteStream, deadline: float | None) -> Iterator[bytes]:
+    """Yield chunks read by a daemon thread, for pipes that do not support `selectors` (e.g. on Windows).
+
+    Raises:
+        TimeoutExpired: if the deadline passes, even when the process is silent
+
+    """
+    chunks: queue.SimpleQueue[bytes] = queue.SimpleQueue()
+
+    def pump() -> None:
+        while chunk := stdout.read(_CHUNK_SIZE):
+            chunks.put(chunk)
+        chunks.put(b'')
+
+    threading.Thread(target=pump, daemon=True).start()
+    while True:
+        remaining = _remaining(deadline)
+        try:
+            chunk = chunks.get(timeout=None if remaining is None else max(remaining, 0))
+        except queue.Empty:
+            raise subprocess.TimeoutExpired(cmd='', timeout=0) from None
+        if not chunk:
+            return
+        yield chunk
+
+
+def _iter_chunks(stdout: _ByteStream, deadline: float | None) -> Iterator[bytes]:
+    """Yield the output of a process in chunks with `selectors` when the pipe supports it or a reader thread."""
+    try:
+        use_selector = sys.platform != 'win32' and stdout.fileno() >= 0
+    except (OSError, ValueError):  # For example, `io.UnsupportedOperation` from an in-memory stream
+        use_selector = False
+    return _iter_chunks_selector(stdout, deadline) if use_selector else _iter_chunks_thread(stdout, deadline)
+
+
+class _LineSplitter:
+    """Call `on_line` with each complete line of the decoded output, without the newline, and the last partial line."""
+
+    def __init__(self, on_line: Callable[[str], None] | None) -> None:
+        self.on_line = on_line
+        self._pending = ''
+
+    def write(self, text: str) -> None:
+        if not self.on_line:
+            return
+        *lines, self._pending = (self._pending + text).split('\n')
+        for line in lines:
+            self.on_line(line)
+
+    def flush(self) -> None:
+        if self.on_line and self._pending:
+            self.on_line(self._pending)
+        self._pending = ''
+
+
+def _line_printer(printer: Callable[[str], None] | None) -> _LineSplitter:
+    """Call the printer with each line of the decoded output without trailing whitespace."""
+    return _LineSplitter(None if printer is None else lambda line: printer(line.rstrip()))
+
+
+def _newline_decoder() -> io.IncrementalNewlineDecoder:
+    """Decode the output like a pipe opened with `universal_newlines=True`."""
+    decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(do_setlocale=False))()
+    return io.IncrementalNewlineDecoder(decoder, translate=True)
+
+
+def _read_output(stdout: _ByteStream, deadline: float | None, *, writers: Sequence[Callable[[str], object]]) -> None:
+    """Decode the output and pass it to each writer as it is read.
+
+    If the deadline passes, `TimeoutExpired` propagates after the writers received the output read so far.
+
+    """
+    newline_decoder = _newline_decoder()
+    for chunk in _iter_chunks(stdout, deadline):
+        text = newline_decoder.decode(chunk)
+        for write in writers:
+            write(text)
+    if text := newline_decoder.decode(b'', final=True):
+        for write in writers:
+            write(text)
+
+
+def _run_captured(
+    cmd: str | Sequence[str],
+    *,
+    timeout: int | None,
+    cwd: Path | None,
+    writers: Sequence[Callable[[str], object]],
+) -> int:
+    """Run the command and pass the combined stdout and stderr to the writers as it is read.
+
+    The process is killed if the timeout is reached and `TimeoutExpired` propagates without the output, which the
+    caller adds from its writers.
+
+    Returns:
+        int: return code
+
+    """
+    deadline = None if timeout is None else monotonic() + timeout
+    with _command_not_found(cmd, cwd=cwd):
+        proc = subprocess.Popen(  # noqa: S603
+            cmd if isinstance(cmd, str) else list(cmd),
+            bufsize=0,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            shell=isinstance(cmd, str),
+        )
+    with proc:
+        if not (stdout := proc.stdout):
+            raise NotImplementedError('Failed to read stdout from process.')
+        try:
+            _read_output(stdout, deadline, writers=writers)
+            return proc.wait(timeout=_remaining(deadline))
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            raise
+
+
 def capture_shell(
-    cmd: str,
+    cmd: str | Sequence[str],
     *,
     timeout: int | None = 120,
     cwd: Path | None = None,
@@ -61,17 +247,17 @@ def capture_shell(
 ) -> str:
     """Run shell command, return the output, and optionally print in real time.
 
-    WARNING: This function uses shell=True which can be a security risk.
-    Only use with trusted input or enable validate_cmd for basic protection.
+    WARNING: A string command runs with shell=True which can be a security risk.
+    Only use with trusted input, enable validate_cmd for basic protection, or pass an argv sequence.
 
     Inspired by: https://stackoverflow.com/a/38745040/3219667
 
     Args:
-        cmd: shell command
+        cmd: shell command, or an argv sequence to run the program directly without a shell
         timeout: process timeout in seconds. Defaults to 2 minutes. Use None for no timeout.
         cwd: optional path for shell execution
         printer: optional callable to output the lines in real time
-        validate_cmd: if True, validates command for dangerous patterns. Default False
+        validate_cmd: if True, validates a shell command for dangerous patterns. Default False
             to preserve backward compatibility and allow legitimate shell features.
 
     Returns:
@@ -91,33 +277,17 @@ def capture_shell(
         raise ValueError('Negative timeouts are not allowed')
 
     start = time()
-    lines = []
-    with subprocess.Popen(
-        cmd,
-        cwd=cwd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        universal_newlines=True,
-        shell=True,
-    ) as proc:
-        if not (stdout := proc.stdout):
-            raise NotImplementedError('Failed to read stdout from process.')
-        return_code = None
-        while return_code is None:
-            if timeout is not None and time() - start >= timeout:
-                proc.kill()
-                break
-            if line := stdout.readline():
-                lines.append(line)
-                if printer:
-                    printer(line.rstrip())
-            else:
-                return_code = proc.poll()
-
-    output = ''.join(lines)
-    if return_code is None:
+    buffer = io.StringIO(newline='')
+    line_printer = _line_printer(printer)
+    try:
+        return_code = _run_captured(cmd, timeout=timeout, cwd=cwd, writers=[buffer.write, line_printer.write])
+    except subprocess.TimeoutExpired:
         # Process was killed due to timeout
-        raise subprocess.TimeoutExpired(cmd=cmd, timeout=float(timeout or 0), output=output)
+        output = buffer.getvalue()
+        raise subprocess.TimeoutExpired(cmd=cmd, timeout=float(timeout or 0), output=output) from None
+    line_printer.flush()
+
+    output = buffer.getvalue()
     if return_code != 0:
         raise subprocess.CalledProcessError(returncode=return_code, cmd=cmd, output=output)
 
@@ -127,16 +297,233 @@ def capture_shell(
     return output
 
 
-async def _capture_shell_async(cmd: str, *, cwd: Path | None = None, start_time: float = 0) -> str:
-    proc = await asyncio.create_subprocess_shell(
-        cmd,
+_SPOOL_MAX_SIZE = 1_048_576
+"""Characters of output held in memory before the full output of `capture_shell_bounded` spills to a temporary file."""
+
+
+class CapturedOutput:
+    """Head and tail lines of a command's output with the full output in a temporary file.
+
+    Only the first `head_lines` and the last `tail_lines` are held in memory, the tail in a ring buffer. When spooled,
+    the full output is in `file`, which stays in memory up to a small size and then spills to disk. Close the result
+    or use it as a context manager to remove the temporary file.
+
+    """
+
+    def __init__(self, *, head_lines: int, tail_lines: int, spool: bool) -> None:
+        """Create an empty capture.
+
+        Args:
+            head_lines: number of lines to keep from the start of the output
+            tail_lines: number of lines to keep from the end of the output
+            spool: if True, write the full output to a temporary `file`
+
+        """
+        self.head: list[str] = []
+        self.tail: deque[str] = deque(maxlen=tail_lines)
+        self.line_count = 0
+        self.returncode: int | None = None
+        self.file: tempfile.SpooledTemporaryFile[str] | None = None
+        if spool:
+            self.file = tempfile.SpooledTemporaryFile(  # noqa: SIM115
+                max_size=_SPOOL_MAX_SIZE,
+                mode='w+',
+                encoding='utf-8',
+                newline='',
+            )
+        self._head_lines = head_lines
+
+    def __enter__(self) -> Self:
+        """Return the capture for use as a context manager."""
+        return self
+
+    def __exit__(self, *_args: object) -> None:
+        """Remove the temporary file."""
+        self.close()
+
+    def __str__(self) -> str:
+        """Return the head and tail lines with a marker for the omitted lines in between."""
+        if omitted := self.omitted_lines:
+            return '\n'.join([*self.head, f'... {omitted} lines omitted ...', *self.tail])
+        return '\n'.join([*self.head, *self.tail])
+
+    @property
+    def omitted_lines(self) -> int:
+        """Number of lines that are neither in the head nor the tail."""
+        return self.line_count - len(self.head) - len(self.tail)
+
+    @property
+    def truncated(self) -> bool:
+        """True if the output has more lines than the head and tail hold."""
+        return self.omitted_lines > 0
+
+    def add_line(self, line: str) -> None:
+        """Keep the line in the head until it is full and otherwise in the tail."""
+        self.line_count += 1
+        if len(self.head) < self._head_lines:
+            self.head.append(line)
+        else:
+            self.tail.append(line)
+
+    def close(self) -> None:
+        """Remove the temporary file with the full output."""
+        if self.file:
+            self.file.close()
+
+
+def capture_shell_bounded(
+    cmd: str | Sequence[str],
+    *,
+    timeout: int | None = 120,
+    cwd: Path | None = None,
+    printer: Callable[[str], None] | None = None,
+    head_lines: int = 200,
+    tail_lines: int = 200,
+    spool: bool = True,
+    check: bool = True,
+    validate_cmd: bool = False,
+) -> CapturedOutput:
+    """Run shell command like `capture_shell`, but only keep the first and last lines of the output in memory.
+
+    The printer still receives every line in real time. Use this for verbose commands, like builds, where holding
+    the full output could take gigabytes.
+
+    ```py
+    with capture_shell_bounded('make', printer=print) as result:
+        print(result)  # First and last lines
+        if result.file:
+            full_output = result.file.read()
+    ```
+
+    Args:
+        cmd: shell command, or an argv sequence to run the program directly without a shell
+        timeout: process timeout in seconds. Defaults to 2 minutes. Use None for no timeout.
+        cwd: optional path for shell execution
+        printer: optional callable to output the lines in real time
+        head_lines: number of lines to keep from the start of the output
+        tail_lines: number of lines to keep from the end of the output
+        spool: if True, also write the full output to `file`, which is rewound to the start
+        check: if True, raise `CalledProcessError` for a non-zero return code. Otherwise, check `returncode`
+        validate_cmd: if True, validates a shell command for dangerous patterns. Default False
+            to preserve backward compatibility and allow legitimate shell features.
+
+    Returns:
+        CapturedOutput: head and tail lines, line count, return code, and optional file with the full output
+
+    Raises:
+        CalledProcessError: if check is True and return code is non-zero. The output is the head and tail
+        TimeoutExpired: if timeout is reached. The output is the head and tail
+        ValueError: if validate_cmd=True and dangerous patterns are detected
+
+    """
+    if validate_cmd:
+        _validate_shell_command(cmd)
+
+    LOGGER.debug('Running', cmd=cmd, timeout=timeout, cwd=cwd, printer=printer, validate_cmd=validate_cmd)
+    if timeout and timeout < 0:
+        raise ValueError('Negative timeouts are not allowed')
+
+    start = time()
+    captured = CapturedOutput(head_lines=head_lines, tail_lines=tail_lines, spool=spool)
+    line_printer = _line_printer(printer)
+    line_buffer = _LineSplitter(captured.add_line)
+    writers: list[Callable[[str], object]] = [line_printer.write, line_buffer.write]
+    if captured.file:
+        writers.append(captured.file.write)
+    try:
+        captured.returncode = _run_captured(cmd, timeout=timeout, cwd=cwd, writers=writers)
+    except subprocess.TimeoutExpired:
+        line_buffer.flush()
+        captured.close()
+        raise subprocess.TimeoutExpired(cmd=cmd, timeout=float(timeout or 0), output=str(captured)) from None
+    except BaseException:
+        captured.close()
+        raise
+    line_printer.flush()
+    line_buffer.flush()
+    if captured.file:
+        captured.file.seek(0)
+
+    if check and captured.returncode != 0:
+        captured.close()
+        raise subprocess.CalledProcessError(returncode=captured.returncode, cmd=cmd, output=str(captured))
+
+    duration = time() - start
+    LOGGER.debug(
+        'Shell command completed',
+        cmd=cmd,
+        returncode=captured.returncode,
+        duration_seconds=round(duration, 2),
         cwd=cwd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        shell=True,
+        line_count=captured.line_count,
     )
 
-    stdout, _stderr = await proc.communicate()
+    return captured
+
+
+async def _create_process(
+    cmd: str | Sequence[str],
+    *,
+    cwd: Path | None,
+    kill_process_group: bool,
+) -> asyncio.subprocess.Process:
+    """Start a string command with the shell or an argv command directly, with stdout and stderr in one pipe.
+
+    With `kill_process_group` on POSIX, the process starts in a new session so that `_stop_process` can kill the
+    whole process group.
+
+    """
+    start_new_session = kill_process_group and sys.platform != 'win32'
+    with _command_not_found(cmd, cwd=cwd):
+        if isinstance(cmd, str):
+            return await asyncio.create_subprocess_shell(
+                cmd,
+                cwd=cwd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                start_new_session=start_new_session,
+            )
+        return await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=start_new_session,
+        )
+
+
+async def _stop_process(proc: asyncio.subprocess.Process, *, kill_process_group: bool) -> None:
+    """Kill the process if it is still running, then discard the rest of the output and wait for it to exit.
+
+    The pipe is read to the end because reading may have been paused by backpressure. Only the started process is
+    killed by default, so the wait lasts until the processes it started exit or close the pipe. With
+    `kill_process_group` on POSIX, the command was started in a new session and the processes it started are killed
+    with the process group.
+
+    """
+    if proc.returncode is not None:
+        return
+    with suppress(ProcessLookupError):
+        if kill_process_group and sys.platform != 'win32':
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    await proc.communicate()
+
+
+async def _capture_shell_async(
+    cmd: str | Sequence[str],
+    *,
+    cwd: Path | None = None,
+    start_time: float = 0,
+    kill_process_group: bool = False,
+) -> str:
+    proc = await _create_process(cmd, cwd=cwd, kill_process_group=kill_process_group)
+    try:
+        stdout, _stderr = await proc.communicate()
+    finally:
+        # Stops the process when cancelled by the timeout of `asyncio.wait_for`
+        await _stop_process(proc, kill_process_group=kill_process_group)
     output = stdout.decode().strip()
     if proc.returncode is None:
         # Process returncode should not be None after communicate(), but handle defensively
@@ -152,27 +539,30 @@ async def _capture_shell_async(cmd: str, *, cwd: Path | None = None, start_time:
 
 
 async def capture_shell_async(
-    cmd: str,
+    cmd: str | Sequence[str],
     *,
     timeout: int | None = 120,
     cwd: Path | None = None,
     validate_cmd: bool = False,
+    kill_process_group: bool = False,
 ) -> str:
     """Run a shell command asynchronously and return the output.
 
-    WARNING: This function uses shell=True which can be a security risk.
-    Only use with trusted input or enable validate_cmd for basic protection.
+    WARNING: A string command runs with shell=True which can be a security risk.
+    Only use with trusted input, enable validate_cmd for basic protection, or pass an argv sequence.
 
     ```py
     print(asyncio.run(capture_shell_async('ls ~/.config')))
     ```
 
     Args:
-        cmd: shell command
+        cmd: shell command, or an argv sequence to run the program directly without a shell
         timeout: process timeout in seconds. Defaults to 2 minutes. Use None for no timeout.
         cwd: optional path for shell execution
-        validate_cmd: if True, validates command for dangerous patterns. Default False
+        validate_cmd: if True, validates a shell command for dangerous patterns. Default False
             to preserve backward compatibility and allow legitimate shell features.
+        kill_process_group: if True on POSIX, start the command in a new session so that a timeout also kills the
+            processes it started. The command is then detached from the controlling terminal. Default False
 
     Returns:
         str: stripped output
@@ -184,22 +574,219 @@ async def capture_shell_async(
     LOGGER.debug('Running', cmd=cmd, timeout=timeout, cwd=cwd, validate_cmd=validate_cmd)
     start = time()
     return await asyncio.wait_for(
-        _capture_shell_async(cmd=cmd, cwd=cwd, start_time=start),
+        _capture_shell_async(cmd=cmd, cwd=cwd, start_time=start, kill_process_group=kill_process_group),
         timeout=timeout or None,
     )
 
 
-def run_shell(cmd: str, *, timeout: int | None = 120, cwd: Path | None = None, validate_cmd: bool = False) -> None:
+async def _iter_lines_async(stdout: asyncio.StreamReader, deadline: float | None) -> AsyncIterator[str]:
+    """Yield each decoded line without the newline, reading the next chunk only once the previous lines are consumed.
+
+    If the deadline passes, `asyncio.TimeoutError` propagates.
+
+    """
+    newline_decoder = _newline_decoder()
+    lines: list[str] = []
+    line_splitter = _LineSplitter(lines.append)
+    while chunk := await asyncio.wait_for(stdout.read(_CHUNK_SIZE), timeout=_remaining(deadline)):
+        line_splitter.write(newline_decoder.decode(chunk))
+        for line in lines:
+            yield line
+        lines.clear()
+    line_splitter.write(newline_decoder.decode(b'', final=True))
+    line_splitter.flush()
+    for line in lines:
+        yield line
+
+
+async def iter_shell_lines_async(
+    cmd: str | Sequence[str],
+    *,
+    timeout: int | None = 120,
+    cwd: Path | None = None,
+    validate_cmd: bool = False,
+    kill_process_group: bool = False,
+) -> AsyncGenerator[str, None]:
+    """Run a shell command asynchronously and yield each line of the output as it arrives.
+
+    WARNING: A string command runs with shell=True which can be a security risk.
+    Only use with trusted input, enable validate_cmd for basic protection, or pass an argv sequence.
+
+    The output is only read as fast as the lines are consumed, so a slow consumer pauses the process once the pipe
+    is full instead of buffering the output in memory. The process is killed on timeout or when the iteration stops
+    early.
+
+    ```py
+    async for line in iter_shell_lines_async('pytest -v'):
+        print(line)
+    ```
+
+    Args:
+        cmd: shell command, or an argv sequence to run the program directly without a shell
+        timeout: process timeout in seconds. Defaults to 2 minutes. Use None for no timeout.
+        cwd: optional path for shell execution
+        validate_cmd: if True, validates a shell command for dangerous patterns. Default False
+            to preserve backward compatibility and allow legitimate shell features.
+        kill_process_group: if True on POSIX, start the command in a new session so that a timeout or stopping early
+            also kills the processes it started. The command is then detached from the controlling terminal. Default
+            False
+
+    Yields:
+        str: decoded lines of the combined stdout and stderr without the trailing newline
+
+    Raises:
+        CalledProcessError: if return code is non-zero. The output is not retained
+        TimeoutExpired: if timeout is reached
+        ValueError: if validate_cmd=True and dangerous patterns are detected
+
+    """
+    if validate_cmd:
+        _validate_shell_command(cmd)
+
+    LOGGER.debug('Running', cmd=cmd, timeout=timeout, cwd=cwd, validate_cmd=validate_cmd)
+    if timeout and timeout < 0:
+        raise ValueError('Negative timeouts are not allowed')
+
+    start = time()
+    deadline = monotonic() + timeout if timeout else None
+    proc = await _create_process(cmd, cwd=cwd, kill_process_group=kill_process_group)
+    try:
+        if not (stdout := proc.stdout):
+            raise NotImplementedError('Failed to read stdout from process.')
+        async for line in _iter_lines_async(stdout, deadline):
+            yield line
+        return_code = await asyncio.wait_for(proc.wait(), timeout=_remaining(deadline))
+    except asyncio.TimeoutError:
+        raise subprocess.TimeoutExpired(cmd=cmd, timeout=float(timeout or 0)) from None
+    finally:
+        await _stop_process(proc, kill_process_group=kill_process_group)
+    if return_code != 0:
+        raise subprocess.CalledProcessError(returncode=return_code, cmd=cmd)
+
+    duration = time() - start
+    LOGGER.debug('Shell command completed', cmd=cmd, returncode=0, duration_seconds=round(duration, 2), cwd=cwd)
+
+
+@dataclass(frozen=True)
+class ShellCommand:
+    """Shell command or argv for `capture_many` with its own working directory and timeout."""
+
+    cmd: str | Sequence[str]
+    cwd: Path | None = None
+    timeout: int | None = 120
+
+
+@dataclass(frozen=True)
+class ShellResult:
+    """Outcome of a command from `capture_many`."""
+
+    command: ShellCommand
+    output: str
+    returncode: int | None
+    """Return code of the process, or None if the timeout was reached."""
+    duration: float
+    """Seconds from starting the command, excluding time spent waiting for a free slot."""
+
+    @property
+    def ok(self) -> bool:
+        """True if the command completed with a zero return code."""
+        return self.returncode == 0
+
+
+async def _capture_result(command: ShellCommand, *, semaphore: asyncio.Semaphore, fail_fast: bool) -> ShellResult:
+    """Run the command while holding the semaphore and return the result, or raise on failure when failing fast."""
+    async with semaphore:
+        start = monotonic()
+        returncode: int | None = 0
+        try:
+            output = await capture_shell_async(command.cmd, timeout=command.timeout, cwd=command.cwd)
+        except subprocess.CalledProcessError as exc:
+            if fail_fast:
+                raise
+            output, returncode = exc.output, exc.returncode
+        except asyncio.TimeoutError:
+            if fail_fast:
+                raise subprocess.TimeoutExpired(cmd=command.cmd, timeout=float(command.timeout or 0)) from None
+            output, returncode = '', None
+        return ShellResult(command=command, output=output, returncode=returncode, duration=monotonic() - start)
+
+
+async def capture_many_async(
+    commands: Iterable[str | Sequence[str] | ShellCommand],
+    *,
+    max_concurrency: int | None = None,
+    fail_fast: bool = False,
+) -> list[ShellResult]:
+    """Run independent shell commands concurrently with `capture_shell_async` and return the results in order.
+
+    WARNING: A string command runs with shell=True which can be a security risk. Only use with trusted input.
+
+    ```py
+    results = asyncio.run(capture_many_async(['ruff check .', ShellCommand('pytest', cwd=Path('tests'))]))
+    ```
+
+    Args:
+        commands: shell commands, argv sequences, or `ShellCommand` for a specific cwd and timeout
+        max_concurrency: maximum number of commands running at once. Defaults to the number of CPUs
+        fail_fast: if True, stop the remaining commands and raise on the first failure or timeout. Otherwise, run
+            every command and report failures through `ShellResult.returncode`
+
+    Returns:
+        list[ShellResult]: one result per command in the order submitted
+
+    Raises:
+        CalledProcessError: if fail_fast is True and a return code is non-zero
+        TimeoutExpired: if fail_fast is True and a timeout is reached
+
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or os.cpu_count() or 1)
+    tasks = [
+        asyncio.ensure_future(
+            _capture_result(
+                command if isinstance(command, ShellCommand) else ShellCommand(command),
+                semaphore=semaphore,
+                fail_fast=fail_fast,
+            ),
+        )
+        for command in commands
+    ]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def capture_many(
+    commands: Iterable[str | Sequence[str] | ShellCommand],
+    *,
+    max_concurrency: int | None = None,
+    fail_fast: bool = False,
+) -> list[ShellResult]:
+    """Run independent shell commands concurrently from synchronous code. See `capture_many_async`.
+
+    Returns:
+        list[ShellResult]: one result per command in the order submitted
+
+    """
+    return asyncio.run(capture_many_async(commands, max_concurrency=max_concurrency, fail_fast=fail_fast))
+
+
+def run_shell(
+    cmd: str | Sequence[str], *, timeout: int | None = 120, cwd: Path | None = None, validate_cmd: bool = False
+) -> None:
     """Run a shell command without capturing the output.
 
-    WARNING: This function uses shell=True which can be a security risk.
-    Only use with trusted input or enable validate_cmd for basic protection.
+    WARNING: A string command runs with shell=True which can be a security risk.
+    Only use with trusted input, enable validate_cmd for basic protection, or pass an argv sequence.
 
     Args:
-        cmd: shell command
+        cmd: shell command, or an argv sequence to run the program directly without a shell
         timeout: process timeout in seconds. Defaults to 2 minutes. Use None for no timeout.
         cwd: optional path for shell execution
-        validate_cmd: if True, validates command for dangerous patterns. Default False
+        validate_cmd: if True, validates a shell command for dangerous patterns. Default False
             to preserve backward compatibility and allow legitimate shell features.
 
     """
@@ -209,15 +796,16 @@ def run_shell(cmd: str, *, timeout: int | None = 120, cwd: Path | None = None, v
     LOGGER.debug('Running', cmd=cmd, timeout=timeout, cwd=cwd, validate_cmd=validate_cmd)
 
     start = time()
-    subprocess.run(
-        cmd,
-        timeout=timeout or None,
-        cwd=cwd,
-        stdout=sys.stdout,
-        stderr=sys.stderr,
-        check=True,
-        shell=True,
-    )
+    with _command_not_found(cmd, cwd=cwd):
+        subprocess.run(  # noqa: S603
+            cmd if isinstance(cmd, str) else list(cmd),
+            timeout=timeout or None,
+            cwd=cwd,
+            stdout=sys.stdout,
+            stderr=sys.stderr,
+            check=True,
+            shell=isinstance(cmd, str),
+        )
 
     duration = time() - start
     LOGGER.debug('Shell command completed', cmd=cmd, returncode=0, duration_seconds=round(duration, 2), cwd=cwd)
@@ -1,13 +1,42 @@
 """VCS (Version Control System) subpackage for repo discovery and forge integration."""
 
 from ._forge import detect_forge, forge_blame_url, forge_file_url, forge_repo_url, parse_remote_url
-from ._git_commands import git_blame_porcelain, git_ls_files, git_show_toplevel, zsplit
-from ._jj_commands import jj_file_annotate, jj_file_list, jj_git_remote_list, jj_root
-from ._repo import detect_vcs_kind, find_repo_root, get_repo_metadata
-from ._types import ForgeKind, RepoMetadata, VcsKind
+from ._git_commands import (
+    GitCatFileBatch,
+    git_blame_line_porcelain,
+    git_blame_line_porcelain_async,
+    git_blame_porcelain,
+    git_ls_files,
+    git_ls_files_blobs,
+    git_ls_files_existing,
+    git_show_toplevel,
+    iter_git_ls_files,
+    iter_git_ls_files_existing,
+    parse_line_porcelain,
+    zsplit,
+)
+from ._gitignore import Gitignore, is_ignored
+from ._inventory import FileInventory
+from ._jj_commands import (
+    JJ_ANNOTATE_TEMPLATE,
+    jj_file_annotate,
+    jj_file_annotate_async,
+    jj_file_list,
+    jj_git_remote_list,
+    jj_root,
+    parse_jj_annotate,
+)
+from ._repo import RepoIndex, detect_vcs_kind, find_repo_root, get_repo_metadata
+from ._types import AnnotatedLine, ForgeKind, RepoMetadata, VcsKind
 
 __all__ = [
+    'JJ_ANNOTATE_TEMPLATE',
+    'AnnotatedLine',
+    'FileInventory',
     'ForgeKind',
+    'GitCatFileBatch',
+    'Gitignore',
+    'RepoIndex',
     'RepoMetadata',
     'VcsKind',
     'detect_forge',
@@ -17,13 +46,23 @@ __all__ = [
     'forge_file_url',
     'forge_repo_url',
     'get_repo_metadata',
+    'git_blame_line_porcelain',
+    'git_blame_line_porcelain_async',
     'git_blame_porcelain',
     'git_ls_files',
+    'git_ls_files_blobs',
+    'git_ls_files_existing',
     'git_show_toplevel',
+    'is_ignored',
+    'iter_git_ls_files',
+    'iter_git_ls_files_existing',
     'jj_file_annotate',
+    'jj_file_annotate_async',
     'jj_file_list',
     'jj_git_remote_list',
     'jj_root',
+    'parse_jj_annotate',
+    'parse_line_porcelain',
     'parse_remote_url',
     'zsplit',
 ]
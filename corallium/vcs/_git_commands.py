@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+import os
+import shlex
+import subprocess  # nosec
 from contextlib import suppress
 from pathlib import Path
 from subprocess import CalledProcessError
 
-from beartype.typing import List
+from beartype.typing import IO, Dict, Generator, Iterable, Iterator, List, Sequence, Tuple
+from typing_extensions import Self
 
-from corallium.shell import capture_shell
+from corallium.log import LOGGER
+from corallium.shell import capture_shell, capture_shell_async
 
 
 def zsplit(stdout: str) -> list[str]:
@@ -27,19 +32,324 @@ def zsplit(stdout: str) -> list[str]:
 def git_ls_files(*, cwd: Path) -> List[str] | None:
     """Run `git ls-files -z` and return the file list, or None on failure."""
     with suppress(CalledProcessError):
-        return zsplit(capture_shell('git ls-files -z', cwd=cwd))
+        return zsplit(capture_shell(['git', 'ls-files', '-z'], cwd=cwd))
     return None
 
 
+def _iter_zsplit(stdout: IO[bytes], chunk_size: int) -> Iterator[str]:
+    """Yield the null-separated items from an unbuffered pipe as each chunk is read."""
+    pending = b''
+    while chunk := stdout.read(chunk_size):
+        *items, pending = (pending + chunk).split(b'\0')
+        yield from (os.fsdecode(item) for item in items if item)
+    if pending:
+        yield os.fsdecode(pending)
+
+
+def _iter_git_output(args: Sequence[str], *, cwd: Path, chunk_size: int) -> Iterator[str]:
+    """Run a git command with `-z` output from its arguments and yield each item as soon as it is read.
+
+    Yields:
+        Items decoded as file system paths
+
+    Raises:
+        CalledProcessError: if git is unavailable or exits with a non-zero return code after the last item
+
+    """
+    cmd = shlex.join(args)
+    LOGGER.debug('Running', cmd=cmd, cwd=cwd)
+    try:
+        proc = subprocess.Popen(  # noqa: S603
+            list(args),
+            bufsize=0,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except FileNotFoundError as exc:
+        raise CalledProcessError(returncode=127, cmd=cmd) from exc
+    with proc:
+        if not proc.stdout:
+            msg = f'Failed to read stdout from {cmd}.'
+            raise NotImplementedError(msg)
+        try:
+            yield from _iter_zsplit(proc.stdout, chunk_size)
+        except BaseException:
+            proc.kill()
+            raise
+    if proc.returncode:
+        raise CalledProcessError(returncode=proc.returncode, cmd=cmd)
+
+
+def iter_git_ls_files(*, cwd: Path, chunk_size: int = 65_536) -> Generator[str, None, None]:
+    """Stream `git ls-files -z` and yield each path as soon as it is read.
+
+    Unlike `git_ls_files`, the output is never held in memory. Closing the generator early stops git.
+
+    Args:
+        cwd: directory to list
+        chunk_size: maximum number of bytes read from the pipe at a time
+
+    Yields:
+        Paths relative to `cwd`
+
+    """
+    yield from _iter_git_output(['git', 'ls-files', '-z'], cwd=cwd, chunk_size=chunk_size)
+
+
+_LS_FILES_PRESENCE_ARGS = ('git', 'ls-files', '-z', '-t', '-s', '--cached', '--deleted', '--modified')
+"""Lists each index entry tagged with its mode, followed by an `R` entry when it is deleted from the working tree and
+a `C` entry when it is modified."""
+
+
+def _iter_index_presence(entries: Iterable[str], *, cwd: Path) -> Iterator[tuple[str, bool]]:
+    """Yield `(path, exists)` once per path from the output of `_LS_FILES_PRESENCE_ARGS`.
+
+    Git compares the stat data in the index to find deleted files, so only a few entries are checked with a `stat`:
+    symbolic links because they are files only when the target is a file, skip-worktree (`S`) entries from a sparse
+    checkout because git never reports them as deleted, and modified entries because a file replaced by a directory
+    is modified rather than deleted. Submodules are skipped.
+
+    """
+    path = ''
+    mode = ''
+    exists = False
+    check = False
+    for entry in entries:
+        metadata, entry_path = entry.split('\t', maxsplit=1)
+        tag, entry_mode = metadata.split(' ', maxsplit=2)[:2]
+        if entry_path == path:
+            exists = exists and tag != 'R'
+            check = check or tag == 'C'
+            continue
+        if path and mode != '160000':
+            yield path, exists and (not check or (cwd / path).is_file())
+        path, mode, exists = entry_path, entry_mode, tag != 'R'
+        check = tag == 'S' or mode == '120000'
+    if path and mode != '160000':
+        yield path, exists and (not check or (cwd / path).is_file())
+
+
+def git_ls_files_existing(*, cwd: Path, pathspecs: Sequence[str] = ()) -> Tuple[List[str], List[str]] | None:
+    """List the tracked files and split them by whether they exist in the working tree, or None on failure.
+
+    A single `git ls-files` finds deleted files in bulk from the index instead of a `stat` per file. Submodules are
+    skipped and symbolic links count as existing only when they point to a file.
+
+    Args:
+        cwd: directory to list
+        pathspecs: optional git pathspecs to limit the listing (e.g. `:(glob)src/**/*.py` or `:(exclude)docs`)
+
+    Returns:
+        Tuple of (existing files, missing files)
+
+    """
+    cmd = [*_LS_FILES_PRESENCE_ARGS, *(['--', *pathspecs] if pathspecs else [])]
+    with suppress(CalledProcessError):
+        existing: List[str] = []
+        missing: List[str] = []
+        entries = zsplit(capture_shell(cmd, cwd=cwd))
+        for path, exists in _iter_index_presence(entries, cwd=cwd):
+            (existing if exists else missing).append(path)
+        return existing, missing
+    return None
+
+
+def iter_git_ls_files_existing(
+    *,
+    cwd: Path,
+    chunk_size: int = 65_536,
+    pathspecs: Sequence[str] = (),
+) -> Generator[tuple[str, bool], None, None]:
+    """Stream the tracked files like `iter_git_ls_files` with whether each exists as in `git_ls_files_existing`.
+
+    Args:
+        cwd: directory to list
+        chunk_size: maximum number of bytes read from the pipe at a time
+        pathspecs: optional git pathspecs to limit the listing
+
+    Yields:
+        Tuple of the path relative to `cwd` and True if it exists in the working tree
+
+    """
+    args = [*_LS_FILES_PRESENCE_ARGS, *(['--', *pathspecs] if pathspecs else [])]
+    entries = _iter_git_output(args, cwd=cwd, chunk_size=chunk_size)
+    yield from _iter_index_presence(entries, cwd=cwd)
+
+
 def git_blame_porcelain(*, file_path: Path, line: int, cwd: Path) -> str | None:
     """Run `git blame --porcelain` for a single line, or None on failure."""
     with suppress(CalledProcessError):
-        return capture_shell(f'git blame {file_path} -L {line},{line} --porcelain', cwd=cwd)
+        return capture_shell(['git', 'blame', str(file_path), '-L', f'{line},{line}', '--porcelain'], cwd=cwd)
+    return None
+
+
+def git_ls_files_blobs(*, cwd: Path) -> Dict[str, str] | None:
+    """Run `git ls-files -s -z` and return the blob ID for each path in the index, or None on failure.
+
+    Submodules and unmerged entries are skipped.
+
+    """
+    with suppress(CalledProcessError):
+        blob_ids: Dict[str, str] = {}
+        for entry in zsplit(capture_shell(['git', 'ls-files', '-s', '-z'], cwd=cwd)):
+            metadata, path = entry.split('\t', maxsplit=1)
+            mode, object_id, stage = metadata.split(' ')
+            if mode != '160000' and stage == '0':
+                blob_ids[path] = object_id
+        return blob_ids
+    return None
+
+
+def git_ls_files_modified(*, cwd: Path) -> List[str] | None:
+    """Run `git ls-files -m -z` and return the paths that differ from the index, or None on failure.
+
+    Includes files with unstaged changes and tracked files that were deleted from the working tree.
+
+    """
+    with suppress(CalledProcessError):
+        return zsplit(capture_shell(['git', 'ls-files', '-m', '-z'], cwd=cwd))
     return None
 
 
+class GitCatFileBatch:
+    """Read many git objects through a single long-lived `git cat-file --batch` process.
+
+    The process is started on the first read and stopped when used as a context manager or on `close()`.
+
+    """
+
+    def __init__(self, *, cwd: Path) -> None:
+        self.cwd = cwd
+        self._proc: subprocess.Popen[bytes] | None = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_args: object) -> None:
+        self.close()
+
+    def _start(self) -> subprocess.Popen[bytes]:
+        if not self._proc:
+            cmd = 'git cat-file --batch'
+            LOGGER.debug('Running', cmd=cmd, cwd=self.cwd)
+            self._proc = subprocess.Popen(  # noqa: S603
+                cmd.split(' '),
+                cwd=self.cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._proc
+
+    def read(self, object_id: str) -> bytes | None:
+        """Return the content of the object, or None if missing or git is unavailable."""
+        proc = self._start()
+        if not (proc.stdin and proc.stdout):
+            raise NotImplementedError('Failed to open pipes to git cat-file.')
+        try:
+            proc.stdin.write(f'{object_id}\n'.encode())
+            proc.stdin.flush()
+        except BrokenPipeError:
+            return None
+        header = proc.stdout.readline().decode().split(' ')
+        if len(header) != 3:  # noqa: PLR2004  # '<object_id> missing' or an empty line when git exited
+            return None
+        content = proc.stdout.read(int(header[2]))
+        proc.stdout.read(1)  # Trailing newline
+        return content
+
+    def close(self) -> None:
+        """Stop the `git cat-file` process."""
+        if proc := self._proc:
+            self._proc = None
+            if proc.stdin:
+                with suppress(BrokenPipeError):
+                    proc.stdin.close()
+            proc.wait()
+            if proc.stdout:
+                proc.stdout.close()
+
+
+def _line_ranges(lines: Sequence[int]) -> List[tuple[int, int]]:
+    """Merge line numbers into sorted, inclusive `(start, end)` ranges of consecutive lines."""
+    ranges: List[tuple[int, int]] = []
+    for line in sorted(set(lines)):
+        if ranges and ranges[-1][1] == line - 1:
+            ranges[-1] = (ranges[-1][0], line)
+        else:
+            ranges.append((line, line))
+    return ranges
+
+
+def _git_blame_line_porcelain_cmd(file_path: Path, lines: Sequence[int]) -> List[str]:
+    ranges = [arg for start, end in _line_ranges(lines) for arg in ('-L', f'{start},{end}')]
+    return ['git', 'blame', str(file_path), *ranges, '--line-porcelain']
+
+
+_BLAME_UNTRACKED_RETURNCODE = 128
+"""Exit code of `git blame` for a file that is not tracked or outside of a repository."""
+
+
+def git_blame_line_porcelain(*, file_path: Path, lines: Sequence[int], cwd: Path) -> str | None:
+    """Run `git blame --line-porcelain` once for several lines of a file, or None if the file is not tracked.
+
+    Consecutive lines are merged into a single `-L` range. When no lines are given, the whole file is blamed.
+
+    Raises:
+        CalledProcessError: if git fails for any other reason
+
+    """
+    try:
+        return capture_shell(_git_blame_line_porcelain_cmd(file_path, lines), cwd=cwd)
+    except CalledProcessError as exc:
+        if exc.returncode != _BLAME_UNTRACKED_RETURNCODE:
+            raise
+        LOGGER.text_debug('Skipping blame', file_path=file_path, exc=exc)
+    return None
+
+
+async def git_blame_line_porcelain_async(*, file_path: Path, lines: Sequence[int], cwd: Path) -> str | None:
+    """Asynchronous `git_blame_line_porcelain`, or None if the file is not tracked.
+
+    Raises:
+        CalledProcessError: if git fails for any other reason
+
+    """
+    try:
+        return await capture_shell_async(_git_blame_line_porcelain_cmd(file_path, lines), cwd=cwd)
+    except CalledProcessError as exc:
+        if exc.returncode != _BLAME_UNTRACKED_RETURNCODE:
+            raise
+        LOGGER.text_debug('Skipping blame', file_path=file_path, exc=exc)
+    return None
+
+
+def parse_line_porcelain(stdout: str) -> Dict[int, str]:
+    """Split `git blame --line-porcelain` output into one porcelain block per final line number.
+
+    Each block has the same format as `git blame --porcelain` for a single line, so it can be parsed identically.
+
+    Args:
+        stdout: Output from `git blame --line-porcelain`
+
+    Returns:
+        Dictionary of final line number to the porcelain block for that line
+
+    """
+    index: Dict[int, str] = {}
+    block: List[str] = []
+    # Split only on '\n' because the content lines may contain other line break characters
+    for line in stdout.split('\n'):
+        block.append(line)
+        if line.startswith('\t'):  # Content line is always last and prefixed with a tab
+            index[int(block[0].split(' ')[2])] = '\n'.join([*block, ''])
+            block = []
+    return index
+
+
 def git_show_toplevel(*, cwd: Path) -> Path | None:
     """Run `git rev-parse --show-toplevel`, or None on failure."""
     with suppress(CalledProcessError):
-        return Path(capture_shell('git rev-parse --show-toplevel', cwd=cwd).strip())
+        return Path(capture_shell(['git', 'rev-parse', '--show-toplevel'], cwd=cwd).strip())
     return None
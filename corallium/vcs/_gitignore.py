@@ -0,0 +1,168 @@
+"""Parse and match `.gitignore` files without git."""
+
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+
+from beartype.typing import Iterable, List, Pattern, Sequence, Tuple
+
+_FLAGS = re.DOTALL | (re.IGNORECASE if os.name == 'nt' else 0)
+"""Regex flags for path matching. Case-insensitive on Windows."""
+
+
+def _translate_class(part: str, start: int) -> tuple[str, int] | None:
+    """Translate the `[...]` set starting after the `[` at `start`, or None if the set is not closed.
+
+    Returns:
+        Regex character set and the index after the closing `]`
+
+    """
+    idx = start + (part[start : start + 1] == '!')
+    idx += part[idx : idx + 1] == ']'  # A leading ']' is part of the set
+    if (end := part.find(']', idx)) == -1:
+        return None
+    chars = part[start:end]
+    negate = chars.startswith('!')
+    chars = chars.removeprefix('!').replace('\\', '\\\\').replace('[', '\\[').replace(']', '\\]')
+    if chars.startswith('^'):
+        chars = '\\' + chars
+    return (f'[^/{chars}]' if negate else f'[{chars}]'), end + 1
+
+
+def _translate_component(part: str, *, escapes: bool = False) -> str:
+    """Translate one glob path component into a regex that never crosses a `/`.
+
+    Args:
+        part: glob for a single path component
+        escapes: if True, a backslash matches the following character literally (as in `.gitignore`)
+
+    Returns:
+        Regex without anchors
+
+    """
+    out = []
+    idx = 0
+    while idx < len(part):
+        char = part[idx]
+        idx += 1
+        if char == '*':
+            out.append('[^/]*')
+        elif char == '?':
+            out.append('[^/]')
+        elif char == '[' and (translated := _translate_class(part, idx)):
+            regex_class, idx = translated
+            out.append(regex_class)
+        elif escapes and char == '\\' and idx < len(part):
+            out.append(re.escape(part[idx]))
+            idx += 1
+        else:
+            out.append(re.escape(char))
+    return ''.join(out)
+
+
+def _translate_gitignore_pattern(pattern: str) -> str:
+    """Translate a `.gitignore` pattern (without negation or trailing `/`) into a regex for relative paths.
+
+    A pattern with a `/` at the beginning or middle is relative to the directory of the `.gitignore` file. Otherwise,
+    it matches at any level below that directory. A leading `**/` matches in all directories, a trailing `/**`
+    matches everything inside, and `/**/` matches zero or more directories.
+
+    """
+    anchored = '/' in pattern
+    parts = pattern.removeprefix('/').split('/')
+    out = [] if anchored else ['(?:.*/)?']
+    for idx, part in enumerate(parts):
+        is_last = idx == len(parts) - 1
+        if part == '**':
+            out.append('.+' if is_last else '(?:[^/]+/)*')
+        else:
+            out.append(_translate_component(part, escapes=True) + ('' if is_last else '/'))
+    return ''.join(out)
+
+
+def _compile_rules(rules: List[Tuple[str, bool]]) -> Tuple[Pattern[str] | None, List[bool]]:
+    """Compile the `(regex, negated)` rules into one regex where the last rule in the file is tried first.
+
+    Returns:
+        Compiled regex with one group per rule and whether each group is a negation
+
+    """
+    if not rules:
+        return None, []
+    ordered = rules[::-1]
+    regex = re.compile('|'.join(f'({rule}\\Z)' for rule, _negated in ordered), _FLAGS)
+    return regex, [negated for _rule, negated in ordered]
+
+
+class Gitignore:
+    """Compiled patterns from a single `.gitignore` file.
+
+    Supports comments, escapes, trailing spaces, negation with `!`, directory-only patterns with a trailing `/`,
+    anchored patterns, and `**`. The last matching pattern wins.
+
+    """
+
+    def __init__(self, lines: Iterable[str]) -> None:
+        file_rules: List[Tuple[str, bool]] = []
+        dir_rules: List[Tuple[str, bool]] = []
+        for raw_line in lines:
+            line = raw_line
+            while line.endswith(' ') and not line.endswith('\\ '):
+                line = line[:-1]
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            line = line.removeprefix('!')
+            dir_only = line.endswith('/')
+            if not (line := line.rstrip('/')):
+                continue
+            rule = (_translate_gitignore_pattern(line), negated)
+            dir_rules.append(rule)
+            if not dir_only:
+                file_rules.append(rule)
+        self._file_regex, self._file_negated = _compile_rules(file_rules)
+        self._dir_regex, self._dir_negated = _compile_rules(dir_rules)
+
+    @classmethod
+    def from_path(cls, path_gitignore: Path) -> Gitignore:
+        """Read the patterns from a `.gitignore` file."""
+        text = path_gitignore.read_text(encoding='utf-8', errors='replace')
+        return cls(text.removeprefix('\ufeff').splitlines())
+
+    def match(self, rel_path: str, *, is_dir: bool) -> bool | None:
+        """Check a path relative to the directory of the `.gitignore` file.
+
+        Args:
+            rel_path: relative POSIX path
+            is_dir: True if the path is a directory
+
+        Returns:
+            True if ignored, False if re-included by a negated pattern, or None if no pattern matches
+
+        """
+        regex, negated = (self._dir_regex, self._dir_negated) if is_dir else (self._file_regex, self._file_negated)
+        if regex and (match := regex.match(rel_path)) and match.lastindex:
+            return not negated[match.lastindex - 1]
+        return None
+
+
+def is_ignored(gitignores: Sequence[Tuple[str, Gitignore]], rel_path: str, *, is_dir: bool) -> bool:
+    """Check a path against nested `.gitignore` files, where deeper files take precedence.
+
+    Args:
+        gitignores: `(directory, Gitignore)` pairs from the outermost to innermost directory containing the path.
+            Directories are relative POSIX paths like `rel_path`, with `''` for the root
+        rel_path: relative POSIX path to check
+        is_dir: True if the path is a directory
+
+    Returns:
+        True if the path is ignored
+
+    """
+    for rel_dir, gitignore in reversed(gitignores):
+        sub_path = rel_path[len(rel_dir) + 1 :] if rel_dir else rel_path
+        if (ignored := gitignore.match(sub_path, is_dir=is_dir)) is not None:
+            return ignored
+    return False
@@ -0,0 +1,189 @@
+"""Cache of the project file listing that is reused until the VCS state or a listed directory changes."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+
+from beartype.typing import Any, Dict, List
+
+from corallium.log import LOGGER
+
+from ._repo import find_repo_root
+from ._types import VcsKind
+
+SNAPSHOT_NAME = 'corallium-file-inventory.json'
+"""Name of the snapshot file stored in the `.git` or `.jj` directory."""
+
+_SNAPSHOT_VERSION = 1
+
+_RACY_WINDOW_NS = 2_000_000_000
+"""Listings are not cached when a stamped path changed this recently because a later write may keep the same mtime."""
+
+
+def _vcs_dir(repo_root: Path) -> tuple[VcsKind, Path] | None:
+    """Return the VCS kind and metadata directory, following the `gitdir:` file of a submodule or worktree."""
+    path_git = repo_root / '.git'
+    if path_git.is_dir():
+        return VcsKind.GIT, path_git
+    if path_git.is_file():
+        with suppress(OSError):
+            text = path_git.read_text(encoding='utf-8').strip()
+            if text.startswith('gitdir:'):
+                return VcsKind.GIT, (repo_root / text.removeprefix('gitdir:').strip()).resolve()
+    path_jj = repo_root / '.jj'
+    if path_jj.is_dir():
+        return VcsKind.JUJUTSU, path_jj
+    return None
+
+
+def _stat_stamp(path: Path) -> List[int] | None:
+    """Return `[mtime_ns, size]` or None if the path does not exist."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _vcs_stamp(kind: VcsKind, vcs_dir: Path) -> Dict[str, Any]:
+    """Stamp the VCS state that determines the listing.
+
+    For git, the index and the content of `HEAD`. For jj, the working copy state and the current operation heads.
+
+    """
+    if kind == VcsKind.GIT:
+        head = ''
+        with suppress(OSError):
+            head = (vcs_dir / 'HEAD').read_text(encoding='utf-8')
+        return {'index': _stat_stamp(vcs_dir / 'index'), 'head': head}
+    heads: List[str] = []
+    with suppress(OSError):
+        heads = sorted(path.name for path in (vcs_dir / 'repo' / 'op_heads' / 'heads').iterdir())
+    return {'index': _stat_stamp(vcs_dir / 'working_copy' / 'tree_state'), 'head': heads}
+
+
+def _listed_dirs(files: List[str]) -> List[str]:
+    """Return every directory containing a listed file and all of their parents, with `''` for the root."""
+    dirs = {''}
+    for rel_file in files:
+        rel_dir = rel_file.rpartition('/')[0]
+        while rel_dir not in dirs:
+            dirs.add(rel_dir)
+            rel_dir = rel_dir.rpartition('/')[0]
+    return sorted(dirs)
+
+
+def _dir_stamps(cwd: Path, rel_dirs: List[str]) -> Dict[str, List[int] | None]:
+    """Stamp each directory, whose mtime changes when an entry is added, removed, or renamed."""
+    return {rel_dir: _stat_stamp(cwd / rel_dir) for rel_dir in rel_dirs}
+
+
+@dataclass(frozen=True)
+class _Listing:
+    """Files listed for a directory and the stamps that were current when it was listed."""
+
+    vcs_stamp: Dict[str, Any]
+    dir_stamps: Dict[str, List[int] | None]
+    files: List[str]
+
+
+class FileInventory:
+    """Project file listings cached in memory and in a snapshot file within the `.git` or `.jj` directory.
+
+    A listing is reused while the VCS state (the git index and `HEAD` or the jj working copy and operation heads) and
+    the stat of every directory containing a listed file are unchanged, so a repeated lookup only needs one `stat` per
+    directory instead of a VCS subprocess and a `stat` per file. Listings are keyed by the repository root and the
+    listed directory relative to the root. Writes are serialized with a lock, so threads that list directories of
+    the same repository do not lose each other's updates to the snapshot.
+
+    """
+
+    def __init__(self) -> None:
+        self._listings: Dict[tuple[str, str], _Listing] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _locate(cwd: Path) -> tuple[Path, VcsKind, Path, str] | None:
+        """Return the repository root, VCS kind, VCS directory, and the relative path of `cwd` in the repository."""
+        if not (repo_root := find_repo_root(cwd)) or not (found := _vcs_dir(repo_root)):
+            return None
+        rel_cwd = cwd.resolve().relative_to(repo_root).as_posix()
+        return repo_root, *found, '' if rel_cwd == '.' else rel_cwd
+
+    @staticmethod
+    def _read_snapshot(vcs_dir: Path) -> Dict[str, Any]:
+        path_snapshot = vcs_dir / SNAPSHOT_NAME
+        if not path_snapshot.is_file():
+            return {}
+        try:
+            snapshot = json.loads(path_snapshot.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as exc:
+            LOGGER.text_debug('Could not read file inventory snapshot', path=path_snapshot, exc=exc)
+            return {}
+        if not isinstance(snapshot, dict) or snapshot.get('version') != _SNAPSHOT_VERSION:
+            return {}
+        return snapshot.get('listings') or {}
+
+    def get(self, cwd: Path) -> List[str] | None:
+        """Return the cached files relative to `cwd`, or None if there is no listing or it is out of date."""
+        if not (located := self._locate(cwd)):
+            return None
+        repo_root, kind, vcs_dir, rel_cwd = located
+        key = (repo_root.as_posix(), rel_cwd)
+        if not (listing := self._listings.get(key)):
+            try:
+                raw = self._read_snapshot(vcs_dir).get(rel_cwd)
+                listing = _Listing(raw['vcs_stamp'], raw['dir_stamps'], raw['files']) if raw else None
+            except (KeyError, TypeError):
+                listing = None
+            if not listing:
+                return None
+        is_current = listing.vcs_stamp == _vcs_stamp(kind, vcs_dir)
+        if not is_current or listing.dir_stamps != _dir_stamps(cwd, list(listing.dir_stamps)):
+            self._listings.pop(key, None)
+            return None
+        self._listings[key] = listing
+        return listing.files
+
+    def set(self, cwd: Path, files: List[str], *, start_ns: int) -> None:
+        """Cache the files listed for `cwd` and write the snapshot.
+
+        Args:
+            cwd: directory that was listed
+            files: listed files relative to `cwd`
+            start_ns: `time.time_ns()` from before the files were listed. Nothing is cached if a stamped path was
+                modified within the racy window of this time
+
+        """
+        if not (located := self._locate(cwd)):
+            return
+        repo_root, kind, vcs_dir, rel_cwd = located
+        vcs_stamp = _vcs_stamp(kind, vcs_dir)
+        dir_stamps = _dir_stamps(cwd, _listed_dirs(files))
+        stamps = [*dir_stamps.values(), vcs_stamp['index']]
+        if any(stamp and stamp[0] >= start_ns - _RACY_WINDOW_NS for stamp in stamps):
+            LOGGER.text_debug('Not caching the file inventory of a recently modified directory', cwd=cwd)
+            return
+        listing = _Listing(vcs_stamp, dir_stamps, files)
+        path_snapshot = vcs_dir / SNAPSHOT_NAME
+        path_tmp = path_snapshot.with_name(f'{SNAPSHOT_NAME}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with self._lock:
+            self._listings[repo_root.as_posix(), rel_cwd] = listing
+            listings = self._read_snapshot(vcs_dir)
+            listings[rel_cwd] = {'vcs_stamp': vcs_stamp, 'dir_stamps': dir_stamps, 'files': files}
+            try:
+                path_tmp.write_text(json.dumps({'version': _SNAPSHOT_VERSION, 'listings': listings}), encoding='utf-8')
+                path_tmp.replace(path_snapshot)
+            except OSError as exc:
+                LOGGER.text_debug('Could not write file inventory snapshot', path=path_snapshot, exc=exc)
+                with suppress(OSError):
+                    path_tmp.unlink()
+
+    def clear(self) -> None:
+        """Forget the listings held in memory. Snapshots on disk are kept and still validated before reuse."""
+        self._listings.clear()
@@ -6,40 +6,101 @@ from contextlib import suppress
 from pathlib import Path
 from subprocess import CalledProcessError
 
-from beartype.typing import List
+from beartype.typing import Dict, List
 
-from corallium.shell import capture_shell
+from corallium.shell import capture_shell, capture_shell_async
 
+from ._types import AnnotatedLine
 
-def jj_file_list(*, cwd: Path) -> List[str] | None:
-    """Run `jj file list` and return the file list, or None on failure."""
+JJ_ANNOTATE_TEMPLATE = (
+    'commit.change_id().short() ++ "\\t" ++ commit.commit_id() ++ "\\t" ++ commit.author().email() ++ "\\t"'
+    ' ++ commit.committer().timestamp().format("%Y-%m-%dT%H:%M:%S%:z") ++ "\\t" ++ commit.current_working_copy()'
+    ' ++ "\\n"'
+)
+"""`jj file annotate` template with one tab-separated line per line of the file. Parsed by `parse_jj_annotate`."""
+
+
+def jj_file_list(*, cwd: Path, fileset: str = '') -> List[str] | None:
+    """Run `jj file list` and return the file list, or None on failure.
+
+    Args:
+        cwd: directory to list
+        fileset: optional fileset expression to limit the listing (e.g. `glob:"**/*.py" & ~glob:"docs/**"`)
+
+    Returns:
+        Listed file paths or None
+
+    """
+    cmd = ['jj', 'file', 'list', *([fileset] if fileset else [])]
     with suppress(CalledProcessError):
-        stdout = capture_shell('jj file list', cwd=cwd)
+        stdout = capture_shell(cmd, cwd=cwd)
         return [item for item in stdout.splitlines() if item]
     return None
 
 
-def jj_file_annotate(*, file_path: Path, line: int, cwd: Path) -> str | None:  # noqa: ARG001
+def _jj_file_annotate_cmd(file_path: Path, template: str) -> List[str]:
+    return ['jj', 'file', 'annotate', str(file_path), *(['-T', template] if template else [])]
+
+
+def jj_file_annotate(*, file_path: Path, line: int, cwd: Path, template: str = '') -> str | None:  # noqa: ARG001
     """Run `jj file annotate` for a file, or None on failure.
 
     Note: jj file annotate has no line-range option. The full file output
     is returned; the `line` parameter is reserved for future use.
 
+    Args:
+        file_path: path to the file to annotate
+        line: reserved for future use
+        cwd: working directory inside the repository
+        template: optional template for each line, such as `JJ_ANNOTATE_TEMPLATE`. Default is the jj output format
+
     """
     with suppress(CalledProcessError):
-        return capture_shell(f'jj file annotate {file_path}', cwd=cwd)
+        return capture_shell(_jj_file_annotate_cmd(file_path, template), cwd=cwd)
     return None
 
 
+async def jj_file_annotate_async(*, file_path: Path, line: int, cwd: Path, template: str = '') -> str | None:  # noqa: ARG001
+    """Asynchronous `jj_file_annotate`, or None on failure."""
+    with suppress(CalledProcessError):
+        return await capture_shell_async(_jj_file_annotate_cmd(file_path, template), cwd=cwd)
+    return None
+
+
+def parse_jj_annotate(stdout: str) -> Dict[int, AnnotatedLine]:
+    """Parse `jj file annotate` output from `JJ_ANNOTATE_TEMPLATE` into an index by line number.
+
+    Args:
+        stdout: Output from `jj file annotate -T JJ_ANNOTATE_TEMPLATE`
+
+    Returns:
+        Dictionary of line number (starting at 1) to the revision that last changed the line
+
+    """
+    index: Dict[int, AnnotatedLine] = {}
+    for lineno, line in enumerate(stdout.split('\n'), start=1):
+        parts = line.split('\t')
+        if len(parts) == 5:  # noqa: PLR2004
+            change_id, commit_id, author, timestamp, working_copy = parts
+            index[lineno] = AnnotatedLine(
+                change_id=change_id,
+                commit_id=commit_id,
+                author=author,
+                timestamp=timestamp,
+                working_copy=working_copy == 'true',
+            )
+    return index
+
+
 def jj_root(*, cwd: Path) -> Path | None:
     """Run `jj root`, or None on failure."""
     with suppress(CalledProcessError):
-        return Path(capture_shell('jj root', cwd=cwd).strip())
+        return Path(capture_shell(['jj', 'root'], cwd=cwd).strip())
     return None
 
 
 def jj_git_remote_list(*, cwd: Path) -> str | None:
     """Run `jj git remote list`, or None on failure."""
     with suppress(CalledProcessError):
-        return capture_shell('jj git remote list', cwd=cwd)
+        return capture_shell(['jj', 'git', 'remote', 'list'], cwd=cwd)
     return None
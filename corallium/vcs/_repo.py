@@ -7,6 +7,8 @@ from functools import lru_cache
 from pathlib import Path
 from subprocess import CalledProcessError
 
+from beartype.typing import Dict, List
+
 from corallium.shell import capture_shell
 
 from ._forge import detect_forge, parse_remote_url
@@ -32,29 +34,33 @@ def find_repo_root(start_path: Path | None = None) -> Path | None:
     """
     current = (start_path or Path.cwd()).resolve()
     while current != current.parent:
-        if any((current / marker).is_dir() for marker in _VCS_MARKERS):
+        if detect_vcs_kind(current):
             return current
         current = current.parent
     return None
 
 
 def detect_vcs_kind(repo_root: Path) -> VcsKind | None:
-    """Detect which VCS is in use at the given repo root."""
+    """Detect which VCS is in use at the given repo root.
+
+    `.git` may be a file rather than a directory in submodules and linked worktrees.
+
+    """
     for marker, kind in _VCS_MARKERS.items():
-        if (repo_root / marker).is_dir():
+        if (repo_root / marker).exists():
             return kind
     return None
 
 
 def _get_git_remote_url(*, cwd: Path) -> str:
     with suppress(CalledProcessError):
-        return capture_shell('git remote get-url origin', cwd=cwd).strip()
+        return capture_shell(['git', 'remote', 'get-url', 'origin'], cwd=cwd).strip()
     return ''
 
 
 def _get_git_branch(*, cwd: Path) -> str:
     with suppress(CalledProcessError):
-        return capture_shell('git branch --show-current', cwd=cwd).strip()
+        return capture_shell(['git', 'branch', '--show-current'], cwd=cwd).strip()
     return ''
 
 
@@ -69,7 +75,7 @@ def _get_jj_remote_url(*, cwd: Path) -> str:
 
 def _get_jj_bookmark(*, cwd: Path) -> str:
     with suppress(CalledProcessError):
-        raw = capture_shell('jj bookmark list --pointing-at @-', cwd=cwd)
+        raw = capture_shell(['jj', 'bookmark', 'list', '--pointing-at', '@-'], cwd=cwd)
         for line in raw.splitlines():
             if name := line.split(':')[0].strip():
                 return name
@@ -121,3 +127,47 @@ def get_repo_metadata(cwd: Path) -> RepoMetadata | None:
         branch=branch,
         forge=forge,
     )
+
+
+class RepoIndex:
+    """Map directories to their owning repository so that each repository is resolved once.
+
+    Each directory is walked up to the nearest `.git` or `.jj` marker and every directory visited along the way is
+    memoized, so the lookup for any other file under an already visited prefix is a single dictionary access. Nested
+    repositories and submodules resolve to the innermost root and the metadata is resolved once per root.
+
+    Unlike `get_repo_metadata`, directories without a marker in any parent are not in a repository.
+
+    """
+
+    def __init__(self) -> None:
+        self._roots: Dict[Path, Path | None] = {}
+        self._metadata: Dict[Path, RepoMetadata | None] = {}
+
+    def find_root(self, directory: Path) -> Path | None:
+        """Return the innermost repository root containing the directory, or None if not in a repository."""
+        visited: List[Path] = []
+        current = directory.absolute()
+        root: Path | None = None
+        while True:
+            if current in self._roots:
+                root = self._roots[current]
+                break
+            visited.append(current)
+            if detect_vcs_kind(current):
+                root = current
+                break
+            if current == current.parent:
+                break
+            current = current.parent
+        for path in visited:
+            self._roots[path] = root
+        return root
+
+    def get_metadata(self, directory: Path) -> RepoMetadata | None:
+        """Return the metadata of the repository containing the directory, or None if not in a repository."""
+        if not (root := self.find_root(directory)):
+            return None
+        if root not in self._metadata:
+            self._metadata[root] = get_repo_metadata(cwd=root)
+        return self._metadata[root]
@@ -34,3 +34,16 @@ class RepoMetadata:
     repo_name: str
     branch: str
     forge: ForgeKind
+
+
+@dataclass(frozen=True)
+class AnnotatedLine:
+    """Revision that last changed a line, from `jj file annotate`."""
+
+    change_id: str
+    commit_id: str
+    author: str
+    timestamp: str
+    """ISO 8601 committer timestamp with the committer's UTC offset."""
+    working_copy: bool
+    """True if the line was last changed in the working-copy commit."""
@@ -0,0 +1,39 @@
+"""Benchmark the code tag scanners with and without the literal prefilter.
+
+Uses the Python standard library source as a realistic corpus of code with a low density of code tags.
+
+"""
+
+import logging
+import re
+import sysconfig
+from pathlib import Path
+from timeit import timeit
+
+from corallium.code_tag_collector import CODE_TAG_RE, COMMON_CODE_TAGS
+from corallium.code_tag_collector._collector import _search_files  # noqa: PLC2701
+from corallium.log import LOGGER, configure_logger
+
+configure_logger(log_level=logging.INFO)
+
+paths_source = sorted(Path(sysconfig.get_paths()['stdlib']).rglob('*.py'))
+matcher = CODE_TAG_RE.format(tag='|'.join(COMMON_CODE_TAGS))
+regex_str = re.compile(matcher)
+regex_bytes = re.compile(matcher.encode('utf-8'), re.MULTILINE)
+LOGGER.text('Corpus', file_count=len(paths_source), mb=round(sum(p.stat().st_size for p in paths_source) / 1e6, 1))
+
+for name, regex_compiled in (('lines', regex_str), ('bytes', regex_bytes)):
+    baseline = timeit(lambda rc=regex_compiled: _search_files(paths_source, rc), number=3)
+    prefiltered = timeit(
+        lambda rc=regex_compiled: _search_files(paths_source, rc, prefilter_tags=COMMON_CODE_TAGS),
+        number=3,
+    )
+    LOGGER.text(
+        name,
+        baseline=round(baseline / 3, 3),
+        prefiltered=round(prefiltered / 3, 3),
+        speedup=round(baseline / prefiltered, 1),
+    )
+# > Corpus file_count=5167 mb=74.0
+# > lines baseline=3.084 prefiltered=0.664 speedup=4.6
+# > bytes baseline=3.05 prefiltered=0.575 speedup=5.3
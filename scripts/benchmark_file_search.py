@@ -0,0 +1,44 @@
+"""Benchmark the compiled ignore-pattern matcher against the previous `Path.match` implementation.
+
+Uses 100k synthetic relative paths with a mix of source files and files in commonly ignored directories.
+
+"""
+
+import logging
+from pathlib import Path
+from timeit import timeit
+
+from corallium.file_search import _filter_files, _get_default_ignore_patterns  # noqa: PLC2701
+from corallium.log import LOGGER, configure_logger
+
+configure_logger(log_level=logging.INFO)
+
+
+def legacy_filter_files(rel_filepaths: list[str], ignore_patterns: list[str]) -> list[str]:
+    """Previous implementation that resolves each path and tries every pattern with `Path.match`."""
+    return [fp for fp in rel_filepaths if not any(Path(fp).resolve().match(pat) for pat in ignore_patterns)]
+
+
+templates = [
+    'src/pkg_{idx}/module_{idx}.py',
+    'tests/pkg_{idx}/test_module_{idx}.py',
+    'docs/section_{idx}/page.md',
+    'src/pkg_{idx}/__pycache__/module_{idx}.cpython-312.pyc',
+    'node_modules/lib_{idx}/dist/index.js',
+    '.venv/lib/python3.12/site-packages/pkg_{idx}/__init__.py',
+    '.git/objects/{idx:02x}/abcdef',
+    'build/lib/pkg_{idx}/module.py',
+]
+rel_filepaths = [templates[idx % len(templates)].format(idx=idx) for idx in range(100_000)]
+ignore_patterns = _get_default_ignore_patterns()
+
+legacy = timeit(lambda: legacy_filter_files(rel_filepaths, ignore_patterns), number=1)
+compiled = timeit(lambda: _filter_files(rel_filepaths, ignore_patterns), number=3) / 3
+LOGGER.text(
+    'Filter 100k paths',
+    legacy=round(legacy, 3),
+    compiled=round(compiled, 3),
+    speedup=round(legacy / compiled, 1),
+    kept=len(_filter_files(rel_filepaths, ignore_patterns)),
+)
+# > Filter 100k paths legacy=36.356 compiled=0.168 speedup=216.5 kept=37500
@@ -0,0 +1,59 @@
+"""Benchmark the throughput of `capture_shell` against the previous `readline` and `poll` loop.
+
+Captures a command that prints 1 GB of 100-byte lines. Set `BENCHMARK_SHELL_MB` to change the size.
+
+"""
+
+import logging
+import os
+import subprocess
+from time import perf_counter, time
+
+from corallium.log import LOGGER, configure_logger
+from corallium.shell import capture_shell
+
+configure_logger(log_level=logging.INFO)
+
+
+def legacy_capture_shell(cmd: str, *, timeout: int | None = 120) -> str:
+    """Previous implementation that reads one line at a time and polls at the end of the output."""
+    start = time()
+    lines = []
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+        shell=True,
+    ) as proc:
+        if not (stdout := proc.stdout):
+            raise NotImplementedError('Failed to read stdout from process.')
+        return_code = None
+        while return_code is None:
+            if timeout is not None and time() - start >= timeout:
+                proc.kill()
+                break
+            if line := stdout.readline():
+                lines.append(line)
+            else:
+                return_code = proc.poll()
+    return ''.join(lines)
+
+
+size_mb = int(os.getenv('BENCHMARK_SHELL_MB', '1024'))
+cmd = f"yes '{'x' * 99}' | head -c {size_mb * 1024 * 1024}"
+
+for name, capture in (('legacy', legacy_capture_shell), ('chunked', capture_shell)):
+    start = perf_counter()
+    output = capture(cmd, timeout=600)
+    duration = perf_counter() - start
+    LOGGER.text(
+        'Capture shell output',
+        implementation=name,
+        size_mb=len(output) // (1024 * 1024),
+        seconds=round(duration, 2),
+        mb_per_second=round(size_mb / duration, 1),
+    )
+    del output
+# > Capture shell output implementation=legacy size_mb=1024 seconds=6.34 mb_per_second=161.6
+# > Capture shell output implementation=chunked size_mb=1024 seconds=1.69 mb_per_second=607.5
@@ -0,0 +1,27 @@
+"""Benchmark running git through `/bin/sh` against executing it directly from an argv sequence.
+
+Runs `git rev-parse --show-toplevel` 500 times in this repository, like the many small git calls of the tag collector.
+
+"""
+
+import logging
+from pathlib import Path
+from timeit import timeit
+
+from corallium.log import LOGGER, configure_logger
+from corallium.shell import capture_shell
+
+configure_logger(log_level=logging.INFO)
+
+cwd = Path(__file__).parent
+number = 500
+
+shell = timeit(lambda: capture_shell('git rev-parse --show-toplevel', cwd=cwd), number=number)
+argv = timeit(lambda: capture_shell(['git', 'rev-parse', '--show-toplevel'], cwd=cwd), number=number)
+LOGGER.text(
+    'Run git 500 times',
+    shell_ms_per_call=round(shell / number * 1000, 2),
+    argv_ms_per_call=round(argv / number * 1000, 2),
+    speedup=round(shell / argv, 2),
+)
+# > Run git 500 times shell_ms_per_call=4.2 argv_ms_per_call=3.65 speedup=1.15
@@ -1,15 +1,28 @@
+import asyncio
+import json
+import os
 import re
+from unittest.mock import patch
 
 import pytest
 
 from corallium.code_tag_collector import CODE_TAG_RE, COMMON_CODE_TAGS, SKIP_PHRASE, write_code_tag_file
 from corallium.code_tag_collector._collector import (
     _LEGACY_SKIP_PHRASES,
-    _CodeTag,
+    _format_file_records,
     _format_report,
+    _iter_report_rows,
+    _prefilter_pattern,
+    _search_buffer,
+    _search_content,
+    _search_file,
+    _search_files,
     _search_lines,
-    _Tags,
+    _search_prefiltered_lines,
 )
+from corallium.code_tag_collector._types import _CodeTag, _Tags
+from corallium.shell import capture_shell
+from corallium.vcs import ForgeKind, RepoMetadata, VcsKind
 from tests.configuration import TEST_DATA_DIR
 
 TEST_PROJECT = TEST_DATA_DIR / 'test_project'
@@ -56,6 +69,57 @@ def test_format_report(fake_process, snapshot):
     assert output == snapshot
 
 
+def test_format_report_blames_each_file_once():
+    path_source = TEST_DATA_DIR / 'sample_doc_files' / 'README.md'
+    comments = [_CodeTag(lineno=1, tag='TODO', text='First'), _CodeTag(lineno=3, tag='FIXME', text='Second')]
+    tagged_collection = [_Tags(path_source=path_source, code_tags=comments)]
+
+    with patch(
+        'corallium.code_tag_collector._collector.git_blame_line_porcelain_async',
+        return_value=None,
+    ) as mock_blame:
+        output = _format_report(TEST_DATA_DIR, tagged_collection, tag_order=['TODO', 'FIXME'])
+
+    mock_blame.assert_called_once()
+    assert mock_blame.call_args.kwargs['lines'] == [1, 3]
+    assert 'Found code tags for TODO (1), FIXME (1)' in output
+
+
+def test_format_report_bounds_concurrent_blames(fix_test_cache):
+    paths_source = [fix_test_cache / f'file_{idx}.py' for idx in range(7)]
+    tagged_collection = [
+        _Tags(path_source=path_source, code_tags=[_CodeTag(lineno=1, tag='TODO', text=path_source.stem)])
+        for path_source in reversed(paths_source)
+    ]
+    blame_workers = 2
+    running = 0
+    max_running = 0
+
+    async def fake_blame(**_kwargs: object) -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    with patch('corallium.code_tag_collector._collector.git_blame_line_porcelain_async', side_effect=fake_blame):
+        rows = list(_iter_report_rows(fix_test_cache, tagged_collection, ['TODO'], blame_workers=blame_workers))
+
+    assert max_running == blame_workers
+    assert [rel_path.stem for rel_path, _comment, _row in rows] == [path.stem for path in paths_source]
+
+
+@pytest.mark.asyncio
+async def test_write_code_tag_file_from_running_event_loop(fix_test_cache):  # noqa: RUF029 # needs a running loop
+    path_tag_summary = fix_test_cache / 'code_tags.md'
+    path_source = fix_test_cache / 'source.py'
+    path_source.write_text('# TODO: Called from async code\n')
+
+    write_code_tag_file(path_tag_summary=path_tag_summary, paths_source=[path_source], base_dir=fix_test_cache)
+
+    assert '| TODO | Called from async code |' in path_tag_summary.read_text()
+
+
 @pytest.fixture
 def todo_regex():
     """Compiled TODO regex pattern."""
@@ -68,6 +132,42 @@ def all_tags_regex():
     return re.compile(CODE_TAG_RE.format(tag='|'.join(COMMON_CODE_TAGS)))
 
 
+def test_format_report_jj_annotates_each_file_once(fix_test_cache):
+    path_source = fix_test_cache / 'src' / 'main.py'
+    path_source.parent.mkdir()
+    path_source.write_text('# TODO: First\nx = 1\n# FIXME: Second\n')
+    tagged_collection = [
+        _Tags(
+            path_source=path_source,
+            code_tags=[_CodeTag(lineno=1, tag='TODO', text='First'), _CodeTag(lineno=3, tag='FIXME', text='Second')],
+        ),
+    ]
+    metadata = RepoMetadata(
+        root=fix_test_cache,
+        vcs=VcsKind.JUJUTSU,
+        remote_url='https://github.com/owner/repo',
+        owner='owner',
+        repo_name='repo',
+        branch='main',
+        forge=ForgeKind.GITHUB,
+    )
+    annotate = (
+        'qpvuntsm\tabc123\tuser@example.com\t2024-01-02T23:04:05-02:00\tfalse\n'
+        'qpvuntsm\tabc123\tuser@example.com\t2024-01-02T23:04:05-02:00\tfalse\n'
+        'rlvkpnrz\tdef456\tuser@example.com\t2024-02-03T04:05:06+00:00\ttrue\n'
+    )
+
+    with (
+        patch('corallium.vcs._repo.get_repo_metadata', return_value=metadata),
+        patch('corallium.code_tag_collector._collector.jj_file_annotate_async', return_value=annotate) as mock,
+    ):
+        output = _format_report(fix_test_cache, tagged_collection, tag_order=['TODO', 'FIXME'])
+
+    assert mock.call_count == 1
+    assert '| 2024-01-02 | [src/main.py:1](https://github.com/owner/repo/blame/abc123/src/main.py#L1)' in output
+    assert '| 2024-02-03 | [src/main.py:3](https://github.com/owner/repo/blame/main/src/main.py#L3)' in output
+
+
 @pytest.mark.parametrize(
     ('lines', 'expected_count', 'expected_tags', 'skip_phrase_override'),
     [
@@ -123,6 +223,268 @@ def test_search_lines_variations(
         assert result[idx].tag == expected_tag
 
 
+@pytest.mark.parametrize('use_prefilter', [False, True])
+@pytest.mark.parametrize('line_break', ['\n', '\r\n'])
+@pytest.mark.parametrize('trailing', ['', '\n'])
+def test_search_buffer_matches_search_lines(line_break: str, trailing: str, *, use_prefilter: bool):
+    lines = [
+        '# DEBUG: Show dodo.py in the documentation',
+        'print("FIXME: Show README.md in the documentation (may need to update paths?)")',
+        '\tclass Code: # TODO: Complete',
+        '   //TODO: Not matched',
+        '   ...  # Both FIXME: and HACK: in the same line, but only match the first',
+        '# FIXME: ' + 'For a long line is ignored ...' * 14,
+        '# REVIEW: ünïcode text',
+        '',
+    ]
+    matcher = CODE_TAG_RE.format(tag='|'.join(COMMON_CODE_TAGS))
+    buffer = (line_break.join(lines) + trailing).encode('utf-8')
+
+    prefilter = re.compile(_prefilter_pattern(COMMON_CODE_TAGS).encode('utf-8')) if use_prefilter else None
+
+    result = _search_buffer(buffer, re.compile(matcher.encode('utf-8'), re.MULTILINE), prefilter=prefilter)
+
+    assert result == _search_lines(lines, re.compile(matcher))
+    assert [comment.tag for comment in result] == ['DEBUG', 'FIXME', 'TODO', 'FIXME', 'REVIEW']
+
+
+@pytest.mark.parametrize(
+    'text',
+    [
+        f'# TODO: Skipped\n\n<!-- {SKIP_PHRASE} -->\n',
+        f'# TODO: Skipped\n<!-- {SKIP_PHRASE} -->\n\n',
+        f'# TODO: Skipped {SKIP_PHRASE}',
+    ],
+)
+def test_search_buffer_skip_phrase(text: str):
+    regex = re.compile(CODE_TAG_RE.format(tag='TODO').encode('utf-8'), re.MULTILINE)
+
+    assert _search_buffer(text.encode('utf-8'), regex) == []
+
+
+def test_search_buffer_skip_phrase_only_in_final_lines():
+    text = f'<!-- {SKIP_PHRASE} -->\n# TODO: Found\n\nx = 1\n'
+    regex = re.compile(CODE_TAG_RE.format(tag='TODO').encode('utf-8'), re.MULTILINE)
+
+    assert _search_buffer(text.encode('utf-8'), regex) == [_CodeTag(lineno=2, tag='TODO', text='Found')]
+
+
+def test_write_code_tag_file_scan_bytes(fix_test_cache):
+    path_tag_summary = fix_test_cache / 'code_tags.md'
+    path_source = fix_test_cache / 'source.py'
+    path_source.write_text('x = 1\n# TODO: Found with bytes\n')
+    (fix_test_cache / 'empty.py').write_text('')
+
+    write_code_tag_file(
+        path_tag_summary=path_tag_summary,
+        paths_source=[path_source, fix_test_cache / 'empty.py'],
+        base_dir=fix_test_cache,
+        scan_bytes=True,
+    )
+
+    summary = path_tag_summary.read_text()
+    assert '| TODO | Found with bytes | N/A       | source.py:2 |' in summary
+
+
+def test_write_code_tag_file_structured_reports(fix_test_cache):
+    path_tag_summary = fix_test_cache / 'code_tags.md'
+    path_json_lines = fix_test_cache / 'reports' / 'code_tags.jsonl'
+    path_sarif = fix_test_cache / 'reports' / 'code_tags.sarif'
+    path_source = fix_test_cache / 'source.py'
+    path_source.write_text('# FIXME: First\nx = 1\n# TODO: Second\n')
+
+    with patch('corallium.code_tag_collector._collector._format_file_records', wraps=_format_file_records) as mock:
+        write_code_tag_file(
+            path_tag_summary=path_tag_summary,
+            paths_source=[path_source],
+            base_dir=fix_test_cache,
+            tags='TODO,FIXME',
+            path_json_lines=path_json_lines,
+            path_sarif=path_sarif,
+        )
+
+    assert mock.call_count == 1
+    assert 'Found code tags for TODO (1), FIXME (1)' in path_tag_summary.read_text()
+    records = [json.loads(line) for line in path_json_lines.read_text().splitlines()]
+    assert records == [
+        {'tag': 'FIXME', 'text': 'First', 'path': 'source.py', 'line': 1, 'last_edit': None, 'url': None},
+        {'tag': 'TODO', 'text': 'Second', 'path': 'source.py', 'line': 3, 'last_edit': None, 'url': None},
+    ]
+    sarif = json.loads(path_sarif.read_text())
+    assert sarif['version'] == '2.1.0'
+    (run,) = sarif['runs']
+    assert [rule['id'] for rule in run['tool']['driver']['rules']] == ['TODO', 'FIXME']
+    assert [(result['ruleId'], result['ruleIndex'], result['message']['text']) for result in run['results']] == [
+        ('FIXME', 1, 'First'),
+        ('TODO', 0, 'Second'),
+    ]
+    location = run['results'][1]['locations'][0]['physicalLocation']
+    assert location == {'artifactLocation': {'uri': 'source.py'}, 'region': {'startLine': 3}}
+
+
+def test_write_code_tag_file_keeps_reports_on_error(tmp_path):
+    path_source = tmp_path / 'source.py'
+    path_source.write_text('# TODO: Found\n')
+    paths_report = [tmp_path / 'code_tags.md', tmp_path / 'code_tags.jsonl', tmp_path / 'code_tags.sarif']
+    for path_report in paths_report:
+        path_report.write_text('previous')
+
+    with (
+        patch('corallium.code_tag_collector._collector._format_file_records', side_effect=RuntimeError),
+        pytest.raises(RuntimeError),
+    ):
+        write_code_tag_file(
+            path_tag_summary=paths_report[0],
+            paths_source=[path_source],
+            base_dir=tmp_path,
+            path_json_lines=paths_report[1],
+            path_sarif=paths_report[2],
+        )
+
+    assert [path_report.read_text() for path_report in paths_report] == ['previous'] * len(paths_report)
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(['source.py', *(p.name for p in paths_report)])
+
+
+def test_write_code_tag_file_structured_reports_when_no_matches(fix_test_cache):
+    path_json_lines = fix_test_cache / 'code_tags.jsonl'
+    path_sarif = fix_test_cache / 'code_tags.sarif'
+    tmp_code_file = fix_test_cache / 'tmp.code'
+    tmp_code_file.write_text('No FIXMES or TODOS here')
+
+    write_code_tag_file(
+        path_tag_summary=fix_test_cache / 'code_tags.md',
+        paths_source=[tmp_code_file],
+        base_dir=fix_test_cache,
+        path_json_lines=path_json_lines,
+        path_sarif=path_sarif,
+    )
+
+    assert not path_json_lines.read_text()
+    assert json.loads(path_sarif.read_text())['runs'][0]['results'] == []
+
+
+def test_search_lines_with_prefilter():
+    lines = [
+        '# DEBUG: Show dodo.py in the documentation',
+        'print("FIXME: Show README.md in the documentation (may need to update paths?)")',
+        '# FYI: Replace src_examples_dir',
+        'x = "TODO" # HACK: Second tag on the line is still matched',
+        '# REVIEW: Show table of contents in __init__.py file',
+    ]
+    tag_order = ['FIXME', 'HACK', 'REVIEW']
+    regex = re.compile(CODE_TAG_RE.format(tag='|'.join(tag_order)))
+
+    result = _search_prefiltered_lines(lines, regex, re.compile(_prefilter_pattern(tag_order)))
+
+    assert result == _search_lines(lines, regex)
+    assert [comment.tag for comment in result] == ['FIXME', 'HACK', 'REVIEW']
+
+
+def test_search_files_parallel_matches_serial(fix_test_cache):
+    paths_source = []
+    for idx in range(12):
+        path_source = fix_test_cache / f'file_{idx:02}.py'
+        path_source.write_text('\n'.join(['x = 1', f'# TODO: Task {idx}', '# FIXME: Fix'][: 1 + idx % 3]))
+        paths_source.append(path_source)
+    paths_source.append(fix_test_cache / 'missing.py')
+    regex = re.compile(CODE_TAG_RE.format(tag='|'.join(COMMON_CODE_TAGS)))
+
+    serial = _search_files(paths_source, regex)
+    parallel = _search_files(paths_source, regex, workers=2, chunksize=3)
+
+    assert parallel == serial
+    assert [tags.path_source.name for tags in parallel] == [f'file_{idx:02}.py' for idx in range(12) if idx % 3]
+
+
+def _write_stale(path_file, text: str) -> None:
+    """Write text with an old mtime so that the file is outside of the racy window."""
+    path_file.write_text(text)
+    mtime = path_file.stat().st_mtime - 60
+    os.utime(path_file, (mtime, mtime))
+
+
+def test_search_files_cache_skips_unchanged_files(fix_test_cache):
+    path_cache = fix_test_cache / 'cache' / 'code_tags.jsonl'
+    path_a = fix_test_cache / 'a.py'
+    path_b = fix_test_cache / 'b.py'
+    _write_stale(path_a, '# TODO: Cached')
+    _write_stale(path_b, '# FIXME: Changed')
+    regex = re.compile(CODE_TAG_RE.format(tag='|'.join(COMMON_CODE_TAGS)))
+
+    cold = _search_files([path_a, path_b], regex, path_cache=path_cache)
+    _write_stale(path_b, '# HACK: Changed')
+    with patch('corallium.code_tag_collector._collector._search_file', wraps=_search_file) as mock_search:
+        warm = _search_files([path_a, path_b], regex, path_cache=path_cache)
+
+    assert [call.args[0] for call in mock_search.call_args_list] == [path_b]
+    assert warm[0] == cold[0]
+    assert warm[1].code_tags == [_CodeTag(lineno=1, tag='HACK', text='Changed')]
+
+
+def test_search_files_cache_invalidated_by_regex(fix_test_cache):
+    path_cache = fix_test_cache / 'code_tags.jsonl'
+    path_a = fix_test_cache / 'a.py'
+    _write_stale(path_a, '# TODO: First\n# FIXME: Second')
+
+    first = _search_files([path_a], re.compile(CODE_TAG_RE.format(tag='TODO')), path_cache=path_cache)
+    second = _search_files([path_a], re.compile(CODE_TAG_RE.format(tag='FIXME')), path_cache=path_cache)
+
+    assert [tag.tag for tag in first[0].code_tags] == ['TODO']
+    assert [tag.tag for tag in second[0].code_tags] == ['FIXME']
+
+
+def test_search_files_cache_skips_recently_modified_files(tmp_path):
+    path_cache = tmp_path / 'code_tags.jsonl'
+    path_a = tmp_path / 'a.py'
+    path_a.write_text('# TODO: Racy')
+    regex = re.compile(CODE_TAG_RE.format(tag='TODO'))
+
+    _search_files([path_a], regex, path_cache=path_cache)
+
+    assert not path_cache.is_file()
+
+
+def test_search_files_from_git_blobs(tmp_path):
+    capture_shell('git init -q', cwd=tmp_path)
+    path_a = tmp_path / 'a.py'
+    path_b = tmp_path / 'b.py'
+    path_untracked = tmp_path / 'untracked.py'
+    for path_source in (path_a, path_b):
+        path_source.write_text('# TODO: Staged\n')
+    capture_shell('git add a.py b.py', cwd=tmp_path)
+    path_a.write_text('# FIXME: Unstaged\n')
+    path_untracked.write_text('# HACK: Untracked\n')
+    regex = re.compile(CODE_TAG_RE.format(tag='|'.join(COMMON_CODE_TAGS)))
+
+    with patch('corallium.code_tag_collector._collector._search_content', wraps=_search_content) as mock_search:
+        result = _search_files([path_a, path_b, path_untracked], regex, git_root=tmp_path)
+
+    assert [call.kwargs.get('source') for call in mock_search.call_args_list] == [None, path_a, path_untracked]
+    assert [(tags.path_source, tags.code_tags[0].tag) for tags in result] == [
+        (path_a, 'FIXME'),
+        (path_b, 'TODO'),
+        (path_untracked, 'HACK'),
+    ]
+
+
+def test_write_code_tag_file_scan_git_blobs_matches_working_tree_lines(tmp_path):
+    capture_shell('git init -q', cwd=tmp_path)
+    path_source = tmp_path / 'a.py'
+    path_source.write_text('# TODO: Committed\n')
+    capture_shell('git add a.py && git -c user.name=Test -c user.email=test@example.com commit -qm init', cwd=tmp_path)
+    path_source.write_text('x = 1\ny = 2\n# TODO: Committed\n')
+    path_tag_summary = tmp_path / 'code_tags.md'
+
+    write_code_tag_file(
+        path_tag_summary=path_tag_summary,
+        paths_source=[path_source],
+        base_dir=tmp_path,
+        scan_git_blobs=True,
+    )
+
+    assert 'a.py:3' in path_tag_summary.read_text()
+
+
 def test_write_code_tag_file_when_no_matches(fix_test_cache):
     path_tag_summary = fix_test_cache / 'code_tags.md'
     path_tag_summary.write_text('Should be removed.')
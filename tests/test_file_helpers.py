@@ -1,5 +1,7 @@
 """Test file_helpers (referenced in below test)."""
 
+import os
+import time
 from pathlib import Path
 
 import pytest
@@ -9,6 +11,7 @@ from corallium.file_helpers import (
     _parse_mise_toml,
     _parse_tool_versions,
     delete_dir,
+    delete_old_files,
     ensure_dir,
     get_tool_versions,
     if_found_unlink,
@@ -67,6 +70,29 @@ def test_dir_tools(fix_test_cache):
     assert not tmp_dir.is_dir()
 
 
+@pytest.mark.parametrize('workers', [1, 4])
+def test_delete_old_files(tmp_path, workers):
+    dir_path = tmp_path / 'cache'
+    (dir_path / 'nested').mkdir(parents=True)
+    path_target = tmp_path / 'target.txt'
+    path_target.write_text('outside')
+    for path in (dir_path / 'old.txt', dir_path / 'nested' / 'old.txt', dir_path / 'new.txt', path_target):
+        path.write_text('content')
+    old_time = time.time() - 3600
+    for path in (dir_path / 'old.txt', dir_path / 'nested' / 'old.txt', path_target):
+        os.utime(path, (old_time, old_time))
+    (dir_path / 'link.txt').symlink_to(path_target)
+
+    delete_old_files(dir_path, ttl_seconds=60, workers=workers)
+
+    assert sorted(path.relative_to(dir_path).as_posix() for path in dir_path.rglob('*')) == [
+        'link.txt',
+        'nested',
+        'new.txt',
+    ]
+    assert path_target.is_file()
+
+
 def test_parse_mise_lock(fix_test_cache):
     lock_path = fix_test_cache / 'mise.lock'
     lock_path.write_text("""\
@@ -0,0 +1,56 @@
+"""Test file_index."""
+
+from pathlib import Path
+
+import pytest
+
+from corallium.file_index import FileIndex, _suffixes
+from corallium.file_search import find_project_files_by_suffix
+
+_ROOT = Path('root')
+_PATHS = [
+    'Dockerfile',
+    'README.md',
+    'src/app.ts',
+    'src/app.test.ts',
+    'src/lib/util.spec.ts',
+    'src/lib/.eslintrc.json',
+    'srcx/other.ts',
+    'docs/Dockerfile',
+]
+
+
+@pytest.mark.parametrize(
+    ('name', 'expected'),
+    [
+        ('app.test.ts', ['ts', 'test.ts']),
+        ('archive.tar.gz', ['gz', 'tar.gz']),
+        ('Dockerfile', []),
+        ('.gitignore', []),
+        ('.eslintrc.json', ['json']),
+    ],
+)
+def test_suffixes(name: str, expected: list[str]) -> None:
+    assert _suffixes(name) == expected
+
+
+def test_file_index_lookups() -> None:
+    index = FileIndex(_PATHS, root=_ROOT)
+
+    assert len(index) == len(_PATHS)
+    assert list(index) == [_ROOT / path for path in _PATHS]
+    assert index.by_suffix('test.ts', '.spec.ts') == [_ROOT / 'src/app.test.ts', _ROOT / 'src/lib/util.spec.ts']
+    assert index.by_suffix('ts', 'md') == [_ROOT / path for path in _PATHS if path.endswith(('.ts', '.md'))]
+    assert index.by_suffix('') == [_ROOT / 'Dockerfile', _ROOT / 'docs/Dockerfile']
+    assert index.by_name('Dockerfile', 'missing') == [_ROOT / 'Dockerfile', _ROOT / 'docs/Dockerfile']
+    assert index.under('src/') == [_ROOT / path for path in _PATHS if path.startswith('src/')]
+    assert index.under('src/lib') == [_ROOT / 'src/lib/util.spec.ts', _ROOT / 'src/lib/.eslintrc.json']
+    assert index.under('') == list(index)
+
+
+def test_file_index_suffix_groups_match_find_project_files_by_suffix() -> None:
+    project_root = Path(__file__).parent.parent
+
+    index = FileIndex.from_project(project_root)
+
+    assert index.suffix_groups() == find_project_files_by_suffix(project_root)
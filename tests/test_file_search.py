@@ -1,18 +1,32 @@
 """Test file_search."""
 
+import os
+import time
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
 from corallium.file_search import (
+    _INVENTORY,
+    _compile_ignore_patterns,
+    _compile_prune_patterns,
     _filter_files,
     _get_all_files,
     _get_default_ignore_patterns,
-    _walk_files,
+    _git_pathspecs,
+    _jj_fileset,
+    _list_matching_files,
+    _pushdown_globs,
+    _scan_dir,
     find_project_files,
     find_project_files_by_suffix,
+    find_workspace_files,
+    iter_project_files,
+    walk_files,
 )
+from corallium.shell import capture_shell
+from corallium.vcs import git_ls_files_existing, zsplit
 
 from .configuration import TEST_DATA_DIR
 
@@ -56,6 +70,55 @@ def test_filter_files_by_directory_pattern(tmp_path: Path) -> None:
     assert 'main.py' in result[0]
 
 
+@pytest.mark.parametrize(
+    ('pattern', 'rel_path', 'expected'),
+    [
+        ('**/.git/**', '.git/objects/ab/cdef', True),
+        ('**/.git/**', 'sub/.git/config', True),
+        ('**/.git/**', 'src/.git', False),
+        ('*.pyc', 'a/b/module.pyc', True),
+        ('*.pyc', 'module.py', False),
+        ('*/__pycache__/*', '__pycache__/module.pyc', True),
+        ('**/.coverage*', 'src/.coverage.host', True),
+        ('/build', 'build/lib/a.py', True),
+        ('/build', 'src/build/a.py', False),
+        ('docs/**/*.md', 'docs/a/b/page.md', True),
+        ('docs/**/*.md', 'src/docs/page.md', True),
+        ('docs/**/*.md', 'docs/page.txt', False),
+        ('[!a]x.py', 'bx.py', True),
+        ('[!a]x.py', 'ax.py', False),
+        ('file?.txt', 'file1.txt', True),
+        ('file?.txt', 'file/.txt', False),
+        ('*.md', 'docs.md.bak', False),
+    ],
+)
+def test_compile_ignore_patterns(pattern: str, rel_path: str, *, expected: bool) -> None:
+    matcher = _compile_ignore_patterns([pattern])
+
+    assert matcher
+    assert bool(matcher.match(rel_path)) is expected
+
+
+def test_compile_ignore_patterns_without_patterns() -> None:
+    assert _compile_ignore_patterns([]) is None
+    assert _compile_ignore_patterns(['', '/']) is None
+
+
+def test_filter_files_default_patterns_in_nested_directories() -> None:
+    files = [
+        'src/main.py',
+        '.git/objects/ab/cdef',
+        'node_modules/lib/dist/index.js',
+        'pkg/__pycache__/mod.cpython-312.pyc',
+        '.venv/lib/python3.12/site-packages/pkg/__init__.py',
+        'docs/building.md',
+    ]
+
+    result = _filter_files(files, _get_default_ignore_patterns())
+
+    assert result == ['src/main.py', 'docs/building.md']
+
+
 def test_find_project_files_in_git_repo() -> None:
     project_root = Path(__file__).parent.parent
 
@@ -74,6 +137,23 @@ def test_find_project_files_respects_ignore_patterns() -> None:
     assert not any(str(p).endswith('.md') for p in result)
 
 
+def test_iter_project_files_matches_find_project_files() -> None:
+    project_root = Path(__file__).parent.parent
+    _INVENTORY.clear()
+
+    with patch('corallium.file_search._INVENTORY.get', return_value=None):
+        streamed = list(iter_project_files(project_root, ignore_patterns=['*.md']))
+
+    assert streamed == find_project_files(project_root, ignore_patterns=['*.md'])
+    assert all(path.suffix != '.md' for path in streamed)
+
+
+def test_iter_project_files_without_git(tmp_path: Path) -> None:
+    (tmp_path / 'source.py').write_text('')
+
+    assert list(iter_project_files(tmp_path, ignore_patterns=[])) == [tmp_path / 'source.py']
+
+
 def test_find_project_files_by_suffix_groups_by_extension() -> None:
     project_root = Path(__file__).parent.parent
 
@@ -110,12 +190,136 @@ def test_walk_files_basic(tmp_path: Path) -> None:
     (tmp_path / 'subdir').mkdir()
     (tmp_path / 'subdir' / 'file2.py').write_text('content')
 
-    files = _walk_files(cwd=tmp_path)
+    files = walk_files(tmp_path)
 
     assert 'file1.py' in files
     assert 'subdir/file2.py' in files
 
 
+def test_walk_files_prunes_ignored_directories(tmp_path: Path) -> None:
+    for rel_path in ('src/main.py', 'node_modules/lib/index.js', 'src/__pycache__/main.pyc', 'docs/building.md'):
+        (tmp_path / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel_path).write_text('content')
+    (tmp_path / 'linked').symlink_to(tmp_path / 'src', target_is_directory=True)
+
+    with patch('corallium.file_search._scan_dir', wraps=_scan_dir) as mock_scan:
+        files = walk_files(tmp_path, ignore_patterns=_get_default_ignore_patterns())
+
+    assert files == ['docs/building.md', 'src/main.py']
+    scanned = {path.relative_to(tmp_path).as_posix() for (path,), _kwargs in mock_scan.call_args_list}
+    assert scanned == {'.', 'docs', 'src'}
+
+
+@pytest.mark.parametrize(
+    ('pattern', 'rel_dir', 'expected'),
+    [
+        ('**/node_modules/**', 'node_modules', True),
+        ('**/node_modules/**', 'a/node_modules', True),
+        ('*/__pycache__/*', '__pycache__', False),
+        ('**/.coverage*', 'src', False),
+        ('build', 'build', True),
+        ('*.pyc', 'src', False),
+    ],
+)
+def test_compile_prune_patterns(pattern: str, rel_dir: str, *, expected: bool) -> None:
+    prune = _compile_prune_patterns([pattern])
+
+    assert prune
+    assert bool(prune.match(rel_dir)) is expected
+
+
+def test_walk_files_with_gitignore_matches_git(tmp_path: Path) -> None:
+    rel_paths = [
+        'a.py',
+        'b.pyc',
+        'build/x.o',
+        'build/keep.txt',
+        'src/build/y.o',
+        'logs/1.log',
+        'logs/important.log',
+        'node_modules/x/index.js',
+        'docs/a.md',
+        'docs/sub/keep.md',
+        'sub/t.tmp',
+        'sub/deep/keep.tmp',
+    ]
+    for rel_path in rel_paths:
+        (tmp_path / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel_path).write_text('content')
+    (tmp_path / '.gitignore').write_text(
+        '*.pyc\n/build/*\n!/build/keep.txt\n*.log\n!important.log\nnode_modules/\ndocs/**/*.md\n!docs/sub/keep.md\n',
+    )
+    (tmp_path / 'sub' / '.gitignore').write_text('*.tmp\n!deep/keep.tmp\n')
+    capture_shell('git init -q', cwd=tmp_path)
+    git_files = zsplit(capture_shell('git -c core.excludesFile= ls-files -z --others --exclude-standard', cwd=tmp_path))
+
+    files = walk_files(tmp_path, use_gitignore=True)
+
+    assert files == sorted(git_files)
+    assert 'build/keep.txt' in files
+    assert 'sub/deep/keep.tmp' in files
+
+
+def test_get_all_files_gitignore_fallback(tmp_path: Path) -> None:
+    (tmp_path / '.gitignore').write_text('*.log\n')
+    (tmp_path / 'test.py').write_text('content')
+    (tmp_path / 'debug.log').write_text('content')
+
+    with patch('corallium.file_search.git_ls_files', return_value=None):
+        files, used_git = _get_all_files(cwd=tmp_path)
+
+    assert used_git
+    assert files == ['.gitignore', 'test.py']
+
+
+def test_find_project_files_gitignore_fallback_matches_git(tmp_path: Path) -> None:
+    (tmp_path / '.gitignore').write_text('*.log\n')
+    for rel_file in ('src/build/__init__.py', 'venv/keep.py', 'debug.log', 'main.py'):
+        (tmp_path / rel_file).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel_file).write_text('content')
+
+    files = find_project_files(tmp_path, ignore_patterns=[])
+
+    # Same as `git ls-files --others --exclude-standard`, so the default patterns do not prune build/ or venv/
+    assert [path.relative_to(tmp_path).as_posix() for path in files] == [
+        '.gitignore',
+        'main.py',
+        'src/build/__init__.py',
+        'venv/keep.py',
+    ]
+
+
+def test_get_all_files_gitignore_fallback_without_root_gitignore(tmp_path: Path) -> None:
+    (tmp_path / '.git' / 'info').mkdir(parents=True)
+    (tmp_path / '.git' / 'info' / 'exclude').write_text('*.tmp\n')
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / '.gitignore').write_text('*.log\n')
+    for rel_file in ('a.py', 'a.tmp', 'sub/b.py', 'sub/b.log', 'build/c.py'):
+        (tmp_path / rel_file).parent.mkdir(exist_ok=True)
+        (tmp_path / rel_file).write_text('content')
+
+    with patch('corallium.file_search.git_ls_files', return_value=None):
+        files, used_git = _get_all_files(cwd=tmp_path)
+
+    assert used_git
+    assert files == ['a.py', 'build/c.py', 'sub/.gitignore', 'sub/b.py']
+
+
+@pytest.mark.parametrize('use_gitignore', [False, True])
+def test_walk_files_parallel_matches_serial(tmp_path: Path, *, use_gitignore: bool) -> None:
+    for idx in range(40):
+        path_file = tmp_path / f'dir_{idx % 5}' / f'sub_{idx % 3}' / f'file_{idx}.{"log" if idx % 4 else "py"}'
+        path_file.parent.mkdir(parents=True, exist_ok=True)
+        path_file.write_text('content')
+    (tmp_path / 'dir_1' / '.gitignore').write_text('*.log\n')
+
+    serial = walk_files(tmp_path, use_gitignore=use_gitignore)
+    parallel = walk_files(tmp_path, use_gitignore=use_gitignore, workers=4)
+
+    assert parallel == serial
+    assert any(path.startswith('dir_1/') for path in serial)
+
+
 def test_get_all_files_fallback(tmp_path: Path) -> None:
     (tmp_path / 'test.py').write_text('content')
 
@@ -125,6 +329,40 @@ def test_get_all_files_fallback(tmp_path: Path) -> None:
     assert 'test.py' in files
 
 
+def test_find_project_files_in_sparse_checkout(tmp_path: Path) -> None:
+    for rel_file in ('d/a.py', 'e/c.py'):
+        (tmp_path / rel_file).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel_file).write_text('')
+    capture_shell(
+        'git init -q && git add . && git -c user.name=Test -c user.email=test@example.com commit -qm init'
+        ' && git sparse-checkout set d',
+        cwd=tmp_path,
+    )
+    expected = [tmp_path / 'd' / 'a.py']
+
+    assert find_project_files(tmp_path, ignore_patterns=[]) == expected
+    assert list(iter_project_files(tmp_path, ignore_patterns=[])) == expected
+    assert find_project_files(tmp_path, ignore_patterns=[], include_patterns=['**/*.py']) == expected
+
+
+def test_find_project_files_does_not_cache_gitignore_walk(tmp_path: Path) -> None:
+    (tmp_path / '.git').mkdir()
+    for rel_file in ('a.py', 'sub/b.py'):
+        (tmp_path / rel_file).parent.mkdir(exist_ok=True)
+        (tmp_path / rel_file).write_text('')
+    old_ns = time.time_ns() - 60_000_000_000
+    for path in (tmp_path, tmp_path / 'sub', tmp_path / '.git'):
+        os.utime(path, ns=(old_ns, old_ns))
+
+    with patch('corallium.file_search.git_ls_files_existing', return_value=None):
+        pruned = find_project_files(tmp_path, ignore_patterns=['sub/**'])
+        unpruned = find_project_files(tmp_path, ignore_patterns=[])
+
+    assert pruned == [tmp_path / 'a.py']
+    assert unpruned == [tmp_path / 'a.py', tmp_path / 'sub' / 'b.py']
+    assert not list((tmp_path / '.git').iterdir())
+
+
 def test_default_ignore_patterns_applied(tmp_path: Path) -> None:
     (tmp_path / '__pycache__').mkdir()
     (tmp_path / '__pycache__' / 'cached.pyc').write_text('')
@@ -137,6 +375,118 @@ def test_default_ignore_patterns_applied(tmp_path: Path) -> None:
     assert 'cached.pyc' not in file_names
 
 
+def test_find_project_files_reuses_inventory(tmp_path: Path) -> None:
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'main.py').write_text('')
+    capture_shell('git init -q && git add src/main.py', cwd=tmp_path)
+    old_ns = time.time_ns() - 60_000_000_000
+    for path in (tmp_path, tmp_path / 'src', tmp_path / '.git' / 'index'):
+        os.utime(path, ns=(old_ns, old_ns))
+    _INVENTORY.clear()
+
+    with patch('corallium.file_search.git_ls_files_existing', wraps=git_ls_files_existing) as mock_ls_files:
+        first = find_project_files(tmp_path, ignore_patterns=[])
+        second = find_project_files(tmp_path, ignore_patterns=[])
+        (tmp_path / 'src' / 'main.py').unlink()
+        third = find_project_files(tmp_path, ignore_patterns=[])
+
+    assert first == second == [tmp_path / 'src' / 'main.py']
+    assert not third
+    expected_calls = 2  # The deleted file changes the directory mtime
+    assert mock_ls_files.call_count == expected_calls
+
+
+@pytest.mark.parametrize(
+    ('pattern', 'expected'),
+    [
+        ('*.py', ['**/*.py', '**/*.py/**']),
+        ('**/src/*.ts', ['**/src/*.ts', '**/src/*.ts/**']),
+        ('/docs', ['docs', 'docs/**']),
+        ('/tests/**', ['tests/**']),
+        ('[!a]*.md', ['**/[!a]*.md', '**/[!a]*.md/**']),
+        ('[^a]*.md', None),
+        ('a\\*.md', None),
+    ],
+)
+def test_pushdown_globs(pattern: str, expected: list[str] | None) -> None:
+    assert _pushdown_globs(pattern) == expected
+
+
+def test_pushdown_translations() -> None:
+    assert _git_pathspecs(['/src', '']) == [':(glob)src', ':(glob)src/**']
+    assert _git_pathspecs(['[^a]']) is None
+    assert _jj_fileset(['*.py', '/docs/**']) == 'glob:"**/*.py" | glob:"**/*.py/**" | glob:"docs/**"'
+
+
+@pytest.mark.parametrize(
+    ('include_patterns', 'ignore_patterns'),
+    [
+        (['*.py'], []),
+        (['/src'], ['*_test.py']),
+        (['/src/**'], ['**/vendor/**']),
+        (['lib/*.py', '*.md'], ['/README.md']),
+        (['[^s]*'], []),
+    ],
+)
+def test_find_project_files_include_patterns(
+    tmp_path: Path,
+    include_patterns: list[str],
+    ignore_patterns: list[str],
+) -> None:
+    rel_paths = [
+        'README.md',
+        'setup.py',
+        'src/app.py',
+        'src/app_test.py',
+        'src/lib/util.py',
+        'src/vendor/dep.py',
+        'docs/index.md',
+    ]
+    for rel_path in rel_paths:
+        (tmp_path / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel_path).write_text('')
+    capture_shell('git init -q && git add .', cwd=tmp_path)
+    _INVENTORY.clear()
+
+    pushed_down = find_project_files(tmp_path, ignore_patterns, include_patterns=include_patterns)
+    with patch('corallium.file_search._list_matching_files', return_value=None):
+        filtered = find_project_files(tmp_path, ignore_patterns, include_patterns=include_patterns)
+
+    assert pushed_down == filtered
+    assert pushed_down == list(iter_project_files(tmp_path, ignore_patterns, include_patterns=include_patterns))
+
+
+def test_list_matching_files_jj(tmp_path: Path) -> None:
+    (tmp_path / '.jj').mkdir()
+    (tmp_path / 'main.py').write_text('')
+
+    with patch('corallium.file_search.jj_file_list', return_value=['main.py', 'deleted.py']) as mock_jj:
+        files = _list_matching_files(tmp_path, include_patterns=['*.py'])
+
+    assert files == ['main.py']
+    mock_jj.assert_called_once_with(cwd=tmp_path, fileset='glob:"**/*.py" | glob:"**/*.py/**"')
+
+
+def test_find_workspace_files(tmp_path: Path) -> None:
+    for rel_path in ('repo_a/a.py', 'repo_a/sub/e.py', 'repo_b/b.py', 'repo_b/nested/c.py', 'repo_b/nested/d.md'):
+        (tmp_path / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel_path).write_text('')
+    for repo in ('repo_a', 'repo_b', 'repo_b/nested'):
+        capture_shell('git init -q && git add .', cwd=tmp_path / repo)
+    repo_a, repo_b, nested = (tmp_path / repo for repo in ('repo_a', 'repo_b', 'repo_b/nested'))
+
+    sub = repo_a / 'sub'
+
+    files = find_workspace_files([repo_b, repo_a, nested, repo_a, sub], ignore_patterns=['*.md'], workers=2)
+
+    assert list(files.items()) == [
+        (repo_b / 'b.py', repo_b),
+        (repo_a / 'a.py', repo_a),
+        (nested / 'c.py', nested),
+        (sub / 'e.py', sub),
+    ]
+
+
 def test_get_all_files_jj_fallback(tmp_path: Path) -> None:
     jj_files = ['src/main.py', 'README.md']
     with (
@@ -5,7 +5,7 @@ import math
 import pytest
 from beartype.typing import Any, Dict, List
 
-from corallium.markup_table import format_table
+from corallium.markup_table import format_table, iter_table_lines
 
 
 @pytest.fixture
@@ -54,3 +54,8 @@ def test_format_table_errors(
     """Test table formatting error cases."""
     with pytest.raises(ValueError, match=error_match):
         format_table(headers, records, delimiters=delimiters)
+
+
+def test_iter_table_lines_validates_when_called() -> None:
+    with pytest.raises(ValueError, match='Delimiters must be one of'):
+        iter_table_lines(['A'], [], widths=[1], delimiters=['invalid'])
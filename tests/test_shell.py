@@ -1,11 +1,27 @@
+import asyncio
+import io
 import json
+import os
 import platform
 import shlex
-from subprocess import CalledProcessError
+import sys
+from pathlib import Path
+from subprocess import CalledProcessError, TimeoutExpired
+from time import monotonic
 
 import pytest
 
-from corallium.shell import capture_shell, capture_shell_async, run_shell
+from corallium.shell import (
+    ShellCommand,
+    _iter_chunks_thread,
+    capture_many,
+    capture_many_async,
+    capture_shell,
+    capture_shell_async,
+    capture_shell_bounded,
+    iter_shell_lines_async,
+    run_shell,
+)
 
 
 @pytest.mark.asyncio
@@ -44,3 +60,240 @@ def test_capture_shell(fake_process):
     result = capture_shell(process)
 
     assert result == expected + '\n\n'
+
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+def test_capture_shell_printer_lines():
+    lines: list[str] = []
+
+    result = capture_shell('printf "a\\r\\nb  \\nc"', printer=lines.append)
+
+    assert result == 'a\nb  \nc'
+    assert lines == ['a', 'b', 'c']
+
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+def test_capture_shell_timeout_with_silent_process():
+    timeout = 1
+    start = monotonic()
+
+    with pytest.raises(TimeoutExpired) as exc_info:
+        capture_shell('echo start; exec sleep 10', timeout=timeout)
+
+    assert monotonic() - start < timeout + 2
+    assert exc_info.value.output == 'start\n'
+
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+def test_capture_shell_bounded():
+    line_count = 1_000
+    lines: list[str] = []
+
+    with capture_shell_bounded(f'seq {line_count}', printer=lines.append, head_lines=2, tail_lines=3) as result:
+        assert result.file
+        full_output = result.file.read()
+
+    assert result.head == ['1', '2']
+    assert list(result.tail) == ['998', '999', '1000']
+    assert result.line_count == line_count
+    assert result.truncated
+    assert str(result) == '1\n2\n... 995 lines omitted ...\n998\n999\n1000'
+    assert full_output == ''.join(f'{idx}\n' for idx in range(1, line_count + 1))
+    assert len(lines) == line_count
+    assert result.file.closed
+
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+def test_capture_shell_bounded_without_spool():
+    result = capture_shell_bounded('printf "a\nb"', head_lines=5, tail_lines=5, spool=False)
+
+    assert result.file is None
+    assert not result.truncated
+    assert str(result) == 'a\nb'
+
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+def test_capture_shell_bounded_failure():
+    return_code = 3
+    cmd = f'seq 10; exit {return_code}'
+
+    with pytest.raises(CalledProcessError) as exc_info:
+        capture_shell_bounded(cmd, head_lines=1, tail_lines=1)
+    with capture_shell_bounded(cmd, head_lines=1, tail_lines=1, check=False) as result:
+        pass
+
+    assert exc_info.value.output == '1\n... 8 lines omitted ...\n10'
+    assert result.returncode == return_code
+
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+def test_capture_many(tmp_path: Path):
+    return_code = 2
+    delay = 0.3
+    commands: list[str | ShellCommand] = [
+        f'sleep {delay}; echo slow',
+        ShellCommand('pwd', cwd=tmp_path),
+        f'echo failed; exit {return_code}',
+        ShellCommand('sleep 5', timeout=1),
+    ]
+
+    results = capture_many(commands, max_concurrency=len(commands))
+
+    assert [result.output for result in results] == ['slow', str(tmp_path), 'failed', '']
+    assert [result.returncode for result in results] == [0, 0, return_code, None]
+    assert [result.ok for result in results] == [True, True, False, False]
+    assert results[0].duration >= delay
+
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+def test_capture_many_max_concurrency():
+    delay = 0.2
+    start = monotonic()
+
+    capture_many([f'sleep {delay}'] * 3, max_concurrency=1)
+
+    assert monotonic() - start >= delay * 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+async def test_capture_many_async_fail_fast():
+    delay = 5
+    start = monotonic()
+
+    with pytest.raises(CalledProcessError):
+        await capture_many_async(['exit 1', f'exec sleep {delay}'], fail_fast=True, max_concurrency=2)
+
+    assert monotonic() - start < delay
+
+
+def test_capture_shell_argv():
+    arg = 'a  b; $HOME'
+
+    result = capture_shell([sys.executable, '-c', 'import sys; print(sys.argv[1])', arg])
+
+    assert result == f'{arg}\n'
+
+
+def test_capture_shell_argv_not_found():
+    not_found = 127
+
+    with pytest.raises(CalledProcessError) as exc_info:
+        capture_shell(['corallium-missing-program'])
+
+    assert exc_info.value.returncode == not_found
+
+
+@pytest.mark.asyncio
+async def test_capture_shell_async_argv():
+    arg = 'a  b; $HOME'
+
+    result = await capture_shell_async([sys.executable, '-c', 'import sys; print(sys.argv[1])', arg])
+
+    assert result == arg
+    with pytest.raises(CalledProcessError):
+        await capture_shell_async(['corallium-missing-program'])
+
+
+def test_run_shell_argv():
+    run_shell([sys.executable, '-c', 'pass'])
+
+    with pytest.raises(CalledProcessError):
+        run_shell([sys.executable, '-c', 'raise SystemExit(1)'])
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    path_stat = Path(f'/proc/{pid}/stat')
+    # A killed process may wait as a zombie until the orphan is reaped
+    return not path_stat.is_file() or path_stat.read_text(encoding='utf-8').rpartition(') ')[2][:1] != 'Z'
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+async def test_iter_shell_lines_async():
+    lines = [line async for line in iter_shell_lines_async('printf "a\\nb\\r\\n\\nc"')]
+
+    assert lines == ['a', 'b', '', 'c']
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+async def test_iter_shell_lines_async_failure():
+    lines = iter_shell_lines_async('echo a; exit 1')
+
+    assert await anext(lines) == 'a'
+    with pytest.raises(CalledProcessError):
+        await anext(lines)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+async def test_iter_shell_lines_async_timeout_kills_process():
+    lines = iter_shell_lines_async('echo $$; exec sleep 10', timeout=1)
+
+    pid = int(await anext(lines))
+    with pytest.raises(TimeoutExpired):
+        await anext(lines)
+
+    assert not _is_running(pid)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+async def test_iter_shell_lines_async_stop_early_kills_process():
+    lines = iter_shell_lines_async('echo $$; exec sleep 10')
+
+    pid = int(await anext(lines))
+    await lines.aclose()
+
+    assert not _is_running(pid)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+async def test_capture_shell_async_timeout_kills_process(tmp_path: Path):
+    path_pid = tmp_path / 'pid'
+
+    with pytest.raises(asyncio.TimeoutError):
+        await capture_shell_async(f'echo $$ > {path_pid}; exec sleep 10', timeout=1)
+
+    assert not _is_running(int(path_pid.read_text(encoding='utf-8')))
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+async def test_iter_shell_lines_async_kill_process_group():
+    lines = iter_shell_lines_async('sleep 10 & echo $!; wait', timeout=1, kill_process_group=True)
+
+    pid = int(await anext(lines))
+    with pytest.raises(TimeoutExpired):
+        await anext(lines)
+
+    assert not _is_running(pid)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Shell command behavior differs on Windows')
+@pytest.mark.parametrize('kill_process_group', [False, True])
+async def test_capture_shell_async_session(*, kill_process_group: bool):
+    cmd = [sys.executable, '-c', 'import os; print(os.getsid(0))']
+
+    output = await capture_shell_async(cmd, kill_process_group=kill_process_group)
+
+    assert (int(output) == os.getsid(0)) is not kill_process_group
+
+
+def test_iter_chunks_thread():
+    assert list(_iter_chunks_thread(io.BytesIO(b'abc'), None)) == [b'abc']
+
+    read_fd, write_fd = os.pipe()
+    chunks = _iter_chunks_thread(io.FileIO(read_fd, 'rb'), monotonic() + 0.1)
+    try:
+        with pytest.raises(TimeoutExpired):
+            next(chunks)
+    finally:
+        os.close(write_fd)
@@ -1,10 +1,29 @@
 """Tests for corallium.vcs._git_commands."""
 
 from pathlib import Path
+from subprocess import CalledProcessError
+from unittest.mock import patch
 
 import pytest
 
-from corallium.vcs._git_commands import git_blame_porcelain, git_ls_files, git_show_toplevel, zsplit
+from corallium.shell import capture_shell
+from corallium.vcs._git_commands import (
+    GitCatFileBatch,
+    _iter_index_presence,
+    _line_ranges,
+    git_blame_line_porcelain,
+    git_blame_line_porcelain_async,
+    git_blame_porcelain,
+    git_ls_files,
+    git_ls_files_blobs,
+    git_ls_files_existing,
+    git_ls_files_modified,
+    git_show_toplevel,
+    iter_git_ls_files,
+    iter_git_ls_files_existing,
+    parse_line_porcelain,
+    zsplit,
+)
 
 
 @pytest.mark.parametrize(
@@ -50,3 +69,235 @@ def test_git_blame_porcelain_returns_none_outside_repo(tmp_path: Path):
     dummy = tmp_path / 'dummy.py'
     dummy.write_text('hello')
     assert git_blame_porcelain(file_path=dummy, line=1, cwd=tmp_path) is None
+
+
+@pytest.mark.parametrize(
+    ('lines', 'expected'),
+    [
+        ([], []),
+        ([3], [(3, 3)]),
+        ([5, 1, 2, 3, 5, 9], [(1, 3), (5, 5), (9, 9)]),
+    ],
+)
+def test_line_ranges(lines: list[int], expected: list[tuple[int, int]]):
+    assert _line_ranges(lines) == expected
+
+
+def test_parse_line_porcelain():
+    stdout = (
+        'abc123 1 1 2\nauthor A\nauthor-time 1700000000\nfilename src/a.py\n\t# TODO: first\n'
+        'abc123 2 4\nauthor A\nauthor-time 1700000000\nfilename src/a.py\n\t\t# FIXME: indented\r\n'
+    )
+
+    result = parse_line_porcelain(stdout)
+
+    assert sorted(result) == [1, 4]
+    assert result[1].startswith('abc123 1 1 2\n')
+    assert result[4].endswith('\t\t# FIXME: indented\r\n')
+
+
+def test_git_blame_line_porcelain_in_repo():
+    project_root = Path(__file__).parent.parent.parent
+    result = git_blame_line_porcelain(file_path=project_root / 'LICENSE', lines=[1, 2, 5], cwd=project_root)
+
+    assert result is not None
+    assert sorted(parse_line_porcelain(result)) == [1, 2, 5]
+
+
+def test_git_blame_line_porcelain_path_with_space(tmp_path: Path):
+    path_file = tmp_path / 'my file.py'
+    path_file.write_text('a\nb\n')
+    capture_shell(
+        'git init -q && git add . && git -c user.name=a -c user.email=a@example.com commit -qm a', cwd=tmp_path
+    )
+
+    result = git_blame_line_porcelain(file_path=path_file, lines=[2], cwd=tmp_path)
+
+    assert result is not None
+    assert sorted(parse_line_porcelain(result)) == [2]
+
+
+def test_git_blame_line_porcelain_returns_none_outside_repo(tmp_path: Path):
+    dummy = tmp_path / 'dummy.py'
+    dummy.write_text('hello')
+    assert git_blame_line_porcelain(file_path=dummy, lines=[1], cwd=tmp_path) is None
+
+
+def test_git_blame_line_porcelain_raises_other_errors(tmp_path: Path):
+    error = CalledProcessError(returncode=1, cmd='git blame')
+
+    with patch('corallium.vcs._git_commands.capture_shell', side_effect=error), pytest.raises(CalledProcessError):
+        git_blame_line_porcelain(file_path=tmp_path / 'dummy.py', lines=[1], cwd=tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_git_blame_line_porcelain_async_raises_other_errors(tmp_path: Path):
+    error = CalledProcessError(returncode=1, cmd='git blame')
+
+    with (
+        patch('corallium.vcs._git_commands.capture_shell_async', side_effect=error),
+        pytest.raises(CalledProcessError),
+    ):
+        await git_blame_line_porcelain_async(file_path=tmp_path / 'dummy.py', lines=[1], cwd=tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_git_blame_line_porcelain_async_matches_sync():
+    project_root = Path(__file__).parent.parent.parent
+    file_path = project_root / 'LICENSE'
+    lines = [1, 2, 5]
+
+    result = await git_blame_line_porcelain_async(file_path=file_path, lines=lines, cwd=project_root)
+
+    assert result is not None
+    expected = git_blame_line_porcelain(file_path=file_path, lines=lines, cwd=project_root)
+    assert parse_line_porcelain(result) == parse_line_porcelain(expected or '')
+
+
+@pytest.mark.asyncio
+async def test_git_blame_line_porcelain_async_returns_none_outside_repo(tmp_path: Path):
+    dummy = tmp_path / 'dummy.py'
+    dummy.write_text('hello')
+    assert await git_blame_line_porcelain_async(file_path=dummy, lines=[1], cwd=tmp_path) is None
+
+
+def test_git_ls_files_blobs_in_repo():
+    project_root = Path(__file__).parent.parent.parent
+    result = git_ls_files_blobs(cwd=project_root)
+
+    assert result is not None
+    assert len(result['LICENSE']) == 40  # noqa: PLR2004
+
+
+def test_git_ls_files_blobs_returns_none_outside_repo(tmp_path: Path):
+    assert git_ls_files_blobs(cwd=tmp_path) is None
+
+
+def test_git_ls_files_modified(tmp_path: Path):
+    capture_shell('git init -q', cwd=tmp_path)
+    for name in ('clean.py', 'changed.py', 'deleted.py'):
+        (tmp_path / name).write_text('x = 1\n')
+    capture_shell('git add .', cwd=tmp_path)
+    (tmp_path / 'changed.py').write_text('x = 2\n')
+    (tmp_path / 'deleted.py').unlink()
+
+    assert sorted(git_ls_files_modified(cwd=tmp_path) or []) == ['changed.py', 'deleted.py']
+
+
+def test_git_ls_files_modified_returns_none_outside_repo(tmp_path: Path):
+    assert git_ls_files_modified(cwd=tmp_path) is None
+
+
+def test_git_cat_file_batch_reads_blobs():
+    project_root = Path(__file__).parent.parent.parent
+    blob_ids = git_ls_files_blobs(cwd=project_root)
+    assert blob_ids
+
+    with GitCatFileBatch(cwd=project_root) as cat_file:
+        license_text = cat_file.read(blob_ids['LICENSE'])
+        missing = cat_file.read('0' * 40)
+        readme_text = cat_file.read(blob_ids['README.md'])
+
+    assert license_text
+    assert license_text.startswith(b'MIT License')
+    assert missing is None
+    assert readme_text is not None
+
+
+def test_git_cat_file_batch_returns_none_outside_repo(tmp_path: Path):
+    with GitCatFileBatch(cwd=tmp_path) as cat_file:
+        assert cat_file.read('0' * 40) is None
+
+
+def test_iter_git_ls_files_streams_paths(tmp_path: Path):
+    names = ['a.py', 'b c.txt', 'dir/d.md']
+    for name in names:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text('')
+    capture_shell('git init -q && git add .', cwd=tmp_path)
+
+    assert list(iter_git_ls_files(cwd=tmp_path, chunk_size=3)) == names
+    stream = iter_git_ls_files(cwd=tmp_path)
+    assert next(stream) == names[0]
+    stream.close()
+
+
+def test_iter_git_ls_files_outside_repo(tmp_path: Path):
+    with pytest.raises(CalledProcessError):
+        list(iter_git_ls_files(cwd=tmp_path))
+
+
+def test_iter_index_presence_merges_entries(tmp_path: Path):
+    entries = [
+        'H 100644 aaa 0\tkept.py',
+        'H 100644 bbb 0\tdeleted.py',
+        'R 100644 bbb 0\tdeleted.py',
+        'M 100644 ccc 2\tconflict.py',
+        'M 100644 ddd 3\tconflict.py',
+        'H 160000 eee 0\tsubmodule',
+        'H 120000 fff 0\tlink',
+        'S 100644 ggg 0\tsparse.py',
+        'H 100644 hhh 0\treplaced',
+        'C 100644 hhh 0\treplaced',
+    ]
+    (tmp_path / 'replaced').mkdir()
+
+    result = list(_iter_index_presence(entries, cwd=tmp_path))
+
+    assert result == [
+        ('kept.py', True),
+        ('deleted.py', False),
+        ('conflict.py', True),
+        ('link', False),
+        ('sparse.py', False),
+        ('replaced', False),
+    ]
+
+
+def test_git_ls_files_existing(tmp_path: Path):
+    for name in ('kept.py', 'deleted.py', 'target/file.py'):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text('')
+    (tmp_path / 'link.py').symlink_to('kept.py')
+    (tmp_path / 'dir_link').symlink_to('target')
+    capture_shell('git init -q && git add .', cwd=tmp_path)
+    (tmp_path / 'deleted.py').unlink()
+
+    result = git_ls_files_existing(cwd=tmp_path)
+
+    assert result == (['kept.py', 'link.py', 'target/file.py'], ['deleted.py', 'dir_link'])
+    assert list(iter_git_ls_files_existing(cwd=tmp_path, chunk_size=7)) == [
+        ('deleted.py', False),
+        ('dir_link', False),
+        ('kept.py', True),
+        ('link.py', True),
+        ('target/file.py', True),
+    ]
+
+
+def test_git_ls_files_existing_outside_repo(tmp_path: Path):
+    assert git_ls_files_existing(cwd=tmp_path) is None
+
+
+def test_git_ls_files_existing_in_sparse_checkout(tmp_path: Path):
+    for name in ('top.py', 'd/a.py', 'e/c.py', 'f/replaced'):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text('')
+    capture_shell(
+        'git init -q && git add . && git -c user.name=Test -c user.email=test@example.com commit -qm init'
+        ' && git sparse-checkout set d f',
+        cwd=tmp_path,
+    )
+    (tmp_path / 'f' / 'replaced').unlink()
+    (tmp_path / 'f' / 'replaced').mkdir()
+
+    result = git_ls_files_existing(cwd=tmp_path)
+
+    assert not (tmp_path / 'e').exists()
+    assert result == (['d/a.py', 'top.py'], ['e/c.py', 'f/replaced'])
+    assert dict(iter_git_ls_files_existing(cwd=tmp_path)) == {
+        'd/a.py': True,
+        'e/c.py': False,
+        'f/replaced': False,
+        'top.py': True,
+    }
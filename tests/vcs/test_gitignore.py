@@ -0,0 +1,41 @@
+"""Tests for corallium.vcs._gitignore."""
+
+import pytest
+
+from corallium.vcs._gitignore import Gitignore, is_ignored
+
+
+@pytest.mark.parametrize(
+    ('lines', 'rel_path', 'is_dir', 'expected'),
+    [
+        (['*.pyc'], 'a/b/module.pyc', False, True),
+        (['*.pyc'], 'module.py', False, None),
+        (['# *.py'], 'module.py', False, None),
+        (['/build'], 'build', True, True),
+        (['/build'], 'src/build', True, None),
+        (['doc/frotz'], 'a/doc/frotz', False, None),
+        (['node_modules/'], 'node_modules', True, True),
+        (['node_modules/'], 'node_modules', False, None),
+        (['*.log', '!important.log'], 'logs/important.log', False, False),
+        (['!important.log', '*.log'], 'logs/important.log', False, True),
+        (['a/**/b'], 'a/b', False, True),
+        (['a/**/b'], 'a/x/y/b', False, True),
+        (['abc/**'], 'abc/x/y', False, True),
+        (['abc/**'], 'abc', True, None),
+        (['**/foo'], 'x/foo', True, True),
+        ([r'\#hash'], '#hash', False, True),
+        ([r'\!bang'], '!bang', False, True),
+        (['trailing   '], 'trailing', False, True),
+        ([r'space\ '], 'space ', False, True),
+    ],
+)
+def test_gitignore_match(lines: list[str], rel_path: str, *, is_dir: bool, expected: bool | None):
+    assert Gitignore(lines).match(rel_path, is_dir=is_dir) is expected
+
+
+def test_is_ignored_prefers_deeper_files():
+    gitignores = [('', Gitignore(['*.tmp'])), ('sub', Gitignore(['!keep.tmp']))]
+
+    assert is_ignored(gitignores, 'sub/drop.tmp', is_dir=False)
+    assert not is_ignored(gitignores, 'sub/keep.tmp', is_dir=False)
+    assert is_ignored(gitignores, 'keep.tmp', is_dir=False)
@@ -0,0 +1,109 @@
+"""Tests for corallium.vcs._inventory."""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from corallium.vcs._inventory import SNAPSHOT_NAME, FileInventory, _listed_dirs
+
+_FILES = ['README.md', 'src/pkg/main.py']
+
+
+def _backdate(*paths: Path) -> None:
+    old_ns = time.time_ns() - 60_000_000_000
+    for path in paths:
+        os.utime(path, ns=(old_ns, old_ns))
+
+
+def _make_repo(tmp_path: Path) -> Path:
+    repo = tmp_path / 'repo'
+    (repo / '.git').mkdir(parents=True)
+    (repo / '.git' / 'HEAD').write_text('ref: refs/heads/main\n')
+    (repo / '.git' / 'index').write_bytes(b'DIRC')
+    for rel_file in _FILES:
+        (repo / rel_file).parent.mkdir(parents=True, exist_ok=True)
+        (repo / rel_file).write_text('')
+    _backdate(repo / '.git' / 'index', repo, repo / 'src', repo / 'src' / 'pkg')
+    return repo
+
+
+def test_listed_dirs_include_parents() -> None:
+    assert _listed_dirs(['a/b/c.py', 'd.py']) == ['', 'a', 'a/b']
+
+
+def test_inventory_reuses_listing_and_snapshot(tmp_path: Path) -> None:
+    repo = _make_repo(tmp_path)
+    inventory = FileInventory()
+
+    inventory.set(repo, _FILES, start_ns=time.time_ns())
+
+    assert inventory.get(repo) == _FILES
+    assert (repo / '.git' / SNAPSHOT_NAME).is_file()
+    assert FileInventory().get(repo) == _FILES
+
+
+def test_inventory_invalidated_by_new_file(tmp_path: Path) -> None:
+    repo = _make_repo(tmp_path)
+    inventory = FileInventory()
+    inventory.set(repo, _FILES, start_ns=time.time_ns())
+
+    (repo / 'src' / 'pkg' / 'new.py').write_text('')
+
+    assert inventory.get(repo) is None
+    assert FileInventory().get(repo) is None
+
+
+def test_inventory_invalidated_by_head(tmp_path: Path) -> None:
+    repo = _make_repo(tmp_path)
+    inventory = FileInventory()
+    inventory.set(repo, _FILES, start_ns=time.time_ns())
+
+    (repo / '.git' / 'HEAD').write_text('ref: refs/heads/other\n')
+
+    assert inventory.get(repo) is None
+
+
+def test_inventory_keyed_by_subdirectory(tmp_path: Path) -> None:
+    repo = _make_repo(tmp_path)
+    inventory = FileInventory()
+    inventory.set(repo / 'src', ['pkg/main.py'], start_ns=time.time_ns())
+
+    assert inventory.get(repo / 'src') == ['pkg/main.py']
+    assert inventory.get(repo) is None
+
+
+def test_inventory_keeps_concurrent_listings(tmp_path: Path) -> None:
+    repo = _make_repo(tmp_path)
+    subdirs = [repo / f'dir_{idx}' for idx in range(16)]
+    for subdir in subdirs:
+        subdir.mkdir()
+        (subdir / 'main.py').write_text('')
+    _backdate(repo, *subdirs)
+    inventory = FileInventory()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda subdir: inventory.set(subdir, ['main.py'], start_ns=time.time_ns()), subdirs))
+
+    from_snapshot = FileInventory()
+    assert [from_snapshot.get(subdir) for subdir in subdirs] == [['main.py']] * len(subdirs)
+    assert not list((repo / '.git').glob('*.tmp'))
+
+
+def test_inventory_skips_recently_modified(tmp_path: Path) -> None:
+    repo = _make_repo(tmp_path)
+    (repo / 'src' / 'pkg' / 'new.py').write_text('')
+    inventory = FileInventory()
+
+    inventory.set(repo, _FILES, start_ns=time.time_ns())
+
+    assert inventory.get(repo) is None
+    assert not (repo / '.git' / SNAPSHOT_NAME).exists()
+
+
+def test_inventory_without_repo(tmp_path: Path) -> None:
+    inventory = FileInventory()
+
+    inventory.set(tmp_path, ['a.py'], start_ns=time.time_ns())
+
+    assert inventory.get(tmp_path) is None
@@ -4,7 +4,15 @@ from pathlib import Path
 from subprocess import CalledProcessError
 from unittest.mock import patch
 
-from corallium.vcs._jj_commands import jj_file_annotate, jj_file_list, jj_git_remote_list, jj_root
+from corallium.vcs._jj_commands import (
+    JJ_ANNOTATE_TEMPLATE,
+    jj_file_annotate,
+    jj_file_list,
+    jj_git_remote_list,
+    jj_root,
+    parse_jj_annotate,
+)
+from corallium.vcs._types import AnnotatedLine
 
 
 def test_jj_file_list_parses_newlines():
@@ -69,3 +77,45 @@ def test_jj_file_annotate_returns_none_on_failure():
         result = jj_file_annotate(file_path=Path('src/main.py'), line=1, cwd=Path('/fake'))
 
     assert result is None
+
+
+def test_jj_file_annotate_with_template():
+    with patch('corallium.vcs._jj_commands.capture_shell', return_value='') as mock:
+        jj_file_annotate(file_path=Path('src/my file.py'), line=1, cwd=Path('/fake'), template=JJ_ANNOTATE_TEMPLATE)
+
+    cmd = mock.call_args.args[0]
+    assert cmd == ['jj', 'file', 'annotate', 'src/my file.py', '-T', JJ_ANNOTATE_TEMPLATE]
+
+
+def test_parse_jj_annotate():
+    stdout = (
+        'qpvuntsm\tabc123\tuser@example.com\t2024-01-02T03:04:05+02:00\tfalse\n'
+        'rlvkpnrz\tdef456\tother@example.com\t2024-02-03T04:05:06-05:00\ttrue\n'
+    )
+
+    result = parse_jj_annotate(stdout)
+
+    assert result == {
+        1: AnnotatedLine(
+            change_id='qpvuntsm',
+            commit_id='abc123',
+            author='user@example.com',
+            timestamp='2024-01-02T03:04:05+02:00',
+            working_copy=False,
+        ),
+        2: AnnotatedLine(
+            change_id='rlvkpnrz',
+            commit_id='def456',
+            author='other@example.com',
+            timestamp='2024-02-03T04:05:06-05:00',
+            working_copy=True,
+        ),
+    }
+
+
+def test_jj_file_list_with_fileset():
+    with patch('corallium.vcs._jj_commands.capture_shell', return_value='src/main.py\n') as mock_shell:
+        result = jj_file_list(cwd=Path('/fake'), fileset='glob:"**/*.py"')
+
+    assert result == ['src/main.py']
+    mock_shell.assert_called_once_with(['jj', 'file', 'list', 'glob:"**/*.py"'], cwd=Path('/fake'))
@@ -5,6 +5,7 @@ from subprocess import CalledProcessError
 from unittest.mock import patch
 
 from corallium.vcs._repo import (
+    RepoIndex,
     _get_jj_bookmark,
     _get_jj_remote_url,
     detect_vcs_kind,
@@ -56,6 +57,16 @@ def test_detect_vcs_kind_jj(tmp_path: Path):
     assert detect_vcs_kind(tmp_path) == VcsKind.JUJUTSU
 
 
+def test_find_repo_root_submodule(tmp_path: Path):
+    (tmp_path / '.git').mkdir()
+    submodule = tmp_path / 'vendor' / 'lib'
+    submodule.mkdir(parents=True)
+    (submodule / '.git').write_text('gitdir: ../../.git/modules/lib\n')
+
+    assert find_repo_root(submodule / 'src') == submodule.resolve()
+    assert detect_vcs_kind(submodule) == VcsKind.GIT
+
+
 def test_detect_vcs_kind_none(tmp_path: Path):
     assert detect_vcs_kind(tmp_path) is None
 
@@ -139,3 +150,36 @@ def test_get_repo_metadata_jj_repo(tmp_path: Path):
     assert result.branch == 'main'
     assert result.remote_url == 'https://github.com/user/repo'
     get_repo_metadata.cache_clear()
+
+
+def test_repo_index_resolves_innermost_root(tmp_path: Path):
+    outer = tmp_path / 'outer'
+    nested = outer / 'packages' / 'nested'
+    submodule = outer / 'vendor' / 'lib'
+    for path in (outer / 'src' / 'deep', nested / 'src', submodule):
+        path.mkdir(parents=True)
+    (outer / '.git').mkdir()
+    (nested / '.jj').mkdir()
+    (submodule / '.git').write_text('gitdir: ../../.git/modules/lib\n')
+    repo_index = RepoIndex()
+
+    assert repo_index.find_root(outer / 'src' / 'deep') == outer
+    assert repo_index.find_root(outer / 'src') == outer
+    assert repo_index.find_root(nested / 'src') == nested
+    assert repo_index.find_root(submodule) == submodule
+    assert repo_index.find_root(tmp_path) is None
+
+
+def test_repo_index_resolves_metadata_once_per_root(tmp_path: Path):
+    repo_root = tmp_path / 'project'
+    for name in ('a', 'b', 'c'):
+        (repo_root / name).mkdir(parents=True)
+    (repo_root / '.git').mkdir()
+    repo_index = RepoIndex()
+
+    with patch('corallium.vcs._repo.get_repo_metadata', return_value=None) as mock:
+        for name in ('a', 'b', 'c'):
+            repo_index.get_metadata(repo_root / name)
+        assert repo_index.get_metadata(tmp_path) is None
+
+    mock.assert_called_once_with(cwd=repo_root)